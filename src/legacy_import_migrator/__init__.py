@@ -5,7 +5,27 @@ AST-based legacy import tracking and migration toolkit for Python codebases.
 
 __version__ = "0.1.0"
 
-from .tracker import ImportTracker, MigrationProgress
-from .checker import LegacyImportChecker
+__all__ = ["ImportTracker", "MigrationProgress", "LegacyImportChecker"]
 
-__all__ = ["ImportTracker", "MigrationProgress", "LegacyImportChecker"]
\ No newline at end of file
+# Public classes are imported on first use, so that importing a submodule
+# (as every CLI command does) does not load the tracker and checker as well
+_LAZY_EXPORTS = {
+    "ImportTracker": "tracker",
+    "MigrationProgress": "tracker",
+    "LegacyImportChecker": "checker",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
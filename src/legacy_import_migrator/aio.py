@@ -0,0 +1,230 @@
+"""Asynchronous scanning pipeline for high-latency filesystems.
+
+On NFS, SMB or FUSE mounts every ``stat`` and read waits for a round trip,
+so a serial scan spends most of its time idle. ``acached_scan`` keeps many
+file operations in flight at once: a bounded number of reader coroutines
+hand ``stat`` and read calls to a thread pool, and pass the bytes they read
+on to the CPU stage (a worker process pool with ``jobs > 1``, otherwise a
+single worker thread) while the next reads are already waiting. The event
+loop itself never blocks on a file or on parsing, so the pipeline can run
+inside an application such as a chat bot.
+
+With a process pool, read files are batched into chunks as in
+``parallel_map``. A chunk is sent when it is full, or as soon as no read is
+in flight, so the CPU stage never waits for a chunk that cannot fill up.
+Results are yielded in input order as soon as they are ready.
+
+At most ``io_concurrency`` files are between their first ``stat`` and the
+end of their scan at any time, which bounds both the open reads and the
+file contents held in memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import profiling
+from .cache import ScanCache, ScanTaskResult
+from .parallel import default_chunksize, start_pool, submit_chunk
+
+# Item of CPU work: (file content or None if unreadable, cached content hash)
+ReadTask = Tuple[Optional[bytes], Optional[str]]
+
+# (relative path, path, payload, parsed, content hash), as yielded by cached_scan()
+CachedResult = Tuple[str, Path, Any, bool, str]
+
+
+def _stat(path: Path) -> Optional[os.stat_result]:
+    try:
+        return path.stat()
+    except OSError:
+        return None
+
+
+def _read(path: Path) -> Tuple[Optional[bytes], int, float, float, float]:
+    """Read a file, returning (content or None, thread id, start, wall, CPU seconds)."""
+    cpu = time.thread_time()
+    start = time.perf_counter()
+    try:
+        data: Optional[bytes] = path.read_bytes()
+    except OSError:
+        data = None
+    wall = time.perf_counter() - start
+    return data, threading.get_ident(), start, wall, time.thread_time() - cpu
+
+
+async def acached_scan(
+    cache: Optional[ScanCache],
+    files: Sequence[Tuple[str, Path]],
+    scan_task: Callable[[ReadTask], ScanTaskResult],
+    jobs: int = 1,
+    io_concurrency: int = 32,
+    read_timeout: Optional[float] = None,
+) -> AsyncIterator[CachedResult]:
+    """Scan files through the cache with overlapping I/O; see cache.cached_scan().
+
+    Cache lookups and updates run on the event loop; the cache is saved once
+    every file is done, so a cancelled or timed-out scan, or one whose
+    results are not consumed to the end, leaves it as it was.
+
+    Args:
+        cache: Open cache, or None to scan every file
+        files: Sequence of (relative path, path) pairs
+        scan_task: Picklable function computing a payload from a file's
+            content; it receives None as the content of unreadable files
+        jobs: Number of worker processes for scan_task (1 uses a thread)
+        io_concurrency: Number of files in flight at a time
+        read_timeout: Seconds a single stat or read may take
+
+    Yields:
+        Results as cached_scan() yields them, in input order, each as soon
+        as it and every earlier one are done
+
+    Raises:
+        ValueError: If io_concurrency is less than 1
+        asyncio.TimeoutError: If a stat or read exceeds read_timeout. The
+            thread doing it cannot be interrupted and finishes on its own.
+    """
+    if io_concurrency < 1:
+        raise ValueError(f"Invalid I/O concurrency: {io_concurrency!r} (expected at least 1)")
+    loop = asyncio.get_running_loop()
+    profiler = profiling.active()
+    func: Callable[[Any], Any] = scan_task
+    if profiler is not None:
+        func = profiling.Profiled(scan_task, profiler.trace)
+
+    io_pool = ThreadPoolExecutor(max_workers=io_concurrency, thread_name_prefix="lim-io")
+    cpu_pool: Executor
+    chunksize = 1
+    if jobs > 1:
+        cpu_pool = start_pool(func, jobs)
+        chunksize = min(default_chunksize(len(files), jobs), max(1, io_concurrency // jobs))
+    else:
+        cpu_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lim-scan")
+
+    # Read files waiting for their chunk to be sent to the process pool
+    batch: List[Tuple[ReadTask, asyncio.Future]] = []
+    reading = 0
+
+    def deliver(chunk: List[Tuple[ReadTask, asyncio.Future]], done: asyncio.Future) -> None:
+        for index, (_, waiter) in enumerate(chunk):
+            if waiter.done():
+                continue
+            if done.cancelled():
+                waiter.cancel()
+            elif done.exception() is not None:
+                waiter.set_exception(done.exception())
+            else:
+                waiter.set_result(done.result()[index])
+
+    def flush() -> None:
+        # Send the chunk once it is full, or when no read could add to it
+        if not batch or (len(batch) < chunksize and reading > 0):
+            return
+        chunk = batch[:]
+        batch.clear()
+        done = asyncio.wrap_future(submit_chunk(cpu_pool, [task for task, _ in chunk]))
+        done.add_done_callback(lambda done: deliver(chunk, done))
+
+    async def io(call: Callable[[Path], Any], rel_path: str, path: Path) -> Any:
+        future = loop.run_in_executor(io_pool, call, path)
+        if read_timeout is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, read_timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(
+                f"Reading {rel_path} took longer than {read_timeout:g}s"
+            ) from None
+
+    async def process(rel_path: str, path: Path) -> CachedResult:
+        nonlocal reading
+        st: Optional[os.stat_result] = None
+        known = None
+        reading += 1
+        try:
+            if cache is not None:
+                st = await io(_stat, rel_path, path)
+                if st is not None:
+                    payload = cache.get(rel_path, st.st_size, st.st_mtime_ns)
+                    if payload is not None:
+                        return rel_path, path, payload, False, cache.known_digest(rel_path) or ""
+                    known = cache.known_digest(rel_path)
+
+            data, tid, start, wall, cpu = await io(_read, rel_path, path)
+        finally:
+            reading -= 1
+            if jobs > 1:
+                flush()
+        task = (data, known)
+        if jobs > 1:
+            waiter = loop.create_future()
+            batch.append((task, waiter))
+            flush()
+            result = await waiter
+        else:
+            result = await loop.run_in_executor(cpu_pool, func, task)
+        if profiler is not None:
+            result, timing = result
+            # Fold the read, done on an I/O thread, into the file's timing;
+            # the time spent queued for the CPU stage is left out
+            phases = dict(timing.phases)
+            phases["read"] = [1, wall, cpu]
+            events = timing.events
+            if profiler.trace:
+                events = [("read", "phase", os.getpid(), tid, start, wall), *events]
+            profiler.add_item(rel_path, timing._replace(
+                start=start,
+                wall=timing.wall + wall,
+                cpu=timing.cpu + cpu,
+                phases=phases,
+                events=events,
+            ))
+
+        payload, digest = result
+        if payload is None:
+            # Content unchanged since it was cached, only the stat data moved
+            assert cache is not None and st is not None
+            payload = cache.revalidate(rel_path, st.st_size, st.st_mtime_ns, digest)
+            return rel_path, path, payload, False, digest
+        if cache is not None and st is not None and digest:
+            cache.put(rel_path, st.st_size, st.st_mtime_ns, digest, payload)
+        return rel_path, path, payload, True, digest
+
+    results: Dict[int, CachedResult] = {}
+    arrived = asyncio.Event()
+    pending = iter(enumerate(files))
+
+    async def reader() -> None:
+        # The readers share one iterator, so each file is taken exactly once
+        for position, (rel_path, path) in pending:
+            results[position] = await process(rel_path, path)
+            arrived.set()
+
+    readers = [asyncio.ensure_future(reader()) for _ in range(min(io_concurrency, len(files)))]
+    gathered = asyncio.gather(*readers)
+    try:
+        for position in range(len(files)):
+            while position not in results:
+                if gathered.done():
+                    gathered.result()  # raises the error that stopped a reader
+                waiter = asyncio.ensure_future(arrived.wait())
+                await asyncio.wait({waiter, gathered}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                arrived.clear()
+            yield results.pop(position)
+        await gathered
+    finally:
+        gathered.cancel()
+        for task in readers:
+            task.cancel()
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
+    if cache is not None:
+        await loop.run_in_executor(None, cache.save)
@@ -0,0 +1,367 @@
+"""Persistent on-disk cache of per-file scan results.
+
+Each cache file lives under a cache directory (``.cache/lim-index/`` by default)
+and is named after a fingerprint of everything that influences extraction:
+legacy patterns, extraction settings and the running Python version. Within a
+cache file, entries are keyed by POSIX relative path and validated against the
+file's size and ``mtime_ns``; when the stat data differs, the stored content
+hash lets an unchanged file (e.g. after ``git checkout``) be reused without
+parsing it again.
+
+A long-running process (``lim serve``) can keep caches resident in memory
+with keep_resident(): later scans then reuse the same entries, still
+validated per file by stat data and content hash, and the cache is written
+to disk by flush_resident() instead of after every scan.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .parallel import parallel_map
+from .profiling import phase, timed
+
+CACHE_VERSION = 1
+
+# Default location of the cache directory
+DEFAULT_CACHE_DIR = ".cache/lim-index"
+
+# Default maximum number of entries kept per cache file
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Number of cache files (one per fingerprint) kept in the cache directory
+MAX_CACHE_FILES = 8
+
+# Files modified less than this long before being cached cannot be trusted
+# on stat data alone, since a later edit may keep the same size and mtime
+RACY_WINDOW_NS = 2_000_000_000
+
+
+# Resident caches by absolute cache file path, or None when caches are not kept
+_resident: Optional[Dict[str, "ScanCache"]] = None
+
+
+def keep_resident(enabled: bool = True) -> None:
+    """Keep caches opened with ScanCache.open() in memory for later scans."""
+    global _resident
+    if not enabled:
+        flush_resident()
+        _resident = None
+    elif _resident is None:
+        _resident = {}
+
+
+def flush_resident() -> None:
+    """Write every resident cache that changed to disk."""
+    for cache in list((_resident or {}).values()):
+        cache.flush()
+
+
+def content_digest(data: bytes) -> str:
+    """Return the content hash used to validate cache entries."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def make_fingerprint(kind: str, *parts: Iterable[str]) -> str:
+    """Build a cache fingerprint from a result kind and extraction settings.
+
+    Args:
+        kind: Producer of the cached results (e.g. 'tracker' or 'checker')
+        parts: Settings that influence the cached results, such as legacy patterns
+
+    Returns:
+        Hex digest identifying a cache file
+    """
+    payload = {
+        "kind": kind,
+        "version": CACHE_VERSION,
+        "python": list(sys.version_info[:2]),
+        "parts": [sorted(part) for part in parts],
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class ScanCache:
+    """Size-capped LRU cache of per-file scan results keyed by content."""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        fingerprint: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Initialize the cache and load any existing entries.
+
+        Args:
+            cache_dir: Directory holding cache files
+            fingerprint: Fingerprint from make_fingerprint()
+            max_entries: Maximum number of entries kept after save()
+        """
+        self.cache_dir = Path(cache_dir)
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.path = self.cache_dir / f"{fingerprint}.json"
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._tick = 0
+        self._dirty = False
+        self.resident = False
+        self._load()
+
+    @classmethod
+    def open(cls, cache_dir: str, fingerprint: str) -> "ScanCache":
+        """Open a cache, reusing the resident instance if caches are kept in memory.
+
+        Args:
+            cache_dir: Directory holding cache files
+            fingerprint: Fingerprint from make_fingerprint()
+
+        Returns:
+            Cache with zeroed hit and miss counters
+        """
+        if _resident is None:
+            return cls(cache_dir, fingerprint)
+        key = os.path.abspath(os.path.join(cache_dir, f"{fingerprint}.json"))
+        cache = _resident.get(key)
+        if cache is None:
+            cache = cls(os.path.abspath(cache_dir), fingerprint)
+            cache.resident = True
+            _resident[key] = cache
+        else:
+            cache.hits = cache.misses = 0
+            cache._tick += 1
+            cache._evict()
+        return cache
+
+    @timed("cache_io")
+    def _load(self) -> None:
+        """Load entries from disk, discarding unreadable or foreign files."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CACHE_VERSION
+            or data.get("fingerprint") != self.fingerprint
+            or not isinstance(data.get("entries"), dict)
+        ):
+            return
+
+        self._entries = data["entries"]
+        self._tick = int(data.get("tick", 0)) + 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, rel_path: str, size: int, mtime_ns: int) -> Optional[Any]:
+        """Return the cached payload if the file's stat data is unchanged.
+
+        Args:
+            rel_path: POSIX relative path of the file
+            size: Current file size in bytes
+            mtime_ns: Current modification time in nanoseconds
+
+        Returns:
+            Cached payload, or None if the file must be read
+        """
+        entry = self._entries.get(rel_path)
+        if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+            return None
+        self._touch(entry)
+        self.hits += 1
+        return entry["payload"]
+
+    def known_digest(self, rel_path: str) -> Optional[str]:
+        """Return the content hash stored for a path, if any."""
+        entry = self._entries.get(rel_path)
+        return entry["digest"] if entry is not None else None
+
+    def revalidate(self, rel_path: str, size: int, mtime_ns: int, digest: str) -> Optional[Any]:
+        """Reuse an entry whose stat data changed but whose content did not.
+
+        Args:
+            rel_path: POSIX relative path of the file
+            size: Current file size in bytes
+            mtime_ns: Current modification time in nanoseconds
+            digest: Content hash of the file as read now
+
+        Returns:
+            Cached payload if the content hash matches, otherwise None
+        """
+        entry = self._entries.get(rel_path)
+        if entry is None or entry["digest"] != digest:
+            return None
+        self._store(rel_path, size, mtime_ns, digest, entry["payload"])
+        self.hits += 1
+        return entry["payload"]
+
+    def put(self, rel_path: str, size: int, mtime_ns: int, digest: str, payload: Any) -> None:
+        """Store a freshly computed payload.
+
+        Args:
+            rel_path: POSIX relative path of the file
+            size: File size in bytes when it was read
+            mtime_ns: Modification time in nanoseconds when it was read
+            digest: Content hash of the bytes that produced the payload
+            payload: JSON-serializable scan result
+        """
+        self.misses += 1
+        self._store(rel_path, size, mtime_ns, digest, payload)
+
+    def _store(self, rel_path: str, size: int, mtime_ns: int, digest: str, payload: Any) -> None:
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            # Too fresh to trust stat data later: force a hash check next time
+            size = -1
+        self._entries[rel_path] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "digest": digest,
+            "payload": payload,
+            "used": self._tick,
+        }
+        self._dirty = True
+
+    def _touch(self, entry: Dict[str, Any]) -> None:
+        if entry["used"] != self._tick:
+            entry["used"] = self._tick
+            self._dirty = True
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond max_entries."""
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        by_age = sorted(self._entries, key=lambda key: self._entries[key]["used"])
+        for key in by_age[:excess]:
+            del self._entries[key]
+
+    def _prune_files(self) -> None:
+        """Remove cache files for other fingerprints beyond MAX_CACHE_FILES."""
+        try:
+            files = sorted(
+                self.cache_dir.glob("*.json"),
+                key=lambda p: p.stat().st_mtime_ns,
+                reverse=True,
+            )
+        except OSError:
+            return
+        for stale in files[MAX_CACHE_FILES:]:
+            if stale != self.path:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    @timed("cache_io")
+    def save(self) -> None:
+        """Write the cache atomically if anything changed (deferred while resident)."""
+        if not self.resident:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the cache atomically if anything changed."""
+        if not self._dirty:
+            return
+        self._evict()
+        data = {
+            "version": CACHE_VERSION,
+            "fingerprint": self.fingerprint,
+            "tick": self._tick,
+            "entries": self._entries,
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        self._dirty = False
+        self._prune_files()
+
+
+# A scan task is (path, known content hash); it returns (payload, content hash)
+# with a None payload when the file still matches the known hash
+ScanTask = Tuple[Path, Optional[str]]
+ScanTaskResult = Tuple[Optional[Any], str]
+
+
+def cached_scan(
+    cache: Optional[ScanCache],
+    files: Sequence[Tuple[str, Path]],
+    scan_task: Callable[[ScanTask], ScanTaskResult],
+    jobs: int = 1,
+) -> Iterator[Tuple[str, Path, Any, bool, str]]:
+    """Scan files through the cache, yielding payloads in input order.
+
+    Cache hits are resolved in the calling process; only misses are sent to
+    ``scan_task`` (through a process pool when ``jobs > 1``). The cache is
+    saved once iteration finishes.
+
+    Args:
+        cache: Open cache, or None to scan every file
+        files: Sequence of (relative path, path) pairs
+        scan_task: Picklable function computing a payload for a task
+        jobs: Number of worker processes
+
+    Yields:
+        Tuples of (relative path, path, payload, parsed, content hash) where
+        parsed is True if the payload was freshly computed rather than taken
+        from the cache. The content hash is empty if it was never computed.
+    """
+    lookups: List[Tuple[str, Path, Optional[os.stat_result], Optional[Any]]] = []
+    tasks: List[ScanTask] = []
+    with phase("cache"):
+        for rel_path, path in files:
+            st: Optional[os.stat_result] = None
+            payload = None
+            known = None
+            if cache is not None:
+                try:
+                    st = path.stat()
+                except OSError:
+                    st = None
+                if st is not None:
+                    payload = cache.get(rel_path, st.st_size, st.st_mtime_ns)
+                    known = cache.known_digest(rel_path)
+            if payload is None:
+                tasks.append((path, known))
+            lookups.append((rel_path, path, st, payload))
+
+    results = parallel_map(scan_task, tasks, jobs=jobs)
+    try:
+        for rel_path, path, st, payload in lookups:
+            if payload is not None:
+                yield rel_path, path, payload, False, cache.known_digest(rel_path) or ""
+                continue
+
+            payload, digest = next(results)
+            if payload is None:
+                # Content unchanged since it was cached, only the stat data moved
+                assert cache is not None and st is not None
+                payload = cache.revalidate(rel_path, st.st_size, st.st_mtime_ns, digest)
+                yield rel_path, path, payload, False, digest
+                continue
+
+            if cache is not None and st is not None and digest:
+                cache.put(rel_path, st.st_size, st.st_mtime_ns, digest, payload)
+            yield rel_path, path, payload, True, digest
+    finally:
+        if cache is not None:
+            cache.save()
@@ -6,14 +6,31 @@ designed to prevent introduction of new legacy imports during development.
 
 from __future__ import annotations
 
-import fnmatch
-import re
+import os
+import posixpath
 import subprocess
 import sys
 from pathlib import Path
-from typing import List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from .tracker import ImportTracker
+from .cache import (
+    ScanCache,
+    ScanTask,
+    ScanTaskResult,
+    cached_scan,
+    content_digest,
+    make_fingerprint,
+)
+from .discovery import DEFAULT_IGNORE_DIRS, discover_py_files, walk_py_files
+from .globs import GlobSet
+from .parallel import resolve_jobs
+from .profiling import phase, timed
+from .scanner import SourceScanner, read_source
+from .shard import Shard, shard_members
+
+# Default extraction engine for checks: the AST parser, as for scans, so both
+# report the same sites even for source that lexes but does not parse
+CHECK_ENGINE = "ast"
 
 
 class LegacyImportChecker:
@@ -23,7 +40,12 @@ class LegacyImportChecker:
         self,
         legacy_patterns: List[str],
         allow_patterns: Optional[List[str]] = None,
-        allow_marker: str = "LEGACY-ALLOW"
+        allow_marker: str = "LEGACY-ALLOW",
+        cache_dir: Optional[str] = None,
+        exclude_patterns: Optional[List[str]] = None,
+        gitignore: bool = True,
+        engine: str = CHECK_ENGINE,
+        mmap_threshold: Optional[int] = None,
     ):
         """Initialize the checker.
         
@@ -31,16 +53,45 @@ class LegacyImportChecker:
             legacy_patterns: List of legacy import patterns to check for
             allow_patterns: List of glob patterns for allowed legacy imports
             allow_marker: Inline marker to allow legacy imports in specific files
+            cache_dir: Directory for the persistent per-file result cache
+                (disabled if None)
+            exclude_patterns: Glob patterns for files and directories to skip
+            gitignore: Skip files and directories ignored by .gitignore files
+            engine: Import extraction engine, 'ast' (default) or 'tokenize'
+            mmap_threshold: Memory-map files of at least this many bytes
+                instead of reading them (never if None); only safe in
+                one-shot checks, see scanner.read_source()
         """
         self.legacy_patterns = legacy_patterns
         self.allow_patterns = allow_patterns or []
+        self._allow = GlobSet(self.allow_patterns)
+        self.exclude_patterns = exclude_patterns or []
+        self._exclude = GlobSet(self.exclude_patterns)
+        self.gitignore = gitignore
         self.allow_marker = allow_marker
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.engine = engine
+        self.mmap_threshold = mmap_threshold
         
-        # Create regex pattern for quick text-based checking
-        escaped_patterns = [re.escape(p) for p in legacy_patterns]
-        pattern_str = r"^\s*(?:from|import)\s+(?:src\.)?(?:" + "|".join(escaped_patterns) + r")\b"
-        self.import_regex = re.compile(pattern_str, re.MULTILINE)
+        # Imports are found by the shared scanning core, with or without 'src.'
+        self._scanner = SourceScanner(legacy_patterns, engine, allow_marker, src_prefix=True)
         
+    @timed("git")
+    def _repo_root(self) -> Path:
+        """Get the repository root directory (the working directory outside one)."""
+        try:
+            result = subprocess.check_output(
+                ["git", "rev-parse", "--show-toplevel"],
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                stderr=subprocess.DEVNULL,
+            ).strip()
+            return Path(result).resolve()
+        except Exception:
+            return Path.cwd().resolve()
+            
+    @timed("git")
     def _resolve_base(self, base: str) -> str:
         """Resolve 'auto' base to an actual commit SHA."""
         if base != "auto":
@@ -86,6 +137,7 @@ class LegacyImportChecker:
             )
             return result.splitlines()[0]
             
+    @timed("git")
     def _get_changed_files(self, base: str) -> List[Path]:
         """Get changed Python files since base commit."""
         base = self._resolve_base(base)
@@ -99,67 +151,123 @@ class LegacyImportChecker:
             )
             files = [Path(p) for p in result.splitlines() if p.strip()]
             # Filter to Python files only
-            return [f for f in files if f.suffix == ".py" and f.exists()]
+            return [
+                f for f in files
+                if f.suffix == ".py"
+                and self._exclude.match(f.as_posix()) is None
+                and f.exists()
+            ]
         except subprocess.CalledProcessError as e:
             print(f"Error getting changed files: {e}", file=sys.stderr)
             return []
             
-    def _get_all_files(self, search_roots: List[str]) -> List[Path]:
-        """Get all Python files in search roots."""
-        files: List[Path] = []
+    @timed("enumerate")
+    def _get_all_files(
+        self,
+        search_roots: List[str],
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+    ) -> List[Path]:
+        """Get all Python files in search roots, pruning ignored directories.
         
-        for root_str in search_roots:
-            root_path = Path(root_str)
-            if not root_path.exists():
-                continue
-            files.extend(p for p in root_path.rglob("*.py") if p.is_file())
-            
-        return files
-        
-    def _is_file_allowed(self, file_path: Path) -> bool:
-        """Check if a file is allowed to have legacy imports."""
-        # Check glob patterns against relative path
-        rel_path = str(file_path)
-        for pattern in self.allow_patterns:
-            if fnmatch.fnmatch(rel_path, pattern):
-                return True
+        With files_from set to 'git' or a file list path, the files are
+        listed from git's index or read from the list instead. Otherwise the
+        walk starts at the repository root, so that .git/info/exclude and the
+        .gitignore files above the working directory apply when running from
+        a subdirectory; search roots, excludes and the returned paths stay
+        relative to the working directory.
+        """
+        if files_from is None:
+            cwd = Path.cwd().resolve()
+            root = self._repo_root()
+            try:
+                prefix = cwd.relative_to(root).as_posix()
+            except ValueError:
+                prefix = "."
+            if prefix != ".":
+                rel_paths = walk_py_files(
+                    str(root),
+                    [posixpath.join(prefix, search_root) for search_root in search_roots],
+                    ignore_dirs=DEFAULT_IGNORE_DIRS,
+                    exclude=GlobSet(
+                        posixpath.join(prefix, pattern) for pattern in self.exclude_patterns
+                    ),
+                    gitignore=self.gitignore,
+                    threads=walk_threads,
+                )
+                return [Path(os.path.relpath(root / rel_path, cwd)) for rel_path in rel_paths]
                 
-        # Check file content for allow marker
-        try:
-            content = file_path.read_text(encoding="utf-8", errors="replace")
-            if self.allow_marker in content:
-                return True
-        except (OSError, UnicodeDecodeError):
-            pass
-            
-        return False
+        rel_paths = discover_py_files(
+            ".",
+            search_roots,
+            files_from=files_from,
+            ignore_dirs=DEFAULT_IGNORE_DIRS,
+            exclude=self._exclude,
+            gitignore=self.gitignore,
+            threads=walk_threads,
+        )
+        return [Path(rel_path) for rel_path in rel_paths]
+        
+    def _select_shard(self, files: List[Path], shard: Shard) -> List[Path]:
+        """Keep the files of one shard, weighted by size, in their original order."""
+        sizes = {}
+        for file_path in files:
+            try:
+                sizes[file_path.as_posix()] = file_path.stat().st_size
+            except OSError:
+                sizes[file_path.as_posix()] = 0
+        members = shard_members(sizes, shard, sizes.__getitem__)
+        return [file_path for file_path in files if file_path.as_posix() in members]
         
-    def _check_file_for_legacy_imports(self, file_path: Path) -> List[Tuple[int, str]]:
-        """Check a single file for legacy imports.
+    def _check_file(self, task: ScanTask) -> ScanTaskResult:
+        """Read and check a single file that is not allowed by glob patterns.
         
+        Args:
+            task: Tuple of (file path, cached content hash or None). If the file
+                still hashes to the cached value, checking is skipped.
+            
         Returns:
-            List of (line_number, import_line) tuples
+            Tuple of (payload, content hash) where payload holds the allow
+            marker flag and the violations as [line_no, import_line] pairs,
+            or is None when the content is unchanged
         """
+        file_path, known_digest = task
         try:
-            content = file_path.read_text(encoding="utf-8", errors="replace")
-        except (OSError, UnicodeDecodeError):
-            return []
-            
-        violations = []
-        for match in self.import_regex.finditer(content):
-            # Calculate line number
-            line_no = content[:match.start()].count('\n') + 1
-            line_content = match.group().strip()
-            violations.append((line_no, line_content))
+            with read_source(file_path, self.mmap_threshold) as data:
+                with phase("hash"):
+                    digest = content_digest(data) if self.cache_dir else ""
+                if known_digest and digest == known_digest:
+                    return None, digest
+                    
+                scan = self._scanner.scan(data, with_lines=True, stop_at_marker=True)
+        except OSError:
+            return {"marker": False, "violations": []}, ""
             
-        return violations
+        if scan.marker:
+            return {"marker": True, "violations": []}, digest
+        violations = [[lineno, line] for (lineno, _), line in zip(scan.sites, scan.lines)]
+        return {"marker": False, "violations": violations}, digest
+        
+    def _open_cache(self) -> Optional[ScanCache]:
+        """Open the persistent result cache for the current settings."""
+        if self.cache_dir is None:
+            return None
+        fingerprint = make_fingerprint(
+            "checker", self.legacy_patterns, [self.allow_marker, self.engine]
+        )
+        return ScanCache.open(str(self.cache_dir), fingerprint)
         
     def check(
         self,
         mode: str = "changed", 
         base: str = "auto",
         search_roots: Optional[List[str]] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        jobs: Union[int, str] = 1,
+        explain_allow: bool = False,
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+        shard: Optional[Shard] = None,
     ) -> Tuple[bool, List[Tuple[Path, List[Tuple[int, str]]]]]:
         """Check for legacy imports.
         
@@ -168,11 +276,19 @@ class LegacyImportChecker:
             base: Base commit for changed mode (default: 'auto')
             search_roots: Directories to search (default: ['src', 'tests'])
             verbose: Enable verbose output
+            jobs: Number of worker processes, or 'auto' for one per CPU
+            explain_allow: Print each skipped file with the marker or glob
+                that allowed it
+            walk_threads: Number of threads listing directories
+            files_from: In 'all' mode, take the files from git's index ('git')
+                or from a NUL- or newline-delimited list ('-' for stdin)
+            shard: (index, count) to check only that part of the file set
             
         Returns:
             Tuple of (success, violations) where violations is a list of
             (file_path, [(line_no, import_line), ...]) tuples
         """
+        jobs = resolve_jobs(jobs)
         if search_roots is None:
             search_roots = ["src", "tests"]
             
@@ -192,7 +308,10 @@ class LegacyImportChecker:
                         continue
             files_to_check = filtered_files
         else:
-            files_to_check = self._get_all_files(search_roots)
+            files_to_check = self._get_all_files(search_roots, walk_threads, files_from)
+            
+        if shard is not None:
+            files_to_check = self._select_shard(files_to_check, shard)
             
         if verbose:
             print(f"Checking {len(files_to_check)} files for legacy imports...", file=sys.stderr)
@@ -200,15 +319,28 @@ class LegacyImportChecker:
         # Check each file
         violations = []
         
+        to_read = []
         for file_path in files_to_check:
-            # Skip allowed files
-            if self._is_file_allowed(file_path):
-                if verbose:
-                    print(f"Skipping allowed file: {file_path}", file=sys.stderr)
+            # Skip files allowed by glob patterns without reading them
+            with phase("allow"):
+                pattern = self._allow.match(str(file_path))
+            if pattern is not None:
+                if verbose or explain_allow:
+                    print(f"Skipping allowed file: {file_path} (glob {pattern})", file=sys.stderr)
+                continue
+            to_read.append((file_path.as_posix(), file_path))
+            
+        results = cached_scan(self._open_cache(), to_read, self._check_file, jobs=jobs)
+        for _, file_path, payload, _, _ in results:
+            if payload["marker"]:
+                if verbose or explain_allow:
+                    print(
+                        f"Skipping allowed file: {file_path} ({self.allow_marker} marker)",
+                        file=sys.stderr,
+                    )
                 continue
                 
-            # Check for legacy imports
-            file_violations = self._check_file_for_legacy_imports(file_path)
+            file_violations = [(line_no, line) for line_no, line in payload["violations"]]
             if file_violations:
                 violations.append((file_path, file_violations))
                 if verbose:
@@ -217,6 +349,28 @@ class LegacyImportChecker:
         success = len(violations) == 0
         return success, violations
         
+    @staticmethod
+    def violations_to_dict(
+        violations: List[Tuple[Path, List[Tuple[int, str]]]],
+        shard: Optional[Shard] = None,
+    ) -> Dict[str, Any]:
+        """Convert violations to a dictionary for JSON output."""
+        result: Dict[str, Any] = {
+            "version": "1.0",
+            "violations": [
+                {
+                    "path": Path(file_path).as_posix(),
+                    "imports": [
+                        {"lineno": line_no, "line": line} for line_no, line in file_violations
+                    ],
+                }
+                for file_path, file_violations in violations
+            ],
+        }
+        if shard:
+            result["shard"] = {"index": shard[0], "count": shard[1]}
+        return result
+        
     def format_violations(self, violations: List[Tuple[Path, List[Tuple[int, str]]]]) -> str:
         """Format violations for display."""
         if not violations:
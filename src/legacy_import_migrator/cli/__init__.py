@@ -1,13 +1,40 @@
 """Command Line Interface for Legacy Import Migrator."""
 
+from importlib import import_module
+from typing import Dict, List, Optional
+
 import click
 
-from .baseline import baseline_command
-from .check import check_command
-from .scan import scan_command
+# Subcommands by name, as (module, attribute); a module is imported only when
+# its command runs or help lists the commands
+COMMANDS: Dict[str, tuple] = {
+    "scan": (".scan", "scan_command"),
+    "check": (".check", "check_command"),
+    "baseline": (".baseline", "baseline_command"),
+    "graph": (".graph", "graph_group"),
+    "history": (".history", "history_command"),
+    "merge": (".merge", "merge_command"),
+    "migrate": (".migrate", "migrate_command"),
+    "watch": (".watch", "watch_command"),
+    "serve": (".serve", "serve_command"),
+}
+
+
+class LazyGroup(click.Group):
+    """Command group importing subcommand modules on demand."""
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(COMMANDS) | set(super().list_commands(ctx)))
 
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        target = COMMANDS.get(cmd_name)
+        if target is None:
+            return super().get_command(ctx, cmd_name)
+        module, attribute = target
+        return getattr(import_module(module, __name__), attribute)
 
-@click.group()
+
+@click.group(cls=LazyGroup)
 @click.version_option()
 def main():
     """Legacy Import Migration Toolkit (LIM).
@@ -17,10 +44,5 @@ def main():
     pass
 
 
-main.add_command(scan_command)
-main.add_command(check_command)
-main.add_command(baseline_command)
-
-
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
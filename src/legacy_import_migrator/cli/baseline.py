@@ -2,12 +2,14 @@
 
 import sys
 from pathlib import Path
+from typing import Optional
 
 import click
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from ..parallel import resolve_jobs
+from ..scanner import mmap_threshold
 from ..tracker import ImportTracker
+from .profiling import profile_options
 
 
 @click.command("baseline")
@@ -16,6 +18,10 @@ from ..tracker import ImportTracker
     is_flag=True,
     help="Write current state as new baseline"
 )
+@click.option(
+    "--rev",
+    help="With --write, scan this commit (read from git) instead of the working tree"
+)
 @click.option(
     "--roots",
     default="src,tests",
@@ -36,17 +42,68 @@ from ..tracker import ImportTracker
     default=".cache/migration_baseline.json",
     help="Path to baseline file"
 )
+@click.option(
+    "--engine",
+    type=click.Choice(["ast", "tokenize"]),
+    default="ast",
+    help="Import extraction engine: full 'ast' parse or faster 'tokenize' scan"
+)
+@click.option(
+    "--files-from",
+    help="Take files from git's index ('git') or a NUL/newline-separated list (FILE or '-')"
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob patterns for files or directories to skip (can be used multiple times)"
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Do not skip files ignored by .gitignore"
+)
+@click.option(
+    "--walk-threads",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Threads listing directories concurrently, useful on network filesystems"
+)
+@click.option(
+    "--cache-dir",
+    default=".cache/lim-index",
+    help="Directory for the persistent per-file result cache"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Disable the persistent result cache"
+)
+@click.option(
+    "--jobs",
+    default="1",
+    help="Number of worker processes, or 'auto' for one per CPU (default: 1)"
+)
 @click.option(
     "--verbose",
     is_flag=True,
     help="Enable verbose output"
 )
+@profile_options
 def baseline_command(
     write: bool,
+    rev: Optional[str],
     roots: str,
     legacy_patterns: str,
     allow: tuple[str],
     baseline_file: str,
+    engine: str,
+    files_from: Optional[str],
+    exclude: tuple[str],
+    no_gitignore: bool,
+    walk_threads: int,
+    cache_dir: str,
+    no_cache: bool,
+    jobs: str,
     verbose: bool,
 ) -> None:
     """Manage migration baseline for tracking progress.
@@ -54,6 +111,9 @@ def baseline_command(
     The baseline represents the initial state of legacy imports when migration
     tracking began. Progress is measured against this baseline.
     """
+    from rich.console import Console
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
     console = Console()
     
     # Parse inputs
@@ -64,12 +124,23 @@ def baseline_command(
     if not pattern_list:
         console.print("❌ Error: --legacy-patterns is required", style="red")
         sys.exit(1)
+
+    try:
+        worker_count = resolve_jobs(jobs)
+    except ValueError as e:
+        console.print(f"❌ Error: {e}", style="red")
+        sys.exit(1)
     
     # Create tracker
     tracker = ImportTracker(
         legacy_patterns=pattern_list,
         allow_patterns=allow_list,
-        baseline_file=baseline_file
+        baseline_file=baseline_file,
+        cache_dir=None if no_cache else cache_dir,
+        exclude_patterns=list(exclude),
+        gitignore=not no_gitignore,
+        engine=engine,
+        mmap_threshold=mmap_threshold(),
     )
     
     baseline_path = Path(baseline_file)
@@ -90,7 +161,12 @@ def baseline_command(
                 result = tracker.scan(
                     scope="all",
                     search_roots=search_roots,
-                    verbose=verbose
+                    verbose=verbose,
+                    jobs=worker_count,
+                    walk_threads=walk_threads,
+                    files_from=files_from,
+                    build_index=True,
+                    rev=rev,
                 )
                 
                 # Write as baseline
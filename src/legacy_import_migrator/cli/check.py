@@ -1,12 +1,20 @@
 """Check command for legacy import violations in CI."""
 
+import json
 import sys
+from pathlib import Path
 from typing import List, Optional
 
 import click
-from rich.console import Console
 
+from .. import profiling
 from ..checker import LegacyImportChecker
+from ..daemon import forward
+from ..parallel import resolve_jobs
+from ..scanner import mmap_threshold
+from ..shard import parse_shard
+from .console import make_console
+from .profiling import profile_options
 
 
 @click.command("check")
@@ -41,11 +49,78 @@ from ..checker import LegacyImportChecker
     default="LEGACY-ALLOW",
     help="Inline marker to allow legacy imports in specific files"
 )
+@click.option(
+    "--explain-allow",
+    is_flag=True,
+    help="Print each allowed file with the marker or glob pattern that allowed it"
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["ast", "tokenize"]),
+    default="ast",
+    help="Import extraction engine: full 'ast' parse (default) or faster 'tokenize' scan"
+)
+@click.option(
+    "--files-from",
+    help="Take files from git's index ('git') or a NUL/newline-separated list (FILE or '-')"
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob patterns for files or directories to skip (can be used multiple times)"
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Do not skip files ignored by .gitignore"
+)
+@click.option(
+    "--walk-threads",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Threads listing directories concurrently, useful on network filesystems"
+)
+@click.option(
+    "--shard",
+    help="Check only part i of n of the file set (e.g. 2/4); combine parts with 'lim merge'"
+)
+@click.option(
+    "--json-out",
+    type=click.Path(),
+    help="Also write the violations to a JSON file"
+)
+@click.option(
+    "--cache-dir",
+    default=".cache/lim-index",
+    help="Directory for the persistent per-file result cache"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Disable the persistent result cache"
+)
+@click.option(
+    "--jobs",
+    default="1",
+    help="Number of worker processes, or 'auto' for one per CPU (default: 1)"
+)
+@click.option(
+    "--plain/--rich",
+    default=None,
+    help="Plain text output without colors (default when stdout is not a terminal)"
+)
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    envvar="LIM_NO_DAEMON",
+    help="Run in-process even if a 'lim serve' daemon is running"
+)
 @click.option(
     "--verbose",
     is_flag=True,
     help="Enable verbose output"
 )
+@profile_options
 def check_command(
     mode: str,
     base: str,
@@ -53,6 +128,19 @@ def check_command(
     legacy_patterns: str,
     allow: tuple[str],
     allow_marker: str,
+    explain_allow: bool,
+    engine: str,
+    files_from: Optional[str],
+    exclude: tuple[str],
+    no_gitignore: bool,
+    walk_threads: int,
+    shard: Optional[str],
+    json_out: Optional[str],
+    cache_dir: str,
+    no_cache: bool,
+    jobs: str,
+    plain: Optional[bool],
+    no_daemon: bool,
     verbose: bool,
 ) -> None:
     """Check for legacy import violations (CI-oriented).
@@ -60,7 +148,12 @@ def check_command(
     This command is designed for CI environments to prevent introduction
     of new legacy imports. It exits with code 2 if violations are found.
     """
-    console = Console()
+    if not no_daemon and files_from != "-" and profiling.active() is None:
+        exit_code = forward("check", click.get_current_context().params, (json_out,))
+        if exit_code is not None:
+            sys.exit(exit_code)
+    
+    console = make_console(plain)
     
     # Parse inputs
     search_roots = [r.strip() for r in roots.split(",") if r.strip()]
@@ -70,12 +163,24 @@ def check_command(
     if not pattern_list:
         console.print("❌ Error: --legacy-patterns is required", style="red")
         sys.exit(1)
+
+    try:
+        worker_count = resolve_jobs(jobs)
+        shard_spec = parse_shard(shard) if shard else None
+    except ValueError as e:
+        console.print(f"❌ Error: {e}", style="red")
+        sys.exit(1)
     
     # Create checker
     checker = LegacyImportChecker(
         legacy_patterns=pattern_list,
         allow_patterns=allow_list,
-        allow_marker=allow_marker
+        allow_marker=allow_marker,
+        cache_dir=None if no_cache else cache_dir,
+        exclude_patterns=list(exclude),
+        gitignore=not no_gitignore,
+        engine=engine,
+        mmap_threshold=mmap_threshold(),
     )
     
     if verbose:
@@ -92,7 +197,12 @@ def check_command(
             mode=mode,
             base=base,
             search_roots=search_roots,
-            verbose=verbose
+            verbose=verbose,
+            jobs=worker_count,
+            explain_allow=explain_allow,
+            walk_threads=walk_threads,
+            files_from=files_from,
+            shard=shard_spec,
         )
     except Exception as e:
         if verbose:
@@ -103,6 +213,13 @@ def check_command(
             console.print(f"❌ Check failed: {e}", style="red")
         sys.exit(1)
     
+    if json_out:
+        output_path = Path(json_out)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            document = checker.violations_to_dict(violations, shard_spec)
+            json.dump(profiling.attach(document), f, indent=2)
+            
     # Display results
     result_text = checker.format_violations(violations)
     
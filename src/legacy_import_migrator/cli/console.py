@@ -0,0 +1,85 @@
+"""Console selection for command output."""
+
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from ..daemon import TERMINAL_ENV
+
+# Terminal of the daemon client a served command renders for; see client_terminal()
+_client: Optional[Dict[str, Any]] = None
+
+
+class PlainConsole:
+    """Stand-in for rich's Console that writes unstyled text.
+
+    Importing rich costs more than a whole cached check of a small change set,
+    so commands offering plain output use this instead.
+    """
+
+    def __init__(self, file: Optional[TextIO] = None):
+        self._file = file
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", **_rich_options: Any) -> None:
+        """Write objects like print().
+
+        Rich's styling options such as ``style`` are accepted and ignored.
+        """
+        file = self._file or sys.stdout
+        file.write(sep.join(str(obj) for obj in objects) + end)
+
+
+@contextmanager
+def client_terminal(terminal: Optional[Dict[str, Any]]) -> Iterator[None]:
+    """Render consoles made inside the block for a daemon client's terminal.
+
+    The daemon captures a served command's output, so its own stdout is never
+    a terminal; the client's terminal state and color settings are used instead.
+
+    Args:
+        terminal: {'tty', 'width', 'env'} as sent by daemon.forward(), or None
+            to keep the daemon's own settings
+    """
+    global _client
+    if terminal is None:
+        yield
+        return
+    saved = {name: os.environ.pop(name, None) for name in TERMINAL_ENV}
+    os.environ.update(
+        {name: value for name, value in (terminal.get("env") or {}).items() if name in TERMINAL_ENV}
+    )
+    _client = terminal
+    try:
+        yield
+    finally:
+        _client = None
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def is_served() -> bool:
+    """Tell whether output is captured for a daemon client and replayed later."""
+    return _client is not None
+
+
+def make_console(plain: Optional[bool] = None):
+    """Return a rich Console, or a PlainConsole for plain output.
+
+    Args:
+        plain: Force plain (True) or rich (False) output; None chooses plain
+            output when stdout (the client's, for a served command) is not
+            a terminal
+    """
+    tty = _client["tty"] if _client is not None else sys.stdout.isatty()
+    if plain is None:
+        plain = not tty
+    if plain:
+        return PlainConsole()
+    from rich.console import Console
+    if _client is not None:
+        return Console(force_terminal=tty, width=_client.get("width"))
+    return Console()
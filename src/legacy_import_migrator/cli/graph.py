@@ -0,0 +1,203 @@
+"""Graph commands building and querying the whole-repository import graph."""
+
+import json
+import sys
+import time
+from typing import List
+
+import click
+
+from .. import profiling
+from ..graph import DEFAULT_GRAPH_FILE, ImportGraph
+from ..parallel import resolve_jobs
+from .profiling import profile_options
+
+GRAPH_FILE_HELP = f"Saved import graph (default: {DEFAULT_GRAPH_FILE})"
+
+
+def _load(graph_file: str) -> ImportGraph:
+    """Load the saved graph, or exit with a hint to build it."""
+    try:
+        return ImportGraph.load(graph_file)
+    except FileNotFoundError:
+        click.echo(
+            f"❌ Error: no import graph at {graph_file}; run 'lim graph build' first", err=True
+        )
+    except (OSError, ValueError) as e:
+        click.echo(f"❌ Error: cannot read import graph: {e}", err=True)
+    sys.exit(1)
+
+
+def _patterns(patterns: str) -> List[str]:
+    """Split comma-separated module patterns."""
+    pattern_list = [p.strip() for p in patterns.split(",") if p.strip()]
+    if not pattern_list:
+        click.echo("❌ Error: at least one module pattern is required", err=True)
+        sys.exit(1)
+    return pattern_list
+
+
+@click.group("graph")
+def graph_group() -> None:
+    """Build the import graph and query transitive legacy dependencies.
+
+    'lim graph build' extracts every import once (through the result cache)
+    and saves the graph; 'reach' and 'blast-radius' answer from the saved
+    graph without rescanning.
+    """
+
+
+@graph_group.command("build")
+@click.option(
+    "--roots",
+    default="src,tests",
+    help="Comma-separated list of root directories to search"
+)
+@click.option(
+    "--files-from",
+    help="Take files from git's index ('git') or a NUL/newline-separated list (FILE or '-')"
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob patterns for files or directories to skip (can be used multiple times)"
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Do not skip files ignored by .gitignore"
+)
+@click.option(
+    "--walk-threads",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Threads listing directories concurrently, useful on network filesystems"
+)
+@click.option(
+    "--cache-dir",
+    default=".cache/lim-index",
+    help="Directory for the persistent per-file result cache"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Disable the persistent result cache"
+)
+@click.option(
+    "--jobs",
+    default="1",
+    help="Number of worker processes, or 'auto' for one per CPU (default: 1)"
+)
+@click.option("--graph-file", default=DEFAULT_GRAPH_FILE, help=GRAPH_FILE_HELP)
+@profile_options
+def build_command(
+    roots: str,
+    files_from: str,
+    exclude: tuple[str],
+    no_gitignore: bool,
+    walk_threads: int,
+    cache_dir: str,
+    no_cache: bool,
+    jobs: str,
+    graph_file: str,
+) -> None:
+    """Extract every import in the search roots and save the import graph."""
+    from ..tracker import ImportTracker, ScanStats
+
+    search_roots = [r.strip() for r in roots.split(",") if r.strip()]
+    try:
+        worker_count = resolve_jobs(jobs)
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+    tracker = ImportTracker(
+        cache_dir=None if no_cache else cache_dir,
+        exclude_patterns=list(exclude),
+        gitignore=not no_gitignore,
+    )
+    stats = ScanStats()
+    start = time.perf_counter()
+    graph = tracker.build_graph(
+        search_roots=search_roots,
+        jobs=worker_count,
+        walk_threads=walk_threads,
+        files_from=files_from,
+        stats=stats,
+    )
+    graph.save(graph_file)
+
+    click.echo(
+        f"📊 Import graph: {len(graph.paths)} repository modules, "
+        f"{len(graph.nodes) - len(graph.paths)} external, {graph.edge_count} edges "
+        f"({stats.files_parsed} files parsed, {time.perf_counter() - start:.2f}s)"
+    )
+    click.echo(f"📄 Saved to {graph_file}")
+
+
+@graph_group.command("reach")
+@click.argument("module")
+@click.option(
+    "--legacy-patterns",
+    required=True,
+    help="Comma-separated list of legacy import patterns to look for"
+)
+@click.option("--graph-file", default=DEFAULT_GRAPH_FILE, help=GRAPH_FILE_HELP)
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+@profile_options
+def reach_command(module: str, legacy_patterns: str, graph_file: str, as_json: bool) -> None:
+    """List the legacy modules MODULE depends on, directly or transitively.
+
+    MODULE is a dotted module name or the path of its file. Each legacy
+    module is shown with a shortest import chain leading to it.
+    """
+    pattern_list = _patterns(legacy_patterns)
+    graph = _load(graph_file)
+    start = graph.lookup(module)
+    if start is None:
+        click.echo(f"❌ Error: module {module} is not in the import graph", err=True)
+        sys.exit(1)
+
+    chains = sorted(
+        graph.reach(start, graph.matching(pattern_list)),
+        key=lambda chain: (len(chain), chain[-1]),
+    )
+    if as_json:
+        document = {"module": graph.nodes[start], "reaches": chains}
+        click.echo(json.dumps(profiling.attach(document), indent=2))
+        return
+    if not chains:
+        click.echo(f"✅ {graph.nodes[start]} does not depend on legacy modules")
+        return
+    click.echo(f"{graph.nodes[start]} reaches {len(chains)} legacy modules:")
+    for chain in chains:
+        click.echo(f"  {chain[-1]}: {' -> '.join(chain)}")
+
+
+@graph_group.command("blast-radius")
+@click.argument("legacy_pattern")
+@click.option("--graph-file", default=DEFAULT_GRAPH_FILE, help=GRAPH_FILE_HELP)
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+@profile_options
+def blast_radius_command(legacy_pattern: str, graph_file: str, as_json: bool) -> None:
+    """List the repository modules depending on LEGACY_PATTERN, directly or transitively.
+
+    Modules are ordered by the number of import hops to the nearest module
+    matching the pattern.
+    """
+    pattern_list = _patterns(legacy_pattern)
+    graph = _load(graph_file)
+    radius = graph.blast_radius(graph.matching(pattern_list))
+
+    if as_json:
+        click.echo(json.dumps(profiling.attach({
+            "pattern": legacy_pattern,
+            "modules": [
+                {"module": name, "path": graph.paths[graph.node_id(name)], "hops": hops}
+                for name, hops in radius
+            ],
+        }), indent=2))
+        return
+    click.echo(f"{len(radius)} repository modules depend on {legacy_pattern}:")
+    for name, hops in radius:
+        click.echo(f"  {hops:3d}  {name} ({graph.paths[graph.node_id(name)]})")
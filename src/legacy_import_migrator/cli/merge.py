@@ -0,0 +1,48 @@
+"""Merge command combining the results of sharded scans and checks."""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from .. import profiling
+from ..merge import merge_parts
+from .profiling import profile_options
+
+
+@click.command("merge")
+@click.argument("parts", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--json-out",
+    type=click.Path(),
+    help="Write the merged result to this file instead of stdout"
+)
+@profile_options
+def merge_command(parts: tuple[str], json_out: Optional[str]) -> None:
+    """Combine partial results of 'lim scan --shard' or 'lim check --shard'.
+    
+    PARTS are the JSON files written by every shard of one run. The merged
+    document is the one an unsharded run would have written. Merging check
+    results exits with code 2 if any violations are found.
+    """
+    try:
+        documents = []
+        for part in parts:
+            with open(part, "r", encoding="utf-8") as f:
+                documents.append(json.load(f))
+        merged = merge_parts(documents)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        click.echo(f"❌ Error: cannot merge results: {e}", err=True)
+        sys.exit(1)
+    
+    text = json.dumps(profiling.attach(merged), indent=2)
+    if json_out:
+        output_path = Path(json_out)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(text + "\n", encoding="utf-8")
+    else:
+        click.echo(text)
+    
+    sys.exit(2 if merged.get("violations") else 0)
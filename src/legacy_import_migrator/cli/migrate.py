@@ -0,0 +1,148 @@
+"""Migrate command rewriting legacy imports to their new module names."""
+
+import sys
+import time
+from typing import Optional
+
+import click
+
+from ..migrate import ImportMigrator, parse_mapping
+from ..parallel import resolve_jobs
+from .profiling import profile_options
+
+
+@click.command("migrate")
+@click.option(
+    "--map",
+    "maps",
+    multiple=True,
+    required=True,
+    help="Module rename as old=new, e.g. old_pkg=new_pkg (can be used multiple times)"
+)
+@click.option(
+    "--roots",
+    default="src,tests",
+    help="Comma-separated list of root directories to search"
+)
+@click.option(
+    "--allow",
+    multiple=True,
+    help="Glob patterns for files that keep their legacy imports (can be used multiple times)"
+)
+@click.option(
+    "--files-from",
+    help="Take files from git's index ('git') or a NUL/newline-separated list (FILE or '-')"
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob patterns for files or directories to skip (can be used multiple times)"
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Do not skip files ignored by .gitignore"
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Print a unified diff instead of rewriting files"
+)
+@click.option(
+    "--cache-dir",
+    default=".cache/lim-index",
+    help="Directory for the persistent per-file result cache"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Disable the persistent result cache"
+)
+@click.option(
+    "--jobs",
+    default="1",
+    help="Number of worker processes, or 'auto' for one per CPU (default: 1)"
+)
+@click.option(
+    "--verbose",
+    is_flag=True,
+    help="Print every rewritten file"
+)
+@profile_options
+def migrate_command(
+    maps: tuple[str],
+    roots: str,
+    allow: tuple[str],
+    files_from: Optional[str],
+    exclude: tuple[str],
+    no_gitignore: bool,
+    dry_run: bool,
+    cache_dir: str,
+    no_cache: bool,
+    jobs: str,
+    verbose: bool,
+) -> None:
+    """Rewrite legacy imports in place after --map old=new module renames.
+
+    Only files with blocking legacy imports are touched: files matching
+    --allow or carrying a LEGACY-ALLOW marker keep their imports. Module
+    names are replaced where they stand, so formatting and comments are
+    preserved, and each file is replaced atomically. Relative imports are
+    never rewritten. With --dry-run, the changes are printed as a unified
+    diff and exit code 2 reports that files would change.
+    """
+    search_roots = [r.strip() for r in roots.split(",") if r.strip()]
+    try:
+        mapping = parse_mapping(maps)
+        worker_count = resolve_jobs(jobs)
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+    migrator = ImportMigrator(
+        mapping,
+        allow_patterns=list(allow),
+        cache_dir=None if no_cache else cache_dir,
+        exclude_patterns=list(exclude),
+        gitignore=not no_gitignore,
+    )
+
+    files_changed = 0
+    changes = 0
+    failed = 0
+    start = time.perf_counter()
+    for result in migrator.migrate(
+        search_roots=search_roots,
+        jobs=worker_count,
+        files_from=files_from,
+        dry_run=dry_run,
+    ):
+        if result.error:
+            failed += 1
+            click.echo(f"⚠️  Skipped {result.path}: {result.error}", err=True)
+            continue
+        if not result.changes:
+            continue
+        files_changed += 1
+        changes += result.changes
+        if dry_run:
+            click.echo(result.diff, nl=False)
+        elif verbose:
+            click.echo(f"✏️  {result.path}: {result.changes} imports", err=True)
+        for lineno, old, new in result.rebinds:
+            click.echo(
+                f"💡 {result.path}:{lineno}: 'import {new}' binds {new.split('.')[0]}, "
+                f"not {old.split('.')[0]}; update references to it",
+                err=True,
+            )
+
+    verb = "Would rewrite" if dry_run else "Rewrote"
+    click.echo(
+        f"📊 {verb} {changes} imports in {files_changed} files "
+        f"({time.perf_counter() - start:.2f}s)",
+        err=True,
+    )
+    if failed:
+        sys.exit(1)
+    if dry_run and files_changed:
+        sys.exit(2)
@@ -0,0 +1,47 @@
+"""--profile and --trace-out options shared by every command."""
+
+import functools
+from typing import Any, Callable
+
+import click
+
+from .. import profiling
+
+
+def profile_options(command: Callable[..., Any]) -> Callable[..., Any]:
+    """Add --profile, --profile-top and --trace-out to a command callback.
+
+    While the command runs, a profiler collects phase timers and per-file
+    timings; its summary is printed to stderr when the command ends, even if
+    it exits early, and commands writing JSON add it as a 'profile' block.
+    """
+    @click.option(
+        "--profile",
+        is_flag=True,
+        help="Time each phase and file, and print a profile to stderr"
+    )
+    @click.option(
+        "--profile-top",
+        type=click.IntRange(min=1),
+        default=profiling.DEFAULT_SLOWEST,
+        help="Number of slowest files listed by --profile"
+    )
+    @click.option(
+        "--trace-out",
+        type=click.Path(dir_okay=False),
+        help="Write a Chrome trace-event file for Perfetto (implies --profile)"
+    )
+    @functools.wraps(command)
+    def wrapper(*args: Any, profile: bool, profile_top: int, trace_out: str, **kwargs: Any) -> Any:
+        if not (profile or trace_out):
+            return command(*args, **kwargs)
+        profiler = profiling.start(slowest=profile_top, trace=trace_out is not None)
+        try:
+            return command(*args, **kwargs)
+        finally:
+            profiling.stop()
+            click.echo(profiler.format_summary(), err=True)
+            if trace_out:
+                profiler.write_trace(trace_out)
+                click.echo(f"📄 Trace written to {trace_out}", err=True)
+    return wrapper
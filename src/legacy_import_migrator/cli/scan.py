@@ -2,14 +2,25 @@
 
 import json
 import sys
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import click
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from .. import profiling
+from ..daemon import forward
+from ..metrics import scan_metrics, write_metrics
+from ..parallel import resolve_jobs
+from ..scanner import mmap_threshold
+from ..shard import parse_shard
+from ..sites import SiteTable
 from ..tracker import ImportTracker
+from .console import is_served, make_console
+from .profiling import profile_options
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 
 @click.command("scan")
@@ -24,6 +35,10 @@ from ..tracker import ImportTracker
     default="auto",
     help="Base commit for changed files (auto-detected if 'auto')"
 )
+@click.option(
+    "--rev",
+    help="Scan the files of this commit, read from git's object store, instead of the working tree"
+)
 @click.option(
     "--roots",
     default="src,tests",
@@ -44,6 +59,21 @@ from ..tracker import ImportTracker
     type=click.Path(),
     help="Output results to JSON file"
 )
+@click.option(
+    "--sites-out",
+    type=click.Path(),
+    help="Stream every legacy import site to an NDJSON file while scanning"
+)
+@click.option(
+    "--metrics-out",
+    type=click.Path(dir_okay=False),
+    help="Write counts and timings to an OpenMetrics text file (node_exporter textfile format)"
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Rescan only files changed since the baseline commit, using the baseline's file index"
+)
 @click.option(
     "--fail-when-blocking",
     is_flag=True,
@@ -54,24 +84,123 @@ from ..tracker import ImportTracker
     is_flag=True,
     help="Print files with blocking imports"
 )
+@click.option(
+    "--explain-allow",
+    is_flag=True,
+    help="Print each allowed file with the marker or glob pattern that allowed it"
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["ast", "tokenize"]),
+    default="ast",
+    help="Import extraction engine: full 'ast' parse or faster 'tokenize' scan"
+)
+@click.option(
+    "--files-from",
+    help="Take files from git's index ('git') or a NUL/newline-separated list (FILE or '-')"
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob patterns for files or directories to skip (can be used multiple times)"
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Do not skip files ignored by .gitignore"
+)
+@click.option(
+    "--walk-threads",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Threads listing directories concurrently, useful on network filesystems"
+)
+@click.option(
+    "--io-concurrency",
+    type=click.IntRange(min=1),
+    help="Scan with asyncio, keeping up to N file reads in flight (for network filesystems)"
+)
+@click.option(
+    "--read-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="With --io-concurrency, fail if reading a single file takes longer (seconds)"
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="With --io-concurrency, fail if the scan takes longer (seconds)"
+)
+@click.option(
+    "--shard",
+    help="Scan only part i of n of the file set (e.g. 2/4); combine parts with 'lim merge'"
+)
+@click.option(
+    "--cache-dir",
+    default=".cache/lim-index",
+    help="Directory for the persistent per-file result cache"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Disable the persistent result cache"
+)
+@click.option(
+    "--jobs",
+    default="1",
+    help="Number of worker processes, or 'auto' for one per CPU (default: 1)"
+)
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    envvar="LIM_NO_DAEMON",
+    help="Run in-process even if a 'lim serve' daemon is running"
+)
 @click.option(
     "--verbose",
     is_flag=True,
     help="Enable verbose output"
 )
+@profile_options
 def scan_command(
     scope: str,
     base: str,
+    rev: Optional[str],
     roots: str,
     legacy_patterns: str,
     allow: tuple[str],
     json_out: Optional[str],
+    sites_out: Optional[str],
+    metrics_out: Optional[str],
+    incremental: bool,
     fail_when_blocking: bool,
     print_files: bool,
+    explain_allow: bool,
+    engine: str,
+    files_from: Optional[str],
+    exclude: tuple[str],
+    no_gitignore: bool,
+    walk_threads: int,
+    io_concurrency: Optional[int],
+    read_timeout: Optional[float],
+    timeout: Optional[float],
+    shard: Optional[str],
+    cache_dir: str,
+    no_cache: bool,
+    jobs: str,
+    no_daemon: bool,
     verbose: bool,
 ) -> None:
     """Scan for legacy imports and report progress."""
-    console = Console()
+    if not no_daemon and files_from != "-" and profiling.active() is None:
+        exit_code = forward(
+            "scan", click.get_current_context().params, (json_out, sites_out, metrics_out)
+        )
+        if exit_code is not None:
+            sys.exit(exit_code)
+    
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
+    console = make_console(plain=False)
     
     # Parse inputs
     search_roots = [r.strip() for r in roots.split(",") if r.strip()]
@@ -81,19 +210,61 @@ def scan_command(
     if not pattern_list:
         console.print("❌ Error: --legacy-patterns is required", style="red")
         sys.exit(1)
+
+    try:
+        worker_count = resolve_jobs(jobs)
+        shard_spec = parse_shard(shard) if shard else None
+    except ValueError as e:
+        console.print(f"❌ Error: {e}", style="red")
+        sys.exit(1)
+    
+    if rev and (scope != "all" or incremental):
+        console.print("❌ Error: --rev requires --scope all and no --incremental", style="red")
+        sys.exit(1)
+        
+    if shard and (rev or incremental):
+        console.print("❌ Error: --shard cannot be used with --rev or --incremental", style="red")
+        sys.exit(1)
+        
+    if io_concurrency and (rev or incremental):
+        console.print(
+            "❌ Error: --io-concurrency cannot be used with --rev or --incremental", style="red"
+        )
+        sys.exit(1)
+        
+    if (read_timeout or timeout) and not io_concurrency:
+        console.print("❌ Error: --read-timeout and --timeout need --io-concurrency", style="red")
+        sys.exit(1)
     
     # Create tracker
     tracker = ImportTracker(
         legacy_patterns=pattern_list,
-        allow_patterns=allow_list
+        allow_patterns=allow_list,
+        cache_dir=None if no_cache else cache_dir,
+        exclude_patterns=list(exclude),
+        gitignore=not no_gitignore,
+        engine=engine,
+        mmap_threshold=mmap_threshold(),
     )
     
+    # Metrics need every site for the per-root and per-pattern breakdowns,
+    # and phase timings for the duration histograms
+    site_table = None
+    own_profiler = False
+    if metrics_out:
+        site_table = SiteTable()
+        if profiling.active() is None:
+            profiling.start(slowest=0)
+            own_profiler = True
+    profiler = profiling.active()
+    
     # Perform scan with progress indicator
-    with Progress(
+    with ExitStack() as outputs, Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
-        disable=json_out is not None  # Disable progress bar for JSON output
+        # No progress bar for JSON output, nor when output is replayed by a daemon client
+        disable=json_out is not None or is_served(),
     ) as progress:
         task = progress.add_task(
             f"Scanning {scope} files for legacy imports...", 
@@ -101,12 +272,54 @@ def scan_command(
         )
         
         try:
-            result = tracker.scan(
-                scope=scope,
-                base=base if base != "auto" else None,
-                search_roots=search_roots,
-                verbose=verbose
-            )
+            # Stream sites as NDJSON, one line-buffered record per site
+            on_site = None
+            if sites_out:
+                sites_path = Path(sites_out)
+                sites_path.parent.mkdir(parents=True, exist_ok=True)
+                sites_file = outputs.enter_context(
+                    open(sites_path, "w", encoding="utf-8", buffering=1)
+                )
+                repo_root = tracker.repo_root()
+                
+                def on_site(site) -> None:
+                    sites_file.write(json.dumps(site.to_dict(repo_root)) + "\n")
+            
+            if io_concurrency:
+                import asyncio
+                
+                result = asyncio.run(tracker.ascan(
+                    scope=scope,
+                    base=base if base != "auto" else None,
+                    search_roots=search_roots,
+                    verbose=verbose,
+                    jobs=worker_count,
+                    explain_allow=explain_allow,
+                    walk_threads=walk_threads,
+                    files_from=files_from,
+                    on_site=on_site,
+                    shard=shard_spec,
+                    site_table=site_table,
+                    io_concurrency=io_concurrency,
+                    read_timeout=read_timeout,
+                    timeout=timeout,
+                ))
+            else:
+                result = tracker.scan(
+                    scope=scope,
+                    base=base if base != "auto" else None,
+                    search_roots=search_roots,
+                    verbose=verbose,
+                    jobs=worker_count,
+                    explain_allow=explain_allow,
+                    walk_threads=walk_threads,
+                    files_from=files_from,
+                    on_site=on_site,
+                    incremental=incremental,
+                    rev=rev,
+                    shard=shard_spec,
+                    site_table=site_table,
+                )
         except Exception as e:
             if verbose:
                 import traceback
@@ -115,11 +328,20 @@ def scan_command(
             else:
                 console.print(f"❌ Scan failed: {e}", style="red")
             sys.exit(1)
+        finally:
+            if own_profiler:
+                profiling.stop()
+    
+    if metrics_out:
+        write_metrics(
+            metrics_out,
+            scan_metrics(result, search_roots, pattern_list, site_table, profiler),
+        )
     
     # Output results
     if json_out:
         # JSON output
-        json_data = result.to_dict()
+        json_data = profiling.attach(result.to_dict())
         output_path = Path(json_out)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -137,7 +359,7 @@ def scan_command(
         sys.exit(2)
 
 
-def _print_results(console: Console, result, print_files: bool, verbose: bool) -> None:
+def _print_results(console: "Console", result, print_files: bool, verbose: bool) -> None:
     """Print human-readable results."""
     console.print()
     console.print("📊 Legacy Import Migration Progress", style="bold blue")
@@ -146,6 +368,10 @@ def _print_results(console: Console, result, print_files: bool, verbose: bool) -
     # Summary
     console.print(f"Repository: {result.repo_root.name}")
     console.print(f"Scope: {result.scope}")
+    if result.rev:
+        console.print(f"Revision: {result.rev[:8]}")
+    if result.shard:
+        console.print(f"Shard: {result.shard[0]}/{result.shard[1]}")
     console.print(f"Files scanned: {result.files_scanned}")
     console.print()
     
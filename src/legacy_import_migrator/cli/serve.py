@@ -0,0 +1,139 @@
+"""Serve command running a warm daemon for scan and check."""
+
+import io
+import os
+import signal
+import socket
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, Optional
+
+import click
+
+from ..cache import flush_resident, keep_resident
+from ..daemon import request, serve, socket_path
+from ..discovery import keep_walks
+from ..scanner import set_mmap
+from .check import check_command
+from .console import client_terminal
+from .profiling import profile_options
+from .scan import scan_command
+
+# Commands the daemon runs on behalf of clients
+DAEMON_COMMANDS = {"check": check_command, "scan": scan_command}
+
+
+def _run_request(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a forwarded command in the client's directory, capturing its output."""
+    command = DAEMON_COMMANDS.get(message.get("command"))
+    if command is None:
+        return {"error": f"unsupported command {message.get('command')!r}"}
+    params = dict(message.get("params") or {}, no_daemon=True)
+    
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(message["cwd"])
+        with redirect_stdout(stdout), redirect_stderr(stderr), client_terminal(
+            message.get("terminal")
+        ):
+            try:
+                command.callback(**params)
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    exit_code = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    except OSError as e:
+        return {"error": str(e)}
+    finally:
+        os.chdir(previous_cwd)
+    
+    return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+@click.command("serve")
+@click.option(
+    "--socket",
+    "socket_file",
+    envvar="LIM_SOCKET",
+    help="Socket path (default: .cache/lim-serve.sock in the repository)"
+)
+@click.option(
+    "--idle-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Exit after this many seconds without requests"
+)
+@click.option(
+    "--stop",
+    is_flag=True,
+    help="Stop the running daemon"
+)
+@click.option(
+    "--status",
+    is_flag=True,
+    help="Report whether a daemon is running"
+)
+@profile_options
+def serve_command(
+    socket_file: Optional[str],
+    idle_timeout: Optional[float],
+    stop: bool,
+    status: bool,
+) -> None:
+    """Run a warm daemon answering 'lim scan' and 'lim check'.
+    
+    While the daemon runs, scan and check in this repository forward their
+    options to it over a Unix socket and reuse its in-memory file lists and
+    result cache. File lists are revalidated by directory mtimes, and files
+    by size, mtime and content hash, on every request.
+    Without a daemon, or with --no-daemon, they run in-process as usual.
+    """
+    from rich.console import Console
+    
+    console = Console()
+    
+    if not hasattr(socket, "AF_UNIX"):
+        console.print("❌ Error: lim serve requires Unix domain sockets", style="red")
+        sys.exit(1)
+    
+    path = socket_file or socket_path()
+    
+    if stop or status:
+        response = request(path, {"op": "stop" if stop else "ping"}, timeout=5.0)
+        if response is None:
+            console.print(f"No daemon is listening on {path}", style="yellow")
+            sys.exit(1)
+        if stop:
+            console.print(f"🛑 Daemon on {path} stopped", style="green")
+        else:
+            console.print(f"✅ Daemon {response.get('pid')} is listening on {path}", style="green")
+        return
+    
+    # Flush caches and remove the socket on SIGTERM as well as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    keep_resident(True)
+    keep_walks(True)
+    # A file truncated while mapped would kill the daemon
+    set_mmap(False)
+    try:
+        serve(
+            path,
+            _run_request,
+            idle_timeout=idle_timeout,
+            on_ready=lambda: console.print(f"🚀 Serving on {path}", style="blue"),
+        )
+    except RuntimeError as e:
+        console.print(f"❌ Error: {e}", style="red")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        console.print()
+    finally:
+        flush_resident()
+    console.print("Daemon stopped", style="dim")
@@ -0,0 +1,174 @@
+"""Watch command keeping a live legacy import index."""
+
+import sys
+import time
+
+import click
+
+from ..parallel import resolve_jobs
+from ..tracker import ImportTracker
+from ..watch import DEFAULT_POLL_INTERVAL, LiveIndex, make_watcher
+from .profiling import profile_options
+
+
+@click.command("watch")
+@click.option(
+    "--roots",
+    default="src,tests",
+    help="Comma-separated list of root directories to search"
+)
+@click.option(
+    "--legacy-patterns",
+    required=True,
+    help="Comma-separated list of legacy import patterns to track"
+)
+@click.option(
+    "--allow",
+    multiple=True,
+    help="Glob patterns for allowed legacy imports (can be used multiple times)"
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["ast", "tokenize"]),
+    default="ast",
+    help="Import extraction engine: full 'ast' parse or faster 'tokenize' scan"
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob patterns for files or directories to skip (can be used multiple times)"
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Do not skip files ignored by .gitignore"
+)
+@click.option(
+    "--polling",
+    is_flag=True,
+    help="Detect changes by polling instead of inotify"
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.05),
+    default=DEFAULT_POLL_INTERVAL,
+    help="Seconds between polls when polling (default: 1.0)"
+)
+@click.option(
+    "--cache-dir",
+    default=".cache/lim-index",
+    help="Directory for the persistent per-file result cache"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Disable the persistent result cache"
+)
+@click.option(
+    "--jobs",
+    default="1",
+    help="Number of worker processes for the initial scan, or 'auto' (default: 1)"
+)
+@click.option(
+    "--verbose",
+    is_flag=True,
+    help="Enable verbose output"
+)
+@profile_options
+def watch_command(
+    roots: str,
+    legacy_patterns: str,
+    allow: tuple[str],
+    engine: str,
+    exclude: tuple[str],
+    no_gitignore: bool,
+    polling: bool,
+    poll_interval: float,
+    cache_dir: str,
+    no_cache: bool,
+    jobs: str,
+    verbose: bool,
+) -> None:
+    """Watch the repository and print blocking imports as they change.
+    
+    The tree is scanned once; afterwards only saved files are re-extracted,
+    and each introduced (+) or removed (-) blocking import is printed.
+    """
+    from rich.console import Console
+    
+    console = Console()
+    
+    # Parse inputs
+    search_roots = [r.strip() for r in roots.split(",") if r.strip()]
+    pattern_list = [p.strip() for p in legacy_patterns.split(",") if p.strip()]
+    allow_list = list(allow) if allow else []
+    
+    if not pattern_list:
+        console.print("❌ Error: --legacy-patterns is required", style="red")
+        sys.exit(1)
+
+    try:
+        worker_count = resolve_jobs(jobs)
+    except ValueError as e:
+        console.print(f"❌ Error: {e}", style="red")
+        sys.exit(1)
+    
+    tracker = ImportTracker(
+        legacy_patterns=pattern_list,
+        allow_patterns=allow_list,
+        baseline_file=".cache/migration_baseline.json",
+        cache_dir=None if no_cache else cache_dir,
+        engine=engine,
+        exclude_patterns=list(exclude),
+        gitignore=not no_gitignore,
+        with_digests=True,
+    )
+    index = LiveIndex(tracker, tracker.repo_root(), search_roots)
+    
+    start = time.perf_counter()
+    index.build(jobs=worker_count)
+    watcher = make_watcher(index, polling=polling, interval=poll_interval)
+    elapsed = time.perf_counter() - start
+    
+    console.print(
+        f"👀 Watching {len(index.entries)} files ({watcher.name}): "
+        f"{index.blocking} blocking, {index.allowed} allowed legacy imports",
+        style="blue",
+    )
+    if verbose:
+        console.print(f"Initial scan took {elapsed:.2f}s", style="dim")
+    console.print("Press Ctrl+C to stop", style="dim")
+    
+    try:
+        while True:
+            changed = watcher.wait()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            deltas = index.refresh(changed)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            introduced = removed = 0
+            for delta in deltas:
+                for lineno, module in delta.introduced:
+                    console.print(f"+ {delta.path}:{lineno} {module}", style="red")
+                for lineno, module in delta.removed:
+                    console.print(f"- {delta.path}:{lineno} {module}", style="green")
+                introduced += len(delta.introduced)
+                removed += len(delta.removed)
+            
+            if deltas:
+                console.print(
+                    f"Blocking: {index.blocking} (+{introduced} -{removed}) [{elapsed_ms:.0f} ms]",
+                    style="bold",
+                )
+            elif verbose:
+                console.print(
+                    f"{len(changed)} changed paths, no blocking changes [{elapsed_ms:.0f} ms]",
+                    style="dim",
+                )
+    except KeyboardInterrupt:
+        console.print()
+        console.print("Stopped watching", style="dim")
+    finally:
+        watcher.close()
@@ -0,0 +1,291 @@
+"""Warm daemon serving lim commands over a local Unix socket.
+
+``lim serve`` keeps one process alive per repository, so Python startup,
+imports, directory walks (kept walks, see ``discovery.py``) and per-file scan
+results (resident caches, see ``cache.py``) are paid once. A request still
+stats each listed directory and each file to revalidate them, but lists and
+parses only what changed. ``lim scan`` and ``lim check`` forward their parsed options to the
+daemon when its socket answers and run in-process otherwise. Commands that
+write to stdout or a device through an output path (``--json-out -``,
+``/dev/stdout``, a FIFO) always run in-process, since the daemon would write
+to its own streams. Console output is captured in the daemon and replayed by
+the client, rendered for the client's terminal (see ``cli/console.py``).
+
+The protocol is one JSON object per line in each direction: the client sends
+a request and reads a single response, then the connection is closed.
+Requests are handled one at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import select
+import stat
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional
+
+from . import __version__
+
+if TYPE_CHECKING:
+    import socket
+
+# Socket file, relative to the repository root
+DEFAULT_SOCKET = ".cache/lim-serve.sock"
+
+# Environment variable overriding the socket path
+SOCKET_ENV = "LIM_SOCKET"
+
+# Longest socket path accepted by every supported platform (sun_path)
+MAX_SOCKET_PATH = 100
+
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+# Seconds a client may take to send its request or read a response chunk
+REQUEST_TIMEOUT = 10.0
+
+# Seconds a forwarded command waits for the daemon's answer before running
+# in-process; the daemon serves one request at a time, so a stuck request
+# must not block every client
+FORWARD_TIMEOUT = 60.0
+
+# Environment variables deciding how the client's terminal renders output
+TERMINAL_ENV = ("TERM", "COLORTERM", "NO_COLOR", "FORCE_COLOR")
+
+Handler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _find_repo_root(start: str) -> str:
+    """Return the nearest directory at or above start containing .git, or start."""
+    path = os.path.abspath(start)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return os.path.abspath(start)
+        path = parent
+
+
+def socket_path(cwd: Optional[str] = None) -> str:
+    """Return the daemon socket path for the repository containing cwd.
+
+    The path is taken from LIM_SOCKET if set. Otherwise it lives under the
+    repository's .cache directory, or in the temp directory when that path
+    would be too long for a Unix socket.
+    """
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+    root = _find_repo_root(cwd or os.getcwd())
+    path = os.path.join(root, DEFAULT_SOCKET)
+    if len(os.fsencode(path)) <= MAX_SOCKET_PATH:
+        return path
+    import hashlib
+    import tempfile
+
+    key = hashlib.blake2b(os.fsencode(root), digest_size=8).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"lim-{key}.sock")
+
+
+def _recv_message(conn: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one newline-terminated JSON object, or None on EOF or bad data."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if chunk.endswith(b"\n") or size > MAX_MESSAGE_BYTES:
+            break
+    try:
+        message = json.loads(b"".join(chunks))
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def _send_message(conn: socket.socket, message: Dict[str, Any]) -> None:
+    conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def request(
+    path: str, message: Dict[str, Any], timeout: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """Send one request to a daemon.
+
+    Args:
+        path: Socket path
+        message: Request object; the client version is added
+        timeout: Seconds to wait for the response, None to wait indefinitely
+
+    Returns:
+        The response, or None if no compatible daemon answered
+    """
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(1.0)
+        sock.connect(path)
+        sock.settimeout(timeout)
+        _send_message(sock, dict(message, version=__version__))
+        response = _recv_message(sock)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+    if response is None or response.get("version") != __version__:
+        return None
+    return response
+
+
+def is_stream_path(path: Optional[str]) -> bool:
+    """Tell whether an output path names a stream or device instead of a file.
+
+    Such paths ('-', /dev/stdout, a FIFO, ...) would refer to the daemon's
+    own streams, so commands writing to them must run in-process.
+    """
+    if not path:
+        return False
+    if path == "-":
+        return True
+    absolute = os.path.abspath(path)
+    if absolute.startswith(("/dev/", "/proc/")):
+        return True
+    try:
+        return not stat.S_ISREG(os.stat(absolute).st_mode)
+    except OSError:
+        return False
+
+
+def _terminal() -> Dict[str, Any]:
+    """Describe this process's terminal, so that the daemon renders output for it."""
+    import shutil
+
+    return {
+        "tty": sys.stdout.isatty(),
+        "width": shutil.get_terminal_size().columns,
+        "env": {name: os.environ[name] for name in TERMINAL_ENV if name in os.environ},
+    }
+
+
+def forward(
+    command: str, params: Dict[str, Any], outputs: Iterable[Optional[str]] = ()
+) -> Optional[int]:
+    """Run a command in the daemon, replaying its output here.
+
+    Args:
+        command: Command name, e.g. 'check'
+        params: The command's parsed options
+        outputs: The command's output paths; the command runs in-process if
+            any of them is a stream or device, see is_stream_path()
+
+    Returns:
+        The command's exit code, or None if it must run in-process, also
+        when the daemon does not answer within FORWARD_TIMEOUT seconds
+    """
+    if any(is_stream_path(output) for output in outputs):
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+    response = request(
+        path,
+        {
+            "op": "run",
+            "command": command,
+            "params": params,
+            "cwd": os.getcwd(),
+            "terminal": _terminal(),
+        },
+        timeout=FORWARD_TIMEOUT,
+    )
+    if response is None or "exit_code" not in response:
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stdout.flush()
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stderr.flush()
+    return int(response["exit_code"])
+
+
+def _bind(path: str) -> socket.socket:
+    """Bind a listening socket, replacing a stale socket file.
+
+    Raises:
+        RuntimeError: If another daemon is already listening on the path
+    """
+    if os.path.exists(path):
+        if request(path, {"op": "ping"}, timeout=1.0) is not None:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        os.unlink(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket usable by the owner only
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old_umask)
+    sock.listen(16)
+    return sock
+
+
+def serve(
+    path: str,
+    handler: Handler,
+    idle_timeout: Optional[float] = None,
+    on_ready: Optional[Callable[[], None]] = None,
+) -> None:
+    """Serve requests until stopped, idle for idle_timeout seconds, or interrupted.
+
+    Args:
+        path: Socket path
+        handler: Function answering 'run' requests
+        idle_timeout: Seconds without requests before exiting, None for no limit
+        on_ready: Called once the socket is listening
+
+    Raises:
+        RuntimeError: If another daemon is already listening on the path
+    """
+    sock = _bind(path)
+    try:
+        if on_ready is not None:
+            on_ready()
+        while True:
+            if not select.select([sock], [], [], idle_timeout)[0]:
+                return
+            conn, _ = sock.accept()
+            conn.settimeout(REQUEST_TIMEOUT)
+            with conn:
+                try:
+                    message = _recv_message(conn)
+                    if message is None:
+                        continue
+                    op = message.get("op")
+                    if message.get("version") != __version__:
+                        response: Dict[str, Any] = {"error": "version mismatch"}
+                    elif op == "ping":
+                        response = {"pid": os.getpid()}
+                    elif op == "stop":
+                        response = {"stopped": True}
+                    elif op == "run":
+                        response = handler(message)
+                    else:
+                        response = {"error": f"unknown op {op!r}"}
+                    _send_message(conn, dict(response, version=__version__))
+                except OSError:
+                    continue  # client went away
+                if op == "stop":
+                    return
+    finally:
+        sock.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
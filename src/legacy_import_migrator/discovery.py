@@ -0,0 +1,531 @@
+"""Python file discovery.
+
+``walk_py_files`` lists the Python files under a set of search roots with
+``os.scandir``. Ignored directories (``.venv``, ``node_modules``, ``build``,
+...) are pruned before they are descended into rather than filtered out of the
+results afterwards, and so are directories excluded by ``.gitignore`` files or
+by user exclude globs. Paths are handled as strings throughout; callers get
+POSIX paths relative to the walk root.
+
+Directory listing can optionally run on a thread pool. On local disks a single
+thread is usually fastest, but on network filesystems each listing is a round
+trip and listing several directories at once hides the latency.
+
+A long-running process (``lim serve``) can keep walk results in memory with
+``keep_walks()``. A kept result is reused while every directory it listed,
+every ``.gitignore`` file that applied and ``.git/info/exclude`` keep their
+mtime and size: adding, removing or renaming an entry changes the mtime of
+its directory, so one ``stat`` per directory replaces the listings.
+
+Instead of walking, ``discover_py_files`` can also take the file set from
+git's index (a single ``git ls-files -z`` call, which skips untracked build
+output for free) or from a NUL- or newline-delimited list written by a build
+system that already knows which files exist.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cache import RACY_WINDOW_NS
+from .globs import GlobSet
+
+# Default ignore patterns for common directories
+DEFAULT_IGNORE_DIRS = {
+    ".git", ".venv", ".mypy_cache", ".pytest_cache", "__pycache__",
+    ".tox", ".coverage", "node_modules", "dist", "build"
+}
+
+GITIGNORE = ".gitignore"
+
+# --files-from value selecting git's index as the file source
+FILES_FROM_GIT = "git"
+
+# (mtime_ns, size) of a path, or None if it does not exist
+Stamp = Optional[Tuple[int, int]]
+
+# Kept walk: (stamps of the directories and ignore files it depends on,
+# listed directories, found files), see keep_walks()
+_KeptWalk = Tuple[Dict[str, Stamp], List[str], List[str]]
+
+# Kept walks by their arguments, or None when walks are not kept
+_kept_walks: Optional[Dict[tuple, _KeptWalk]] = None
+
+
+def keep_walks(enabled: bool = True) -> None:
+    """Keep walk_py_files() results in memory, revalidated by directory mtimes."""
+    global _kept_walks
+    if not enabled:
+        _kept_walks = None
+    elif _kept_walks is None:
+        _kept_walks = {}
+
+
+def _stamp(path: str) -> Stamp:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _translate_gitignore(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression body."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+            continue
+        if c == "*":
+            if pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+            else:
+                out.append("[^/]*")
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class GitIgnore:
+    """The rules of one .gitignore file, applied relative to its directory."""
+
+    def __init__(self, base: str, lines: Iterable[str]):
+        """Parse the rules.
+
+        Args:
+            base: POSIX path of the directory holding the file, relative to
+                the walk root ('' for the root itself)
+            lines: Lines of the .gitignore file
+        """
+        self.base = base
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            body = _translate_gitignore(line.lstrip("/"))
+            regex = re.compile(("^" if anchored else "^(?:.*/)?") + body + "$", re.DOTALL)
+            self.rules.append((regex, negate, dir_only))
+
+    @classmethod
+    def load(cls, path: str, base: str) -> Optional["GitIgnore"]:
+        """Read a .gitignore file, or return None if it cannot be read."""
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                ignore = cls(base, f)
+        except OSError:
+            return None
+        return ignore if ignore.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Return True if ignored, False if re-included, or None if no rule applies."""
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return None
+
+
+def _is_ignored(ignores: Sequence[GitIgnore], rel_path: str, is_dir: bool) -> bool:
+    """Apply .gitignore files from the deepest one up; the first verdict wins."""
+    for ignore in reversed(ignores):
+        verdict = ignore.match(rel_path, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+# Result of listing one directory: (subdirectory names, .py file names, has .gitignore)
+_Listing = Tuple[List[str], List[str], bool]
+
+
+def _list_dir(path: str) -> _Listing:
+    """List one directory, classifying entries without following dir symlinks."""
+    dirs: List[str] = []
+    files: List[str] = []
+    has_gitignore = False
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(name)
+                    elif name.endswith(".py"):
+                        if entry.is_file():
+                            files.append(name)
+                    elif name == GITIGNORE:
+                        has_gitignore = True
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return dirs, files, has_gitignore
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _normalize_root(search_root: str) -> str:
+    """Return a search root as a POSIX path, '' for the walk root itself."""
+    rel_dir = os.path.normpath(search_root).replace(os.sep, "/")
+    return "" if rel_dir == "." else rel_dir
+
+
+def _start_ignores(root: str, rel_dir: str) -> Tuple[GitIgnore, ...]:
+    """Collect the .gitignore files of the ancestors of a search root."""
+    ignores = []
+    info_exclude = GitIgnore.load(os.path.join(root, ".git", "info", "exclude"), "")
+    if info_exclude is not None:
+        ignores.append(info_exclude)
+    if not rel_dir or os.path.isabs(rel_dir) or rel_dir.startswith(".."):
+        return tuple(ignores)
+    parts = rel_dir.split("/")
+    for depth in range(len(parts)):
+        base = "/".join(parts[:depth])
+        ignore = GitIgnore.load(os.path.join(root, base, GITIGNORE), base)
+        if ignore is not None:
+            ignores.append(ignore)
+    return tuple(ignores)
+
+
+def _is_gitignored(root: str, rel_path: str) -> bool:
+    """Tell whether the walker would skip a file, or one of its directories, as ignored."""
+    ignores = _start_ignores(root, rel_path)
+    if not ignores:
+        return False
+    parts = rel_path.split("/")
+    for depth in range(1, len(parts)):
+        if _is_ignored(ignores, "/".join(parts[:depth]), True):
+            return True
+    return _is_ignored(ignores, rel_path, False)
+
+
+def walk_py_files(
+    root: str,
+    search_roots: Iterable[str],
+    ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+    exclude: Optional[GlobSet] = None,
+    gitignore: bool = True,
+    threads: int = 1,
+    dirs_out: Optional[List[str]] = None,
+) -> List[str]:
+    """List the Python files under the search roots.
+
+    Args:
+        root: Directory the search roots and the results are relative to
+        search_roots: Directories to search, relative to root
+        ignore_dirs: Directory names that are never descended into
+        exclude: Globs over relative paths; matching files are skipped and a
+            directory is pruned when its path plus a trailing '/' matches
+        gitignore: Honor .gitignore files and .git/info/exclude
+        threads: Number of threads listing directories concurrently
+        dirs_out: If given, every directory that was listed is appended to it
+
+    Returns:
+        Sorted, de-duplicated POSIX paths relative to root
+    """
+    search_roots = list(search_roots)
+    if _kept_walks is None:
+        return _walk_py_files(
+            root, search_roots, ignore_dirs, exclude, gitignore, threads, dirs_out
+        )
+
+    key = (
+        os.path.abspath(root),
+        tuple(search_roots),
+        frozenset(ignore_dirs),
+        tuple(exclude.patterns) if exclude else (),
+        gitignore,
+    )
+    kept = _kept_walks.get(key)
+    if kept is not None and all(_stamp(path) == stamp for path, stamp in kept[0].items()):
+        stamps, dirs, found = kept
+    else:
+        start_ns = time.time_ns()
+        dirs = []
+        found = _walk_py_files(root, search_roots, ignore_dirs, exclude, gitignore, threads, dirs)
+        paths = [os.path.join(root, rel_dir) for rel_dir in dirs]
+        if gitignore:
+            paths.append(os.path.join(root, ".git", "info", "exclude"))
+            for rel_dir in dirs:
+                paths.append(os.path.join(root, rel_dir, GITIGNORE))
+            for search_root in search_roots:
+                parts = _normalize_root(search_root).split("/")
+                for depth in range(len(parts)):
+                    paths.append(os.path.join(root, *parts[:depth], GITIGNORE))
+        stamps = {path: _stamp(path) for path in paths}
+        # A directory changed within the racy window may change again without
+        # a new mtime, so such walks are not kept
+        racy = any(
+            stamp is not None and stamp[0] >= start_ns - RACY_WINDOW_NS
+            for stamp in stamps.values()
+        )
+        if racy:
+            _kept_walks.pop(key, None)
+        else:
+            _kept_walks[key] = (stamps, dirs, found)
+    if dirs_out is not None:
+        dirs_out.extend(dirs)
+    return list(found)
+
+
+def _walk_py_files(
+    root: str,
+    search_roots: Iterable[str],
+    ignore_dirs: Iterable[str],
+    exclude: Optional[GlobSet],
+    gitignore: bool,
+    threads: int,
+    dirs_out: Optional[List[str]],
+) -> List[str]:
+    """List the Python files under the search roots; see walk_py_files()."""
+    ignore_dirs = frozenset(ignore_dirs)
+    level: List[Tuple[str, Tuple[GitIgnore, ...]]] = []
+    for search_root in search_roots:
+        rel_dir = _normalize_root(search_root)
+        ignores = _start_ignores(root, rel_dir) if gitignore else ()
+        level.append((rel_dir, ignores))
+
+    found = set()
+    executor = None
+    if threads > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=threads)
+    mapper: Callable = executor.map if executor is not None else map
+    try:
+        while level:
+            listings = mapper(_list_dir, [os.path.join(root, rel_dir) for rel_dir, _ in level])
+            next_level = []
+            for (rel_dir, ignores), (dirs, files, has_gitignore) in zip(level, listings):
+                if dirs_out is not None:
+                    dirs_out.append(rel_dir)
+                if has_gitignore and gitignore:
+                    ignore = GitIgnore.load(os.path.join(root, rel_dir, GITIGNORE), rel_dir)
+                    if ignore is not None:
+                        ignores = ignores + (ignore,)
+                for name in dirs:
+                    if name in ignore_dirs:
+                        continue
+                    rel_path = _join(rel_dir, name)
+                    if ignores and _is_ignored(ignores, rel_path, True):
+                        continue
+                    if exclude and exclude.match(rel_path + "/") is not None:
+                        continue
+                    next_level.append((rel_path, ignores))
+                for name in files:
+                    rel_path = _join(rel_dir, name)
+                    if ignores and _is_ignored(ignores, rel_path, False):
+                        continue
+                    if exclude and exclude.match(rel_path) is not None:
+                        continue
+                    found.add(rel_path)
+            level = next_level
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return sorted(found)
+
+
+def select_py_paths(
+    rel_paths: Iterable[str],
+    search_roots: Iterable[str],
+    ignore_dirs: Iterable[str],
+    exclude: Optional[GlobSet],
+    gitignore_root: Optional[str] = None,
+) -> List[str]:
+    """Apply the walker's selection rules to an already known list of paths.
+
+    Args:
+        rel_paths: POSIX paths relative to the walk root
+        search_roots: Directories to keep files from
+        ignore_dirs: Directory names whose files are skipped
+        exclude: Globs over relative paths; matching files are skipped
+        gitignore_root: Walk root whose .gitignore files and .git/info/exclude
+            are honored (none if None)
+
+    Returns:
+        Sorted, de-duplicated Python file paths
+    """
+    roots = [_normalize_root(search_root) for search_root in search_roots]
+    prefixes = () if "" in roots else tuple(root + "/" for root in roots)
+    ignore_dirs = frozenset(ignore_dirs)
+    selected = set()
+    for rel_path in rel_paths:
+        if not rel_path.endswith(".py"):
+            continue
+        if prefixes and not rel_path.startswith(prefixes):
+            continue
+        if ignore_dirs and not ignore_dirs.isdisjoint(rel_path.split("/")[:-1]):
+            continue
+        if exclude and exclude.match(rel_path) is not None:
+            continue
+        if gitignore_root is not None and _is_gitignored(gitignore_root, rel_path):
+            continue
+        selected.add(rel_path)
+    return sorted(selected)
+
+
+def git_py_files(
+    root: str,
+    search_roots: Iterable[str],
+    ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+    exclude: Optional[GlobSet] = None,
+) -> List[str]:
+    """List the tracked Python files under the search roots from git's index.
+
+    Tracked files deleted from the work tree (but not yet from the index) are
+    left out. The same ``git ls-files`` call reports them, tagged 'R', so no
+    file is stat'ed.
+
+    Args:
+        root: Directory inside the work tree; search roots and results are
+            relative to it
+        search_roots: Directories to search, relative to root
+        ignore_dirs: Directory names whose files are skipped
+        exclude: Globs over relative paths; matching files are skipped
+
+    Returns:
+        Sorted POSIX paths relative to root
+
+    Raises:
+        RuntimeError: If git is unavailable or root is not in a work tree
+    """
+    search_roots = list(search_roots)
+    pathspecs = [f":(literal){_normalize_root(r) or '.'}" for r in search_roots]
+    try:
+        output = subprocess.run(
+            ["git", "ls-files", "-z", "-t", "--cached", "--deleted", "--", *pathspecs],
+            cwd=root,
+            capture_output=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise RuntimeError(f"git ls-files failed in {root}: {e}") from e
+    # Each entry is '<tag> <path>'; a deleted file is listed twice, once
+    # tagged as cached and once as removed ('R')
+    entries = output.decode("utf-8", errors="surrogateescape").split("\0")
+    deleted = {entry[2:] for entry in entries if entry.startswith("R ")}
+    rel_paths = [entry[2:] for entry in entries if entry and entry[2:] not in deleted]
+    return select_py_paths(rel_paths, search_roots, ignore_dirs, exclude)
+
+
+def read_file_list(
+    source: str,
+    root: str,
+    search_roots: Iterable[str],
+    ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+    exclude: Optional[GlobSet] = None,
+) -> List[str]:
+    """Read a list of Python files from a file, or from stdin for '-'.
+
+    The list is NUL-delimited if it contains a NUL byte and newline-delimited
+    otherwise. Relative entries are taken relative to root; entries that do
+    not exist or fall outside the search roots are skipped.
+
+    Args:
+        source: Path of the list file, or '-' for stdin
+        root: Directory the search roots and the results are relative to
+        search_roots: Directories to keep files from, relative to root
+        ignore_dirs: Directory names whose files are skipped
+        exclude: Globs over relative paths; matching files are skipped
+
+    Returns:
+        Sorted POSIX paths relative to root
+    """
+    if source == "-":
+        data = sys.stdin.buffer.read()
+    else:
+        with open(source, "rb") as f:
+            data = f.read()
+    text = data.decode("utf-8", errors="surrogateescape")
+    entries = text.split("\0") if "\0" in text else text.splitlines()
+
+    rel_paths = []
+    for entry in entries:
+        if not entry:
+            continue
+        if os.path.isabs(entry):
+            entry = os.path.relpath(entry, root)
+        rel_path = os.path.normpath(entry).replace(os.sep, "/")
+        rel_paths.append(rel_path)
+    selected = select_py_paths(rel_paths, search_roots, ignore_dirs, exclude)
+    return [rel_path for rel_path in selected if os.path.isfile(os.path.join(root, rel_path))]
+
+
+def discover_py_files(
+    root: str,
+    search_roots: Iterable[str],
+    files_from: Optional[str] = None,
+    ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+    exclude: Optional[GlobSet] = None,
+    gitignore: bool = True,
+    threads: int = 1,
+) -> List[str]:
+    """List the Python files to scan from the selected source.
+
+    Args:
+        root: Directory the search roots and the results are relative to
+        search_roots: Directories to search, relative to root
+        files_from: None to walk the filesystem, 'git' for git's index, or the
+            path of a file list ('-' for stdin)
+        ignore_dirs: Directory names that are skipped
+        exclude: Globs over relative paths that are skipped
+        gitignore: Honor .gitignore files when walking
+        threads: Number of threads listing directories when walking
+
+    Returns:
+        Sorted POSIX paths relative to root
+    """
+    if files_from is None:
+        return walk_py_files(root, search_roots, ignore_dirs, exclude, gitignore, threads)
+    if files_from == FILES_FROM_GIT:
+        return git_py_files(root, search_roots, ignore_dirs, exclude)
+    return read_file_list(files_from, root, search_roots, ignore_dirs, exclude)
@@ -0,0 +1,267 @@
+"""Import statement extraction engines.
+
+Two interchangeable engines find every ``import`` and ``from ... import``
+statement in Python source:
+
+- ``ast``: builds the full syntax tree with ``ast.parse`` and walks it.
+- ``tokenize``: a lightweight lexer that skips strings and comments and jumps
+  from one ``import``/``from`` keyword to the next. Those keywords cannot
+  appear anywhere else in valid code except ``yield from`` and ``raise ...
+  from``, which are told apart by what follows them, so the engine never
+  builds a tree or even tokenizes most of the file. The standard library
+  ``tokenize`` module is not used because it is pure Python before 3.12 and
+  slower than ``ast.parse`` itself.
+
+Both engines report the same records for valid Python source, including
+parenthesized multi-line imports, backslash continuations and imports nested
+in ``if``/``try``/function bodies. The tokenize engine falls back to the AST
+engine whenever its lexer meets something it cannot classify, such as an
+unterminated string.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+import unicodedata
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+# Available extraction engines
+ENGINES = ("ast", "tokenize")
+
+DEFAULT_ENGINE = "ast"
+
+
+class ImportRecord(NamedTuple):
+    """A single imported module name found in source code."""
+    lineno: int  # line of the import statement
+    module: str  # dotted module name; empty for "from . import x"
+    level: int = 0  # number of leading dots of a relative import
+
+
+def _prepare(source: str) -> str:
+    """Normalize source the way the parser sees it."""
+    if source.startswith("\ufeff"):
+        source = source[1:]
+    if "\r" in source:
+        source = source.replace("\r\n", "\n").replace("\r", "\n")
+    return source
+
+
+def extract_imports_ast(source: str) -> List[ImportRecord]:
+    """Extract import records by parsing and walking the full AST.
+
+    Raises:
+        SyntaxError: If the source does not parse
+        ValueError: If the source contains null bytes
+    """
+    records = []
+    for node in ast.walk(ast.parse(_prepare(source))):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                records.append(ImportRecord(node.lineno, alias.name, 0))
+        elif isinstance(node, ast.ImportFrom):
+            records.append(ImportRecord(node.lineno, node.module or "", node.level))
+
+    # ast.walk is breadth-first; report statements in source order
+    records.sort(key=lambda record: record.lineno)
+    return records
+
+
+def extract_import_names(source: str) -> List[Tuple[str, int, List[str]]]:
+    """Extract every import with the names a 'from' import binds, for the import graph.
+
+    'from pkg import mod' may import the submodule pkg.mod, which only the
+    imported names reveal, so this always parses the full AST.
+
+    Returns:
+        (module, level, names) per import in source order; names is empty
+        for plain 'import' statements. Empty if the source does not parse.
+    """
+    try:
+        tree = ast.parse(_prepare(source))
+    except (SyntaxError, ValueError):
+        return []
+    records = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                records.append((node.lineno, alias.name, 0, []))
+        elif isinstance(node, ast.ImportFrom):
+            names = [alias.name for alias in node.names if alias.name != "*"]
+            records.append((node.lineno, node.module or "", node.level, names))
+    records.sort(key=lambda record: record[0])
+    return [(module, level, names) for _, module, level, names in records]
+
+
+# Whitespace between tokens of a single logical line
+_WS = r"(?:[ \t\f]|\\\n)*"
+_NAME = r"[^\W\d]\w*"
+_DOTTED = rf"{_NAME}(?:{_WS}\.{_WS}{_NAME})*"
+
+# Strings and comments are skipped as a whole; only keywords are inspected
+_SCAN_RE = re.compile(
+    r"""
+    (?P<string>
+        '''(?:[^'\\]|\\.|'(?!''))*'''
+      | \"\"\"(?:[^"\\]|\\.|"(?!""))*\"\"\"
+      | '(?:[^'\\\n]|\\.)*'
+      | "(?:[^"\\\n]|\\.)*"
+    )
+    | (?P<comment>\#[^\n]*)
+    | (?P<keyword>\b(?:import|from)\b)
+    | (?P<error>['"])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_IMPORT_NAME_RE = re.compile(rf"{_WS}({_DOTTED})(?:{_WS}as{_WS}({_NAME}))?{_WS}(,)?")
+_FROM_RE = re.compile(rf"{_WS}((?:\.{_WS})*)({_DOTTED})?{_WS}import\b")
+
+
+def _dotted(text: str) -> str:
+    """Join a dotted name, dropping inner whitespace and normalizing identifiers."""
+    parts = [part.strip(" \t\f\\\n") for part in text.split(".")]
+    name = ".".join(parts)
+    return name if name.isascii() else unicodedata.normalize("NFKC", name)
+
+
+class ImportSpan(NamedTuple):
+    """Position of an imported module name in (prepared) source text."""
+    lineno: int  # line of the import statement
+    module: str  # dotted module name, normalized; empty for "from . import x"
+    level: int  # number of leading dots of a relative import
+    start: int  # offset of the name in the source (where it would be, if empty)
+    end: int  # offset just past the name
+    plain: bool  # an "import x" name rather than "from x import ..."
+    alias: bool  # bound with "as"; always False for "from" imports
+
+
+def _lex_imports(source: str) -> Optional[List[ImportSpan]]:
+    """Find every import with the lexer, in prepared source.
+
+    Returns:
+        Spans in source order, or None if the lexer meets something it
+        cannot classify
+    """
+    spans: List[ImportSpan] = []
+    lineno = 1
+    line_pos = 0  # position up to which newlines were counted into lineno
+    pos = 0
+    search = _SCAN_RE.search
+
+    while True:
+        match = search(source, pos)
+        if match is None:
+            return spans
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "error":
+            return None
+        if kind != "keyword":
+            continue
+
+        lineno += source.count("\n", line_pos, match.start())
+        line_pos = match.start()
+
+        if match.group() == "from":
+            statement = _FROM_RE.match(source, pos)
+            if statement is None:
+                # "yield from" or "raise ... from", not an import
+                continue
+            name = statement.group(2)
+            module = _dotted(name) if name else ""
+            start, end = statement.span(2) if name else (statement.end(1),) * 2
+            spans.append(ImportSpan(
+                lineno, module, statement.group(1).count("."), start, end, False, False
+            ))
+            pos = statement.end()
+            continue
+
+        while True:
+            name = _IMPORT_NAME_RE.match(source, pos)
+            if name is None:
+                return None
+            spans.append(ImportSpan(
+                lineno, _dotted(name.group(1)), 0, *name.span(1), True, name.group(2) is not None
+            ))
+            pos = name.end()
+            if not name.group(3):
+                break
+
+
+def extract_import_spans(source: str) -> Optional[List[ImportSpan]]:
+    """Locate every imported module name, for rewriting imports in place.
+
+    Offsets refer to the source as the engines see it: without a leading
+    BOM and with '\\n' line endings.
+
+    Returns:
+        Spans in source order, or None if the source cannot be lexed
+    """
+    if "\0" in source:
+        return None
+    return _lex_imports(_prepare(source))
+
+
+def extract_imports_tokenize(source: str) -> List[ImportRecord]:
+    """Extract import records with the lightweight lexer, without an AST.
+
+    Raises:
+        SyntaxError: If the lexer gives up and the source does not parse
+            either (the AST engine is used as a fallback)
+        ValueError: If the source contains null bytes
+    """
+    if "\0" in source:
+        return extract_imports_ast(source)
+    source = _prepare(source)
+    spans = _lex_imports(source)
+    if spans is None:
+        return extract_imports_ast(source)
+    return [ImportRecord(span.lineno, span.module, span.level) for span in spans]
+
+
+def line_texts(source: str, linenos: Iterable[int]) -> List[str]:
+    """Return the stripped text of source lines, numbered as the engines number them.
+
+    Runs in a single pass over the source however many lines are requested.
+
+    Args:
+        source: Python source text
+        linenos: 1-based line numbers in ascending order
+
+    Returns:
+        The text of each requested line, without surrounding whitespace
+    """
+    source = _prepare(source)
+    texts = []
+    lineno = 1
+    start = 0
+    for wanted in linenos:
+        while lineno < wanted:
+            newline = source.find("\n", start)
+            if newline == -1:
+                break
+            start = newline + 1
+            lineno += 1
+        end = source.find("\n", start)
+        texts.append(source[start:end if end != -1 else len(source)].strip())
+    return texts
+
+
+def extract_imports(source: str, engine: str = DEFAULT_ENGINE) -> List[ImportRecord]:
+    """Extract import records with the selected engine.
+
+    Args:
+        source: Python source text
+        engine: 'ast' or 'tokenize'
+
+    Returns:
+        Import records in source order, or an empty list if the source is invalid
+    """
+    try:
+        if engine == "tokenize":
+            return extract_imports_tokenize(source)
+        return extract_imports_ast(source)
+    except (SyntaxError, ValueError):
+        return []
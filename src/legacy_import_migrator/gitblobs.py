@@ -0,0 +1,191 @@
+"""Reading Python sources of git revisions without checking them out.
+
+The files of a commit are listed with a single ``git ls-tree -r`` call, and
+their contents are streamed through one long-lived ``git cat-file --batch``
+process: object IDs are written to its stdin by a feeder thread while the
+contents are read back in the same order, so git never waits for the
+scanner and no temporary files or worktrees are needed.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .discovery import DEFAULT_IGNORE_DIRS, _normalize_root, select_py_paths
+from .globs import GlobSet
+
+# Tree entry modes of regular files; symlinks (120000) and submodules (160000) are skipped
+_FILE_MODES = {b"100644", b"100755"}
+
+
+def resolve_rev(root: str, rev: str) -> str:
+    """Resolve a revision to a full commit hash.
+
+    Raises:
+        RuntimeError: If the revision does not name a commit
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"],
+            cwd=root,
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        raise RuntimeError(f"Unknown revision: {rev}") from None
+
+
+def list_py_blobs(
+    root: str,
+    commit: str,
+    search_roots: Iterable[str],
+    ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+    exclude: Optional[GlobSet] = None,
+) -> List[Tuple[str, str]]:
+    """List the Python files of a commit with their blob IDs.
+
+    Args:
+        root: Repository root
+        commit: Commit hash or other tree-ish
+        search_roots: Directories to list, relative to root
+        ignore_dirs: Directory names to skip at any depth
+        exclude: Globs of files and directories to skip
+
+    Returns:
+        Sorted (relative POSIX path, blob ID) pairs
+
+    Raises:
+        RuntimeError: If git fails
+    """
+    search_roots = list(search_roots)
+    roots = [_normalize_root(r) for r in search_roots]
+    paths = [] if "" in roots else roots
+    try:
+        output = subprocess.run(
+            ["git", "ls-tree", "-r", "-z", "--full-tree", commit, "--", *paths],
+            cwd=root,
+            capture_output=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise RuntimeError(f"git ls-tree failed for {commit}: {e}") from e
+
+    blobs = {}
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        info, _, path = entry.partition(b"\t")
+        mode, kind, oid = info.split(b" ")
+        if kind == b"blob" and mode in _FILE_MODES and path.endswith(b".py"):
+            blobs[path.decode("utf-8", errors="surrogateescape")] = oid.decode("ascii")
+
+    selected = select_py_paths(blobs, search_roots, ignore_dirs, exclude)
+    return [(rel_path, blobs[rel_path]) for rel_path in selected]
+
+
+def first_parent_commits(root: str, since: str, until: str = "HEAD") -> List[Tuple[str, str]]:
+    """List the commits from since to until along first parents, oldest first.
+
+    Args:
+        root: Repository root
+        since: First commit of the range (included)
+        until: Last commit of the range (included)
+
+    Returns:
+        (commit hash, ISO 8601 committer date) pairs
+
+    Raises:
+        RuntimeError: If a revision is unknown or git fails
+    """
+    since = resolve_rev(root, since)
+    until = resolve_rev(root, until)
+    commands = [
+        ["git", "log", "-1", "--format=%H %cI", since],
+        ["git", "log", "--first-parent", "--reverse", "--format=%H %cI", f"{since}..{until}"],
+    ]
+    commits = []
+    for command in commands:
+        try:
+            output = subprocess.run(
+                command, cwd=root, capture_output=True, check=True, text=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RuntimeError(f"git log failed: {e}") from e
+        for line in output.splitlines():
+            commit, _, date = line.partition(" ")
+            commits.append((commit, date))
+    return commits
+
+
+class BlobReader:
+    """Reads object contents from a single ``git cat-file --batch`` process."""
+
+    def __init__(self, root: str):
+        """Start the git process.
+
+        Raises:
+            RuntimeError: If git cannot be started
+        """
+        try:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise RuntimeError(f"Cannot start git cat-file: {e}") from e
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _feed(self, oids: Sequence[str]) -> None:
+        stdin = self._proc.stdin
+        try:
+            for oid in oids:
+                stdin.write(oid.encode("ascii") + b"\n")
+            stdin.flush()
+        except (OSError, ValueError):
+            pass  # reader closed the process early
+
+    def read_many(self, oids: Sequence[str]) -> Iterator[Tuple[str, bytes]]:
+        """Yield (object ID, content) for each ID, in order.
+
+        Raises:
+            RuntimeError: If an object is missing or git exits
+        """
+        feeder = threading.Thread(target=self._feed, args=(oids,), daemon=True)
+        feeder.start()
+        stdout = self._proc.stdout
+        done = 0
+        try:
+            for oid in oids:
+                header = stdout.readline().split()
+                if len(header) != 3:
+                    raise RuntimeError(f"git cat-file: cannot read object {oid}")
+                data = stdout.read(int(header[2]))
+                stdout.read(1)  # newline after the content
+                done += 1
+                yield oid, data
+        finally:
+            if done < len(oids):
+                # Abandoned midway: the feeder may be blocked on a full pipe
+                self.close()
+            feeder.join()
+
+    def close(self) -> None:
+        """Stop the git process."""
+        if self._proc.poll() is None:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+            self._proc.kill()
+        self._proc.wait()
+        self._proc.stdout.close()
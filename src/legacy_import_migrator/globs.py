@@ -0,0 +1,100 @@
+"""Compiled glob set for allowlist matching.
+
+Allow patterns use ``fnmatch`` semantics, where ``*`` also matches ``/``.
+Instead of calling ``fnmatch`` once per pattern per file, the patterns are
+compiled once:
+
+- Patterns of the form ``some/dir/*`` or ``some/dir/**`` (a literal directory
+  followed only by stars) match exactly the paths under that directory. They
+  are kept in a dictionary and checked against each ancestor directory of a
+  path, with the verdict cached per directory.
+- All other patterns are translated with ``fnmatch.translate`` and combined
+  into a single regular expression.
+
+``GlobSet.match`` reports which pattern matched, for ``--explain-allow``.
+When several patterns match, the first one in declaration order is reported.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Glob metacharacters understood by fnmatch
+_MAGIC = re.compile(r"[*?\[]")
+
+# Directory-prefix shortcuts only apply where normcase leaves paths unchanged
+_PREFIX_SAFE = os.path.normcase("A/b") == "A/b"
+
+
+def _dir_prefix(pattern: str) -> Optional[str]:
+    """Return 'dir/' if the pattern matches exactly the paths under 'dir/'."""
+    head, sep, stars = pattern.rpartition("/")
+    if not sep or not head or not stars or stars.strip("*") or _MAGIC.search(head):
+        return None
+    return head + "/"
+
+
+class GlobSet:
+    """A set of fnmatch-style globs compiled into a single matcher."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """Compile the globs.
+
+        Args:
+            patterns: Glob patterns with fnmatch semantics
+        """
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self._prefixes: Dict[str, int] = {}
+        alternatives = []
+        for index, pattern in enumerate(self.patterns):
+            prefix = _dir_prefix(pattern) if _PREFIX_SAFE else None
+            if prefix is not None:
+                self._prefixes.setdefault(prefix, index)
+                continue
+            translated = fnmatch.translate(os.path.normcase(pattern))
+            alternatives.append(f"(?P<glob{index}>{translated})")
+        self._regex = re.compile("|".join(alternatives)) if alternatives else None
+        self._dir_cache: Dict[str, Optional[int]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def _prefix_index(self, path: str) -> Optional[int]:
+        """Return the lowest-index directory pattern covering the path."""
+        if not self._prefixes:
+            return None
+        directory = path.rpartition("/")[0]
+        if directory in self._dir_cache:
+            return self._dir_cache[directory]
+
+        best: Optional[int] = None
+        if directory:
+            parts = directory.split("/")
+            for depth in range(1, len(parts) + 1):
+                index = self._prefixes.get("/".join(parts[:depth]) + "/")
+                if index is not None and (best is None or index < best):
+                    best = index
+
+        self._dir_cache[directory] = best
+        return best
+
+    def match(self, path: str) -> Optional[str]:
+        """Return the first pattern matching a path, or None.
+
+        Args:
+            path: Path to test, as a string (POSIX separators for relative paths)
+
+        Returns:
+            The matching glob pattern, or None if no pattern matches
+        """
+        best = self._prefix_index(path)
+        if self._regex is not None:
+            found = self._regex.match(os.path.normcase(path))
+            if found is not None:
+                index = int(found.lastgroup[len("glob"):])
+                if best is None or index < best:
+                    best = index
+        return self.patterns[best] if best is not None else None
@@ -0,0 +1,313 @@
+"""Whole-repository import graph with transitive reachability queries.
+
+Every import found by the extraction engines becomes an edge from the
+importing module to the imported one. Modules of the repository are named
+after their path relative to the search root they were found under (or to
+its parent, if the root is itself a package); imported names that are not
+repository modules are kept as external nodes, which is where most legacy
+modules live.
+
+The graph is held in compressed sparse row form: node names in one list and
+the edges of each node as a slice of a typed array, forward and reversed. It
+is saved in the same layout (a JSON header line followed by the raw arrays),
+so loading it is a single read and queries never rescan the tree.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+GRAPH_FORMAT_VERSION = 1
+
+# Saved graph, relative to the repository root
+DEFAULT_GRAPH_FILE = ".cache/lim-graph.bin"
+
+
+def module_name(rel_path: str, base: str) -> str:
+    """Return the dotted module name of a file relative to an import base.
+
+    Args:
+        rel_path: Relative POSIX path of a .py file
+        base: Directory the file is imported from, relative POSIX ('' for the root)
+
+    Returns:
+        Dotted name; a package's __init__.py is named after its package
+    """
+    if base:
+        rel_path = rel_path[len(base) + 1:]
+    parts = rel_path[:-3].split("/")
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    return ".".join(parts)
+
+
+def resolve_relative(importer: str, is_package: bool, module: str, level: int) -> Optional[str]:
+    """Resolve a relative import to an absolute module name.
+
+    Args:
+        importer: Dotted name of the importing module
+        is_package: Whether the importer is a package's __init__.py
+        module: Module named by the import, '' for 'from . import x'
+        level: Number of leading dots
+
+    Returns:
+        Absolute dotted name, or None if the import climbs above the top package
+    """
+    if level == 0:
+        return module
+    parts = importer.split(".") if is_package else importer.split(".")[:-1]
+    if level - 1 > len(parts) or (level - 1 == len(parts) and not module):
+        return None
+    parts = parts[:len(parts) - (level - 1)]
+    if module:
+        parts.append(module)
+    return ".".join(parts)
+
+
+def _csr(node_count: int, edges: Iterable[Tuple[int, int]]) -> Tuple[array, array]:
+    """Build (offsets, targets) arrays from deduplicated (source, target) pairs."""
+    adjacency: List[List[int]] = [[] for _ in range(node_count)]
+    for source, target in edges:
+        adjacency[source].append(target)
+    offsets = array("I", [0])
+    targets = array("I")
+    for neighbours in adjacency:
+        targets.extend(sorted(neighbours))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+class ImportGraph:
+    """Directed import graph over repository and external modules."""
+
+    def __init__(
+        self,
+        nodes: List[str],
+        paths: List[str],
+        offsets: array,
+        targets: array,
+        reverse_offsets: array,
+        reverse_targets: array,
+    ):
+        """Wrap prebuilt CSR arrays; use from_edges() or load() instead.
+
+        Args:
+            nodes: Module names; the first len(paths) are repository modules
+            paths: Relative file path of each repository module
+            offsets: Start of each node's edges in targets, plus the end
+            targets: Imported node IDs
+            reverse_offsets: As offsets, for the reversed graph
+            reverse_targets: Importing node IDs
+        """
+        self.nodes = nodes
+        self.paths = paths
+        self._offsets = offsets
+        self._targets = targets
+        self._reverse_offsets = reverse_offsets
+        self._reverse_targets = reverse_targets
+
+    @classmethod
+    def from_edges(
+        cls, modules: Dict[str, str], edges: Iterable[Tuple[str, str]]
+    ) -> "ImportGraph":
+        """Build a graph.
+
+        Args:
+            modules: Repository module name -> relative file path
+            edges: (importer, imported) module names; duplicates and
+                self-imports are dropped
+
+        Returns:
+            The graph; repository modules come first, and both they and the
+            external modules are in sorted order
+        """
+        edges = list(edges)
+        external = {imported for _, imported in edges if imported not in modules}
+        nodes = sorted(modules) + sorted(external)
+        index = {name: node for node, name in enumerate(nodes)}
+        pairs: Set[Tuple[int, int]] = set()
+        for importer, imported in edges:
+            source = index[importer]
+            target = index[imported]
+            if source != target:
+                pairs.add((source, target))
+        offsets, targets = _csr(len(nodes), pairs)
+        reverse_offsets, reverse_targets = _csr(len(nodes), ((t, s) for s, t in pairs))
+        paths = [modules[name] for name in nodes[:len(modules)]]
+        return cls(nodes, paths, offsets, targets, reverse_offsets, reverse_targets)
+
+    @property
+    def edge_count(self) -> int:
+        """Number of distinct import edges."""
+        return len(self._targets)
+
+    def is_internal(self, node: int) -> bool:
+        """Whether a node is a repository module."""
+        return node < len(self.paths)
+
+    def node_id(self, name: str) -> Optional[int]:
+        """Find a node by module name, with a binary search in each sorted run."""
+        for lo, hi in ((0, len(self.paths)), (len(self.paths), len(self.nodes))):
+            node = bisect_left(self.nodes, name, lo, hi)
+            if node < hi and self.nodes[node] == name:
+                return node
+        return None
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Find a node by module name or by the relative path of its file."""
+        node = self.node_id(name)
+        if node is None and name.endswith(".py"):
+            posix = Path(name).as_posix()
+            try:
+                node = self.paths.index(posix)
+            except ValueError:
+                return None
+        return node
+
+    def matching(self, patterns: Iterable[str]) -> Set[int]:
+        """Find the nodes matching module patterns, as legacy patterns match.
+
+        A pattern matches its own name and every name below it. Both runs of
+        nodes are sorted, so each pattern costs two binary searches per run.
+        """
+        matches: Set[int] = set()
+        runs = [(0, len(self.paths)), (len(self.paths), len(self.nodes))]
+        for pattern in patterns:
+            for lo, hi in runs:
+                # Names equal to the pattern or starting with "pattern."; "/" sorts after "."
+                start = bisect_left(self.nodes, pattern, lo, hi)
+                if start < hi and self.nodes[start] == pattern:
+                    matches.add(start)
+                first = bisect_left(self.nodes, pattern + ".", lo, hi)
+                matches.update(range(first, bisect_left(self.nodes, pattern + "/", first, hi)))
+        return matches
+
+    def imports_of(self, node: int) -> array:
+        """IDs of the nodes a node imports directly."""
+        return self._targets[self._offsets[node]:self._offsets[node + 1]]
+
+    def importers_of(self, node: int) -> array:
+        """IDs of the nodes importing a node directly."""
+        return self._reverse_targets[self._reverse_offsets[node]:self._reverse_offsets[node + 1]]
+
+    def _levels(self, starts: Iterable[int], offsets: array, targets: array) -> List[Set[int]]:
+        """Breadth-first search by whole levels: the nodes first reached after 0, 1, ... hops.
+
+        Each level's neighbours are gathered with set operations on array
+        slices, so the per-edge work runs in C rather than in a Python loop.
+        """
+        frontier = set(starts)
+        seen = set(frontier)
+        levels = []
+        while frontier:
+            levels.append(frontier)
+            reached: Set[int] = set()
+            for node in frontier:
+                reached.update(targets[offsets[node]:offsets[node + 1]])
+            frontier = reached - seen
+            seen |= frontier
+        return levels
+
+    def reach(self, start: int, targets: Set[int]) -> List[List[str]]:
+        """Find the target modules a module depends on, directly or transitively.
+
+        Args:
+            start: Node to start from
+            targets: Nodes of interest, e.g. matching(legacy_patterns)
+
+        Returns:
+            A shortest import chain from start to each matching module, as
+            lists of module names starting with the start module
+        """
+        levels = self._levels([start], self._offsets, self._targets)
+        chains = []
+        for distance in range(1, len(levels)):
+            for node in sorted(levels[distance] & targets):
+                chain = [node]
+                for previous in range(distance - 1, -1, -1):
+                    importers = levels[previous].intersection(self.importers_of(chain[-1]))
+                    chain.append(min(importers))
+                chains.append([self.nodes[n] for n in reversed(chain)])
+        return chains
+
+    def blast_radius(self, targets: Set[int]) -> List[Tuple[str, int]]:
+        """Find the repository modules that depend on target modules.
+
+        Args:
+            targets: Nodes whose dependents are wanted, e.g. matching([pattern])
+
+        Returns:
+            (module, import hops to the nearest target) for every repository
+            module that is not a target itself, nearest first
+        """
+        levels = self._levels(targets, self._reverse_offsets, self._reverse_targets)
+        internal = len(self.paths)
+        radius = []
+        for distance in range(1, len(levels)):
+            names = sorted(self.nodes[node] for node in levels[distance] if node < internal)
+            radius.extend((name, distance) for name in names)
+        return radius
+
+    def save(self, path: str) -> None:
+        """Write the graph: a JSON header line, the names, then the raw arrays."""
+        names = "\n".join(self.nodes + self.paths).encode("utf-8", "surrogateescape")
+        header = {
+            "version": GRAPH_FORMAT_VERSION,
+            "nodes": len(self.nodes),
+            "paths": len(self.paths),
+            "edges": self.edge_count,
+            "names_bytes": len(names),
+        }
+        columns = [self._offsets, self._targets, self._reverse_offsets, self._reverse_targets]
+        if sys.byteorder == "big":
+            columns = [array("I", column) for column in columns]
+            for column in columns:
+                column.byteswap()
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(names)
+            for column in columns:
+                column.tofile(f)
+        tmp_path.replace(target)
+
+    @classmethod
+    def load(cls, path: str) -> "ImportGraph":
+        """Read a graph written by save().
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a graph of this format version
+        """
+        with open(path, "rb") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = None
+            if not isinstance(header, dict) or header.get("version") != GRAPH_FORMAT_VERSION:
+                raise ValueError(f"Not an import graph of format {GRAPH_FORMAT_VERSION}: {path}")
+            names = f.read(header["names_bytes"]).decode("utf-8", "surrogateescape").split("\n")
+            data = f.read()
+        node_count = header["nodes"]
+        edge_count = header["edges"]
+        values = array("I")
+        values.frombytes(data[:len(data) - len(data) % values.itemsize])
+        if sys.byteorder == "big":
+            values.byteswap()
+        if len(names) != node_count + header["paths"] or (
+            len(values) != 2 * (node_count + 1 + edge_count)
+        ):
+            raise ValueError(f"Truncated import graph: {path}")
+        columns = []
+        start = 0
+        for size in (node_count + 1, edge_count, node_count + 1, edge_count):
+            columns.append(values[start:start + size])
+            start += size
+        return cls(names[:node_count], names[node_count:], *columns)
@@ -0,0 +1,150 @@
+"""Combining the partial results of sharded scans and checks.
+
+Each ``lim scan --shard i/n`` or ``lim check --shard i/n`` job writes a JSON
+document carrying a ``shard`` block. ``merge_parts`` reduces a complete set of
+such documents to the document a single unsharded run would have written:
+counters are summed, per-file lists are concatenated and re-sorted, and
+progress is recomputed from the combined counts.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from .checker import LegacyImportChecker
+from .tracker import ImportTracker, MigrationProgress, ScanStats
+
+
+def _check_shards(parts: Sequence[Dict[str, Any]]) -> None:
+    """Ensure the parts are exactly shards 1..n of one run.
+
+    Raises:
+        TypeError: If a part has no shard block, i.e. is not a partial result
+        ValueError: If the shards are missing, repeated or from other versions
+    """
+    count = None
+    seen = set()
+    for part in parts:
+        shard = part.get("shard")
+        if not isinstance(shard, dict):
+            raise TypeError("Not a partial result: missing 'shard' block")
+        if part.get("version") != "1.0":
+            raise ValueError(f"Unsupported result version: {part.get('version')!r}")
+        if count is None:
+            count = shard["count"]
+        elif shard["count"] != count:
+            raise ValueError(f"Shard counts differ: {count} and {shard['count']}")
+        if shard["index"] in seen:
+            raise ValueError(f"Shard {shard['index']}/{count} given more than once")
+        seen.add(shard["index"])
+    missing = sorted(set(range(1, (count or 0) + 1)) - seen)
+    if missing:
+        raise ValueError(f"Missing shards: {', '.join(f'{i}/{count}' for i in missing)}")
+
+
+def _same(parts: Sequence[Dict[str, Any]], key: str) -> Any:
+    """Return a field that all parts must agree on."""
+    values = {repr(part.get(key)) for part in parts}
+    if len(values) > 1:
+        raise ValueError(f"Partial results disagree on '{key}'")
+    return parts[0].get(key)
+
+
+def merge_progress(parts: Sequence[Dict[str, Any]]) -> MigrationProgress:
+    """Combine partial scan results into one MigrationProgress.
+
+    Args:
+        parts: MigrationProgress v1 documents, one per shard
+
+    Returns:
+        The progress a single scan of the whole file set would report
+
+    Raises:
+        TypeError: If a part is not a partial result
+        ValueError: If the parts are not a complete, consistent set of shards
+    """
+    _check_shards(parts)
+    baseline = _same(parts, "baseline")
+    _same(parts, "scope")
+    _same(parts, "rev")
+
+    blocking = sum(part["imports"]["blocking"] for part in parts)
+    allowed = sum(part["imports"]["allowed"] for part in parts)
+    if baseline:
+        # Every shard read the same baseline file
+        baseline_blocking = _same(
+            [part["imports"] for part in parts], "baseline_blocking"
+        )
+    else:
+        # Without a baseline each shard measured against its own count
+        baseline_blocking = blocking
+
+    stats = None
+    if all("stats" in part for part in parts):
+        stats = ScanStats()
+        for part in parts:
+            for name, value in part["stats"].items():
+                setattr(stats, name, getattr(stats, name, 0) + value)
+
+    by_file: Dict[str, int] = {}
+    for part in parts:
+        for path, count in part["blocking_by_file"]:
+            by_file[path] = by_file.get(path, 0) + count
+
+    return MigrationProgress(
+        repo_root=Path(parts[0]["repo_root"]),
+        scope=parts[0]["scope"],
+        files_scanned=sum(part["files_scanned"] for part in parts),
+        blocking_imports=blocking,
+        allowed_imports=allowed,
+        total_imports=blocking + allowed,
+        baseline_blocking=baseline_blocking,
+        progress_percent=ImportTracker.progress_percent(blocking, baseline_blocking),
+        blocking_by_file=sorted(by_file.items(), key=lambda item: (-item[1], item[0])),
+        baseline_file=Path(baseline["file"]) if baseline else None,
+        baseline_commit=(baseline["commit"] or None) if baseline else None,
+        stats=stats,
+        rev=parts[0].get("rev"),
+    )
+
+
+def merge_violations(parts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine partial check results into one violation list, ordered by path.
+
+    Raises:
+        TypeError: If a part is not a partial result
+        ValueError: If the parts are not a complete set of shards
+    """
+    _check_shards(parts)
+    violations = [
+        (entry["path"], [(item["lineno"], item["line"]) for item in entry["imports"]])
+        for part in parts
+        for entry in part["violations"]
+    ]
+    violations.sort(key=lambda entry: entry[0])
+    return LegacyImportChecker.violations_to_dict(violations)
+
+
+def merge_parts(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine partial scan or check results into a single JSON document.
+
+    Args:
+        parts: Documents written by 'lim scan --shard' (MigrationProgress v1)
+            or by 'lim check --shard' (violation lists); all of one kind
+
+    Returns:
+        The document an unsharded run would have written
+
+    Raises:
+        TypeError: If a part is not a partial result
+        ValueError: If the parts are empty, mixed or inconsistent
+    """
+    if not parts:
+        raise ValueError("No partial results to merge")
+    kinds = {"violations" in part for part in parts}
+    if len(kinds) > 1:
+        raise ValueError("Cannot merge scan and check results together")
+    if kinds.pop():
+        return merge_violations(parts)
+    return merge_progress(parts).to_dict()
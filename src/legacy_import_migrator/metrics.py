@@ -0,0 +1,233 @@
+"""OpenMetrics text export of scan results, for node_exporter's textfile collector.
+
+``scan_metrics`` renders a finished scan as gauges: site counts overall, per
+search root and per legacy pattern, progress, files scanned and cache
+counters. When a profiler ran alongside the scan, its phase timings are
+added as duration histograms. ``write_metrics`` replaces the file
+atomically, so a scrape never reads a half-written file.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .discovery import _normalize_root
+from .patterns import PatternTrie
+from .profiling import DURATION_BUCKETS, Profiler
+from .sites import SiteTable
+from .tracker import MigrationProgress
+
+# Prefix of every metric name
+PREFIX = "lim"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class MetricsWriter:
+    """Accumulates metric families and renders them as OpenMetrics text."""
+
+    def __init__(self) -> None:
+        self._lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> str:
+        """Start a metric family and return its full name."""
+        name = f"{PREFIX}_{name}"
+        self._lines.append(f"# TYPE {name} {kind}")
+        self._lines.append(f"# HELP {name} {help_text}")
+        return name
+
+    def sample(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Add a sample to the current family."""
+        if labels:
+            rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+            name = f"{name}{{{rendered}}}"
+        self._lines.append(f"{name} {_number(value)}")
+
+    def gauge(self, name: str, help_text: str, value: float, labels: Labels = ()) -> None:
+        """Add a family with a single gauge sample."""
+        self.sample(self.family(name, "gauge", help_text), value, labels)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        series: Iterable[Tuple[Labels, List[int], float]],
+    ) -> None:
+        """Add a histogram family.
+
+        Args:
+            name: Metric name without prefix
+            help_text: Description
+            series: (labels, count per DURATION_BUCKETS bucket plus overflow,
+                sum of the observed values) per labelled histogram
+        """
+        full_name = self.family(name, "histogram", help_text)
+        for labels, counts, total in series:
+            cumulative = 0
+            bounds = [_number(bound) for bound in DURATION_BUCKETS] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                self.sample(f"{full_name}_bucket", cumulative, labels + (("le", bound),))
+            self.sample(f"{full_name}_count", cumulative, labels)
+            self.sample(f"{full_name}_sum", total, labels)
+
+    def render(self) -> str:
+        """Return the exposition, terminated by '# EOF'."""
+        return "\n".join(self._lines + ["# EOF"]) + "\n"
+
+
+def _breakdown(
+    site_table: SiteTable, search_roots: List[str], legacy_patterns: List[str]
+) -> Tuple[Dict[Tuple[str, bool], int], Dict[Tuple[str, bool], int]]:
+    """Count sites by (search root, allowed) and by (legacy pattern, allowed)."""
+    roots = sorted((_normalize_root(root) for root in search_roots), key=len, reverse=True)
+    matcher = PatternTrie(legacy_patterns)
+    by_root: Dict[Tuple[str, bool], int] = {}
+    by_pattern: Dict[Tuple[str, bool], int] = {}
+    file_roots: Dict[str, str] = {}
+    for path, _, module, allowed in site_table:
+        root = file_roots.get(path)
+        if root is None:
+            root = next(
+                (r for r in roots if not r or path == r or path.startswith(r + "/")), ""
+            )
+            file_roots[path] = root
+        key = (root or ".", allowed)
+        by_root[key] = by_root.get(key, 0) + 1
+        pattern = matcher.match(module) or module
+        key = (pattern, allowed)
+        by_pattern[key] = by_pattern.get(key, 0) + 1
+    return by_root, by_pattern
+
+
+def _status_samples(
+    writer: MetricsWriter,
+    name: str,
+    label: str,
+    keys: List[str],
+    counts: Dict[Tuple[str, bool], int],
+) -> None:
+    for key in keys:
+        for allowed, status in ((False, "blocking"), (True, "allowed")):
+            writer.sample(name, counts.get((key, allowed), 0), ((label, key), ("status", status)))
+
+
+def scan_metrics(
+    progress: MigrationProgress,
+    search_roots: List[str],
+    legacy_patterns: List[str],
+    site_table: Optional[SiteTable] = None,
+    profiler: Optional[Profiler] = None,
+    timestamp: Optional[float] = None,
+) -> str:
+    """Render a scan as OpenMetrics text.
+
+    Args:
+        progress: Result of ImportTracker.scan()
+        search_roots: Search roots of the scan, for the per-root breakdown
+        legacy_patterns: Legacy patterns of the scan, for the per-pattern breakdown
+        site_table: Sites filled in by the scan; without it the per-root and
+            per-pattern breakdowns are left out
+        profiler: Profiler active during the scan, for duration histograms
+        timestamp: Completion time in seconds since the epoch (default: now)
+
+    Returns:
+        The exposition text
+    """
+    writer = MetricsWriter()
+    writer.gauge("blocking_imports", "Blocking legacy import sites.", progress.blocking_imports)
+    writer.gauge("allowed_imports", "Allowed legacy import sites.", progress.allowed_imports)
+    writer.gauge("legacy_imports", "All legacy import sites.", progress.total_imports)
+    writer.gauge(
+        "baseline_blocking_imports",
+        "Blocking legacy import sites at the baseline.",
+        progress.baseline_blocking,
+    )
+    writer.gauge(
+        "progress_percent",
+        "Share of the baseline's blocking imports resolved, in percent.",
+        progress.progress_percent,
+    )
+    writer.gauge("files_scanned", "Python files scanned.", progress.files_scanned)
+    writer.gauge(
+        "last_scan_timestamp_seconds",
+        "Time the scan finished, in seconds since the epoch.",
+        time.time() if timestamp is None else timestamp,
+    )
+
+    if site_table is not None:
+        by_root, by_pattern = _breakdown(site_table, search_roots, legacy_patterns)
+        roots = sorted({_normalize_root(root) or "." for root in search_roots})
+        name = writer.family("root_imports", "gauge", "Legacy import sites per search root.")
+        _status_samples(writer, name, "root", roots, by_root)
+        patterns = sorted(set(legacy_patterns) | {key for key, _ in by_pattern})
+        name = writer.family("pattern_imports", "gauge", "Legacy import sites per legacy pattern.")
+        _status_samples(writer, name, "pattern", patterns, by_pattern)
+
+    stats = progress.stats
+    if stats is not None:
+        name = writer.family("files", "gauge", "Files scanned, by how their sites were obtained.")
+        for how, count in (
+            ("parsed", stats.files_parsed),
+            ("prefiltered", stats.files_prefiltered),
+            ("reused", stats.files_reused),
+            ("shared", stats.blobs_shared),
+        ):
+            writer.sample(name, count, (("how", how),))
+        lookups = stats.cache_hits + stats.cache_misses
+        if lookups:
+            name = writer.family("cache_lookups", "gauge", "Result cache lookups, by outcome.")
+            writer.sample(name, stats.cache_hits, (("result", "hit"),))
+            writer.sample(name, stats.cache_misses, (("result", "miss"),))
+            writer.gauge(
+                "cache_hit_ratio", "Share of result cache lookups that hit.",
+                stats.cache_hits / lookups,
+            )
+
+    if profiler is not None:
+        writer.gauge(
+            "scan_duration_seconds",
+            "Wall-clock time of the scan.",
+            time.perf_counter() - profiler.started,
+        )
+        histograms = profiler.histograms or {}
+        writer.histogram(
+            "phase_duration_seconds",
+            "Time spent in each phase, per file for per-file phases, per call otherwise.",
+            [
+                ((("phase", name),), counts, profiler.phases[name][1])
+                for name, counts in sorted(histograms.items())
+                if name in profiler.phases
+            ],
+        )
+        if "file" in histograms:
+            writer.histogram(
+                "file_duration_seconds",
+                "Time to process each file that was read.",
+                [((), histograms["file"], profiler.files_wall)],
+            )
+    return writer.render()
+
+
+def write_metrics(path: str, text: str) -> None:
+    """Write the exposition through a temporary file renamed over the target."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(target.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    tmp_path.replace(target)
@@ -0,0 +1,270 @@
+"""Bulk rewriting of legacy imports to their new module names.
+
+``ImportMigrator`` renames the modules of ``import`` and ``from ... import``
+statements after a mapping such as ``old_pkg=new_pkg``. The tracker first
+finds the files with blocking legacy import sites, so allowed files (allow
+globs and the ``LEGACY-ALLOW`` marker) and files without sites are never
+opened for writing. Each remaining file is rewritten in a worker process
+using the name spans of the tokenize engine's lexer: only the characters of
+each module name change, so formatting, comments and aliases stay as they
+are. Files are replaced atomically, or shown as a unified diff instead.
+"""
+
+from __future__ import annotations
+
+import difflib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .extract import extract_import_spans
+from .parallel import parallel_map, resolve_jobs
+from .tracker import ImportTracker, ScanStats
+
+_BOM = "\ufeff"
+
+
+def parse_mapping(specs: Iterable[str]) -> Dict[str, str]:
+    """Parse 'old=new' module mappings.
+
+    Raises:
+        ValueError: If a mapping is malformed or an old name is mapped twice
+    """
+    mapping: Dict[str, str] = {}
+    for spec in specs:
+        old, sep, new = (part.strip() for part in spec.partition("="))
+        names = (old + "." + new).split(".")
+        if not sep or not all(name.isidentifier() for name in names):
+            raise ValueError(f"Invalid mapping: {spec!r} (expected old.module=new.module)")
+        if mapping.get(old, new) != new:
+            raise ValueError(f"Module {old} is mapped more than once")
+        mapping[old] = new
+    if not mapping:
+        raise ValueError("At least one mapping is required")
+    return mapping
+
+
+def rename_module(module: str, mapping: Dict[str, str]) -> Optional[str]:
+    """Rename a module after the longest matching mapping.
+
+    A mapping renames its own module and every module below it; a 'src.'
+    prefix is kept, as the scanner matches legacy modules with or without it.
+
+    Returns:
+        The new name, or None if no mapping applies
+    """
+    prefix = ""
+    if module.startswith("src.") and "src" not in mapping:
+        prefix, module = "src.", module[4:]
+    name = module
+    while name:
+        new = mapping.get(name)
+        if new is not None:
+            return prefix + new + module[len(name):]
+        name = name.rpartition(".")[0]
+    return None
+
+
+@dataclass
+class FileRewrite:
+    """Outcome of rewriting the imports of one file."""
+    path: str  # relative POSIX path
+    changes: int = 0  # module names rewritten
+    # (lineno, old name, new name) of plain 'import old.x' statements whose
+    # top-level name changed; references to the old name need updating by hand
+    rebinds: List[Tuple[int, str, str]] = field(default_factory=list)
+    diff: str = ""  # unified diff, in dry runs
+    error: Optional[str] = None  # why the file was left unchanged
+
+
+def rewrite_source(
+    source: str, mapping: Dict[str, str]
+) -> Tuple[str, int, List[Tuple[int, str, str]]]:
+    """Rewrite the absolute imports of source text after a module mapping.
+
+    Relative imports are left alone. A leading BOM and CRLF line endings are
+    preserved.
+
+    Returns:
+        (rewritten source, module names rewritten, rebinds as for FileRewrite)
+
+    Raises:
+        ValueError: If the source cannot be lexed or mixes line endings
+    """
+    bom = source.startswith(_BOM)
+    text = source[1:] if bom else source
+    crlf = "\r" in text
+    if crlf:
+        if text.count("\r") != text.count("\r\n") or text.count("\n") != text.count("\r\n"):
+            raise ValueError("mixed line endings")
+        text = text.replace("\r\n", "\n")
+
+    spans = extract_import_spans(text)
+    if spans is None:
+        raise ValueError("cannot lex the source")
+
+    pieces = []
+    rebinds = []
+    pos = 0
+    for span in spans:
+        new = rename_module(span.module, mapping) if span.level == 0 else None
+        if new is None or new == span.module:
+            continue
+        if span.plain and not span.alias and new.split(".")[0] != span.module.split(".")[0]:
+            rebinds.append((span.lineno, span.module, new))
+        pieces.append(text[pos:span.start])
+        pieces.append(new)
+        pos = span.end
+    if not pieces:
+        return source, 0, []
+    pieces.append(text[pos:])
+
+    rewritten = "".join(pieces)
+    if crlf:
+        rewritten = rewritten.replace("\n", "\r\n")
+    return (_BOM if bom else "") + rewritten, len(pieces) // 2, rebinds
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Replace a file's content atomically, keeping its permissions.
+
+    The data is written to a temporary file in the same directory, which then
+    replaces the original, so readers never see a partially written file.
+    A symlink is followed and its target rewritten, so the link stays a link.
+    """
+    target = Path(os.path.realpath(path))
+    fd, tmp_name = tempfile.mkstemp(
+        dir=target.parent, prefix=f".{target.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        shutil.copymode(target, tmp_name)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def rewrite_file(
+    task: Tuple[str, Path], mapping: Dict[str, str], dry_run: bool = False
+) -> FileRewrite:
+    """Rewrite the imports of one file; the unit of work of the process pool.
+
+    Args:
+        task: (relative POSIX path, path) of the file
+        mapping: Old module name -> new module name
+        dry_run: Compute a unified diff instead of writing the file
+
+    Returns:
+        FileRewrite; files that are not valid UTF-8 or cannot be lexed are
+        left unchanged with an error
+    """
+    rel_path, py_file = task
+    result = FileRewrite(rel_path)
+    try:
+        source = py_file.read_bytes().decode("utf-8")
+        rewritten, result.changes, result.rebinds = rewrite_source(source, mapping)
+    except UnicodeDecodeError:
+        result.error = "not valid UTF-8"
+        return result
+    except (OSError, ValueError) as e:
+        result.error = str(e)
+        return result
+    if not result.changes:
+        return result
+
+    if dry_run:
+        result.diff = "".join(difflib.unified_diff(
+            source.splitlines(keepends=True),
+            rewritten.splitlines(keepends=True),
+            f"a/{rel_path}",
+            f"b/{rel_path}",
+        ))
+        return result
+    try:
+        write_atomic(py_file, rewritten.encode("utf-8"))
+    except OSError as e:
+        result.changes = 0
+        result.rebinds = []
+        result.error = f"cannot write: {e}"
+    return result
+
+
+class ImportMigrator:
+    """Rewrites blocking legacy imports across a repository."""
+
+    def __init__(
+        self,
+        mapping: Dict[str, str],
+        allow_patterns: Optional[List[str]] = None,
+        cache_dir: Optional[str] = None,
+        exclude_patterns: Optional[List[str]] = None,
+        gitignore: bool = True,
+    ):
+        """Initialize the migrator.
+
+        Args:
+            mapping: Old module name -> new module name; the old names are the
+                legacy patterns the files are scanned for
+            allow_patterns: Glob patterns of files allowed to keep legacy imports
+            cache_dir: Directory for the tracker's persistent result cache
+                (disabled if None)
+            exclude_patterns: Glob patterns for files and directories to skip
+            gitignore: Skip files and directories ignored by .gitignore files
+        """
+        self.mapping = mapping
+        self.tracker = ImportTracker(
+            legacy_patterns=list(mapping),
+            allow_patterns=allow_patterns,
+            cache_dir=cache_dir,
+            exclude_patterns=exclude_patterns,
+            gitignore=gitignore,
+        )
+
+    def migrate(
+        self,
+        search_roots: Optional[List[str]] = None,
+        jobs: Union[int, str] = 1,
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+        dry_run: bool = False,
+        stats: Optional[ScanStats] = None,
+    ) -> Iterator[FileRewrite]:
+        """Rewrite the files with blocking legacy import sites.
+
+        Args:
+            search_roots: Directories to search in (default: ['src', 'tests'])
+            jobs: Number of worker processes, or 'auto' for one per CPU
+            walk_threads: Number of threads listing directories
+            files_from: File source, as for ImportTracker.scan()
+            dry_run: Leave files unchanged and report unified diffs
+            stats: Counters to update while scanning
+
+        Yields:
+            A FileRewrite per file with blocking sites, in path order
+        """
+        jobs = resolve_jobs(jobs)
+        tracker = self.tracker
+        root = tracker.repo_root()
+        py_files = tracker.select_files(
+            search_roots=search_roots, walk_threads=walk_threads, files_from=files_from
+        )
+        if stats is None:
+            stats = ScanStats()
+        candidates = [
+            (rel_path, root / rel_path)
+            for rel_path, sites, reason in tracker.iter_file_results(
+                py_files, jobs=jobs, stats=stats
+            )
+            if sites and reason is None
+        ]
+        worker = partial(rewrite_file, mapping=self.mapping, dry_run=dry_run)
+        yield from parallel_map(worker, candidates, jobs)
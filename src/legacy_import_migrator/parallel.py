@@ -0,0 +1,169 @@
+"""Parallel execution engine for per-file scanning work.
+
+Parsing Python files is pure CPU work, so threads do not help under the GIL.
+This module fans per-file work out to a process pool in chunked batches while
+preserving input order, so parallel results are identical to the serial path.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from . import profiling
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Below this many items the pool start-up cost outweighs any gain
+MIN_PARALLEL_ITEMS = 64
+
+# Upper bound for the automatically chosen chunk size
+MAX_CHUNK_SIZE = 256
+
+# Function installed in each worker process by _init_worker
+_worker_func: Optional[Callable[[Any], Any]] = None
+
+
+def resolve_jobs(jobs: Union[int, str, None]) -> int:
+    """Resolve a ``--jobs`` value to a concrete worker count.
+
+    Args:
+        jobs: Positive integer, numeric string, 'auto' (one worker per CPU) or None
+
+    Returns:
+        Number of worker processes to use (1 means serial)
+
+    Raises:
+        ValueError: If the value is not 'auto' or a positive integer
+    """
+    if jobs is None:
+        return 1
+    if isinstance(jobs, str):
+        value = jobs.strip().lower()
+        if value == "auto":
+            return os.cpu_count() or 1
+        try:
+            jobs = int(value)
+        except ValueError:
+            raise ValueError(
+                f"Invalid jobs value: {jobs!r} (expected a positive integer or 'auto')"
+            ) from None
+    if jobs < 1:
+        raise ValueError(f"Invalid jobs value: {jobs!r} (expected a positive integer or 'auto')")
+    return jobs
+
+
+def _init_worker(func: Callable[[Any], Any]) -> None:
+    """Install the per-item function once per worker process."""
+    global _worker_func
+    _worker_func = func
+
+
+def _run_chunk(chunk: List[Any]) -> List[Any]:
+    """Apply the installed function to a chunk of items inside a worker."""
+    assert _worker_func is not None
+    return [_worker_func(item) for item in chunk]
+
+
+def default_chunksize(count: int, jobs: int) -> int:
+    """Choose a chunk size giving each of jobs workers about four chunks of count items."""
+    return max(1, min(MAX_CHUNK_SIZE, count // (jobs * 4)))
+
+
+def start_pool(func: Callable[[Any], Any], jobs: int) -> ProcessPoolExecutor:
+    """Start a process pool with func installed once per worker, for submit_chunk().
+
+    Args:
+        func: Picklable per-item function
+        jobs: Number of worker processes
+    """
+    # Imported here: it pulls in multiprocessing, which serial runs never need
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(func,))
+
+
+def submit_chunk(executor: ProcessPoolExecutor, chunk: List[Any]) -> Future:
+    """Apply the function of a start_pool() pool to a chunk of items.
+
+    Returns:
+        Future of the list of results, in the order of chunk
+    """
+    return executor.submit(_run_chunk, chunk)
+
+
+def parallel_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    jobs: int = 1,
+    chunksize: Optional[int] = None,
+) -> Iterator[R]:
+    """Apply ``func`` to every item, yielding results in input order.
+
+    With ``jobs > 1`` items are sent to a process pool in chunks. ``func`` must
+    be picklable (a module-level function, bound method or ``functools.partial``)
+    and is shipped to each worker only once. At most ``2 * jobs`` chunks are in
+    flight at a time, so memory stays bounded when results are consumed lazily.
+
+    Args:
+        func: Function to apply to each item
+        items: Items to process
+        jobs: Number of worker processes (1 runs serially in-process)
+        chunksize: Items per batch (chosen automatically if None)
+
+    Returns:
+        Iterator over results, in the same order as ``items``
+    """
+    items = list(items)
+    profiler = profiling.active()
+    if profiler is None:
+        yield from _map(func, items, jobs, chunksize)
+        return
+    # Time every item where it runs; the timings travel back with the results
+    timed = _map(profiling.Profiled(func, profiler.trace), items, jobs, chunksize)
+    for item, (result, timing) in zip(items, timed):
+        profiler.add_item(profiling.item_label(item), timing)
+        yield result
+
+
+def _map(
+    func: Callable[[T], R], items: List[T], jobs: int, chunksize: Optional[int]
+) -> Iterator[R]:
+    """Run parallel_map() on a list, without profiling."""
+    if jobs <= 1 or len(items) < MIN_PARALLEL_ITEMS:
+        for item in items:
+            yield func(item)
+        return
+
+    if chunksize is None:
+        chunksize = default_chunksize(len(items), jobs)
+    chunks = (items[i:i + chunksize] for i in range(0, len(items), chunksize))
+
+    with start_pool(func, jobs) as executor:
+        pending: Deque[Future] = deque()
+        try:
+            for chunk in chunks:
+                pending.append(submit_chunk(executor, chunk))
+                if len(pending) >= jobs * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,59 @@
+"""Legacy module pattern matching.
+
+A legacy pattern ``p`` matches a module name ``m`` when ``m == p`` or
+``m.startswith(p + ".")``. With thousands of retired module paths, testing
+every pattern for every import is linear in the configuration size, so the
+patterns are compiled once into a trie of dotted components and each name is
+matched in time proportional to its depth.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+# Key marking a trie node that completes a pattern; its value is the pattern
+END = "\0"
+
+
+class PatternTrie:
+    """Dotted-module prefix trie over a set of legacy patterns."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """Compile the patterns.
+
+        Args:
+            patterns: Legacy module patterns, e.g. ['old_pkg', 'company.legacy']
+        """
+        self.root: Dict[str, Any] = {}
+        # Shorter patterns first, so longer ones they already cover are dropped
+        for pattern in sorted({p for p in patterns if p}, key=lambda p: p.count(".")):
+            node = self.root
+            for part in pattern.split("."):
+                if END in node:
+                    break
+                node = node.setdefault(part, {})
+            else:
+                node.clear()
+                node[END] = pattern
+
+    def __bool__(self) -> bool:
+        return bool(self.root)
+
+    def match(self, name: str) -> Optional[str]:
+        """Return the pattern matching a module name, or None.
+
+        Args:
+            name: Dotted module name, e.g. 'old_pkg.sub.mod'
+
+        Returns:
+            The (shortest) matching pattern, or None if no pattern matches
+        """
+        node = self.root
+        for part in name.split("."):
+            node = node.get(part)
+            if node is None:
+                return None
+            pattern = node.get(END)
+            if pattern is not None:
+                return pattern
+        return None
@@ -0,0 +1,61 @@
+"""Multi-pattern byte-level prefilter for legacy import scanning.
+
+Most files never mention any legacy pattern. Before a file is decoded and
+parsed, its raw bytes are searched once with a single compiled regular
+expression covering every legacy pattern; files without a hit cannot contain
+a legacy import and are skipped. The expression is rendered from the same
+PatternTrie used for matching module names, so shared prefixes
+(``company.legacy.a``, ``company.legacy.b``, ...) are matched once rather than
+once per pattern.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, Optional, Union
+
+from .patterns import END, PatternTrie
+
+# Whitespace and line continuations allowed around the dots of a dotted name
+_DOT = rb"(?:[ \t\f]|\\\r?\n)*\.(?:[ \t\f]|\\\r?\n)*"
+
+
+def _trie_to_regex(node: Dict[str, Any]) -> bytes:
+    """Render a trie node as a regular expression over bytes."""
+    alternatives = []
+    for part in sorted(node):
+        if part == END:
+            continue
+        child = node[part]
+        literal = re.escape(part.encode("utf-8"))
+        if END in child:
+            alternatives.append(literal)
+        else:
+            alternatives.append(literal + _DOT + _trie_to_regex(child))
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return b"(?:" + b"|".join(alternatives) + b")"
+
+
+class PatternPrefilter:
+    """Single-pass byte search for any of a set of dotted module patterns."""
+
+    def __init__(self, patterns: Union[PatternTrie, Iterable[str]]):
+        """Compile the prefilter.
+
+        Args:
+            patterns: Legacy module patterns, e.g. ['old_pkg', 'company.legacy'],
+                or an already compiled PatternTrie
+        """
+        trie = patterns if isinstance(patterns, PatternTrie) else PatternTrie(patterns)
+        self.regex: Optional[re.Pattern] = re.compile(_trie_to_regex(trie.root)) if trie else None
+
+    def may_match(self, data: bytes) -> bool:
+        """Return True if the data mentions any pattern and must be parsed.
+
+        A False result guarantees that the source has no import matching the
+        patterns; a True result only means the text occurs somewhere.
+        """
+        if self.regex is None:
+            return False
+        return self.regex.search(data) is not None
@@ -0,0 +1,373 @@
+"""Per-phase profiling of scans, with Chrome trace-event output.
+
+Code marks its phases with ``with phase("read"):``. While no profiler is
+active that costs one function call and a null context; ``start()``
+activates a ``Profiler`` that accumulates, per phase, the number of calls
+and the wall-clock and CPU time spent in the phase itself (time spent in a
+nested phase is counted for the nested phase only, so phase times add up).
+``count("bytes_read", n)`` similarly adds to a named counter.
+
+Per-file work goes through ``parallel_map``, which times every item while a
+profiler is active: the item function runs under a fresh profiler in the
+worker process, and its timings, phases and counters travel back with the
+result. The per-file times feed the slowest-files list, and with tracing
+enabled every phase and file becomes a trace event on the timeline of the
+process and thread that ran it. Timestamps are taken from ``time.perf_counter()``,
+a monotonic clock shared by all processes of a machine on the supported
+platforms, so the worker timelines line up in the trace.
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, List, NamedTuple, Optional, Tuple
+
+# Version of the "profile" block in JSON output
+PROFILE_FORMAT_VERSION = 1
+
+DEFAULT_SLOWEST = 10
+
+# Upper bounds of the duration histogram buckets, in seconds
+DURATION_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_NULL = nullcontext()
+
+# (name, category, pid, tid, start, duration) of a phase or file
+TraceEvent = Tuple[str, str, int, int, float, float]
+
+# Profiler receiving phases in this process, if any
+_active: Optional["Profiler"] = None
+
+# Per-item profiler installed by Profiled in the thread running the item. It
+# shadows _active in that thread only, so items timed concurrently on several
+# threads never see, or restore, each other's profiler.
+_local = threading.local()
+
+
+class ItemTiming(NamedTuple):
+    """Timing of one item of per-file work, measured where it ran."""
+    pid: int
+    tid: int
+    start: float  # perf_counter() at the start
+    wall: float
+    cpu: float
+    phases: Dict[str, List[float]]  # as Profiler.phases
+    events: List[TraceEvent]
+    counters: Optional[Dict[str, int]] = None  # as Profiler.counters, None for none
+
+
+class _Phase:
+    """Context manager timing one phase; see Profiler.phase()."""
+
+    __slots__ = ("child_cpu", "child_wall", "cpu", "name", "profiler", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.child_wall = self.child_cpu = 0.0
+        self.profiler._stack.append(self)
+        self.cpu = time.process_time()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        wall = time.perf_counter() - self.start
+        cpu = time.process_time() - self.cpu
+        profiler = self.profiler
+        profiler._stack.pop()
+        if profiler._stack:
+            parent = profiler._stack[-1]
+            parent.child_wall += wall
+            parent.child_cpu += cpu
+        totals = profiler.phases.get(self.name)
+        if totals is None:
+            totals = profiler.phases[self.name] = [0, 0.0, 0.0]
+        totals[0] += 1
+        totals[1] += wall - self.child_wall
+        totals[2] += cpu - self.child_cpu
+        if profiler.histograms is not None:
+            profiler.observe(self.name, wall - self.child_wall)
+        if profiler.trace:
+            profiler.events.append(
+                (self.name, "phase", os.getpid(), threading.get_ident(), self.start, wall)
+            )
+
+
+class Profiler:
+    """Accumulates phase timers, per-file timings and trace events."""
+
+    def __init__(
+        self, slowest: int = DEFAULT_SLOWEST, trace: bool = False, histograms: bool = True
+    ):
+        """Start the clocks.
+
+        Args:
+            slowest: Number of slowest files to keep
+            trace: Record every phase and file as a trace event
+            histograms: Keep duration histograms per phase
+        """
+        self.slowest = slowest
+        self.trace = trace
+        # Phase name ('file' for whole files) -> count per DURATION_BUCKETS
+        # bucket, plus one for longer durations. A phase inside per-file work
+        # is observed once per file, other phases once per call.
+        self.histograms: Optional[Dict[str, List[int]]] = {} if histograms else None
+        # Phase name -> [calls, self wall seconds, self CPU seconds]
+        self.phases: Dict[str, List[float]] = {}
+        # Counter name -> total, e.g. bytes read, mapped or decoded
+        self.counters: Dict[str, int] = {}
+        self.events: List[TraceEvent] = []
+        self.files = 0
+        self.files_wall = 0.0
+        self.files_cpu = 0.0
+        self._slowest: List[Tuple[float, float, str]] = []  # min-heap of (wall, cpu, path)
+        self._stack: List[_Phase] = []
+        self.pid = os.getpid()
+        self.started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    def phase(self, name: str) -> _Phase:
+        """Time a phase of work."""
+        return _Phase(self, name)
+
+    def count(self, name: str, amount: int) -> None:
+        """Add to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Add a duration to the histogram of a phase."""
+        counts = self.histograms.get(name)
+        if counts is None:
+            counts = self.histograms[name] = [0] * (len(DURATION_BUCKETS) + 1)
+        counts[bisect_left(DURATION_BUCKETS, seconds)] += 1
+
+    def add_item(self, label: str, timing: ItemTiming) -> None:
+        """Record the timing of one item of per-file work."""
+        self.files += 1
+        self.files_wall += timing.wall
+        self.files_cpu += timing.cpu
+        entry = (timing.wall, timing.cpu, label)
+        if len(self._slowest) < self.slowest:
+            heapq.heappush(self._slowest, entry)
+        elif self._slowest and entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+        for name, (calls, wall, cpu) in timing.phases.items():
+            totals = self.phases.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += calls
+            totals[1] += wall
+            totals[2] += cpu
+            if self.histograms is not None:
+                self.observe(name, wall)
+        for name, amount in (timing.counters or {}).items():
+            self.count(name, amount)
+        if self.histograms is not None:
+            self.observe("file", timing.wall)
+        if self.trace:
+            self.events.append(
+                (label, "file", timing.pid, timing.tid, timing.start, timing.wall)
+            )
+            self.events.extend(timing.events)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the profile for JSON output (the versioned 'profile' block)."""
+        phases = sorted(self.phases.items(), key=lambda item: -item[1][1])
+        return {
+            "version": PROFILE_FORMAT_VERSION,
+            "wall_s": round(time.perf_counter() - self.started, 6),
+            "cpu_s": round(time.process_time() - self._cpu_started, 6),
+            "phases": {
+                name: {"calls": int(calls), "wall_s": round(wall, 6), "cpu_s": round(cpu, 6)}
+                for name, (calls, wall, cpu) in phases
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "files": {
+                "count": self.files,
+                "wall_s": round(self.files_wall, 6),
+                "cpu_s": round(self.files_cpu, 6),
+            },
+            "slowest_files": [
+                {"path": path, "wall_s": round(wall, 6), "cpu_s": round(cpu, 6)}
+                for wall, cpu, path in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def format_summary(self) -> str:
+        """Render the profile as a human-readable table."""
+        profile = self.to_dict()
+        lines = [
+            f"⏱  Profile: {profile['wall_s']:.3f}s wall, {profile['cpu_s']:.3f}s CPU "
+            f"in this process",
+            f"  {'phase':<16}{'calls':>9}{'wall s':>11}{'cpu s':>11}",
+        ]
+        for name, totals in profile["phases"].items():
+            lines.append(
+                f"  {name:<16}{totals['calls']:>9}{totals['wall_s']:>11.3f}"
+                f"{totals['cpu_s']:>11.3f}"
+            )
+        if profile["counters"]:
+            lines.append("  " + ", ".join(
+                f"{name} {value:,}" for name, value in profile["counters"].items()
+            ))
+        files = profile["files"]
+        if files["count"]:
+            lines.append(
+                f"  {files['count']} files: {files['wall_s']:.3f}s wall, "
+                f"{files['cpu_s']:.3f}s CPU in total; slowest:"
+            )
+            for entry in profile["slowest_files"]:
+                lines.append(f"    {entry['wall_s'] * 1000:9.2f} ms  {entry['path']}")
+        return "\n".join(lines)
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Return the recorded events in Chrome trace-event format."""
+        origin = self.started
+        pids = sorted({event[2] for event in self.events} | {self.pid})
+        events: List[Dict[str, Any]] = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": "lim" if pid == self.pid else f"lim worker {pid}"},
+            }
+            for pid in pids
+        ]
+        for name, category, pid, tid, start, duration in self.events:
+            events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "pid": pid,
+                "tid": tid,
+                "ts": round((start - origin) * 1e6, 3),
+                "dur": round(duration * 1e6, 3),
+            })
+        return events
+
+    def write_trace(self, path: str) -> None:
+        """Write a Chrome trace-event JSON file, viewable in Perfetto or chrome://tracing."""
+        import json
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"},
+                f,
+                separators=(",", ":"),
+            )
+
+
+def start(slowest: int = DEFAULT_SLOWEST, trace: bool = False) -> Profiler:
+    """Activate a new profiler in this process."""
+    global _active
+    _active = Profiler(slowest, trace)
+    return _active
+
+
+def stop() -> Optional[Profiler]:
+    """Deactivate the profiler and return it."""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def active() -> Optional[Profiler]:
+    """Return the profiler receiving phases in this thread, if any."""
+    profiler = getattr(_local, "profiler", None)
+    return profiler if profiler is not None else _active
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Time a phase of work if a profiler is active."""
+    profiler = active()
+    if profiler is None:
+        return _NULL
+    return profiler.phase(name)
+
+
+def count(name: str, amount: int) -> None:
+    """Add to a counter of the active profiler, if any."""
+    profiler = active()
+    if profiler is not None:
+        profiler.count(name, amount)
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate a function so that each call is timed as a phase."""
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = active()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def attach(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the active profile to a JSON output document, as its 'profile' block."""
+    if _active is not None:
+        document["profile"] = _active.to_dict()
+    return document
+
+
+def item_label(item: Any) -> str:
+    """Name an item of per-file work after its file: the first path-like field.
+
+    Absolute paths below the working directory are shown relative to it.
+    """
+    if isinstance(item, tuple):
+        paths = [field for field in item if isinstance(field, os.PathLike)]
+        item = paths[0] if paths else (item[0] if item else "")
+    if not isinstance(item, os.PathLike):
+        return str(item)
+    path = os.fspath(item)
+    if os.path.isabs(path):
+        relative = os.path.relpath(path)
+        if not relative.startswith(".."):
+            return relative
+    return path
+
+
+class Profiled:
+    """Wraps a per-item function to time each call where it runs.
+
+    Picklable whenever the wrapped function is, so it can be shipped to
+    worker processes like the function itself.
+    """
+
+    def __init__(self, func: Callable[[Any], Any], trace: bool = False):
+        self.func = func
+        self.trace = trace
+
+    def __call__(self, item: Any) -> Tuple[Any, ItemTiming]:
+        outer = getattr(_local, "profiler", None)
+        profiler = _local.profiler = Profiler(slowest=0, trace=self.trace, histograms=False)
+        cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            result = self.func(item)
+        finally:
+            wall = time.perf_counter() - start
+            _local.profiler = outer
+        timing = ItemTiming(
+            os.getpid(),
+            threading.get_ident(),
+            start,
+            wall,
+            time.process_time() - cpu,
+            profiler.phases,
+            profiler.events,
+            profiler.counters,
+        )
+        return result, timing
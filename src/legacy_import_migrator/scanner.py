@@ -0,0 +1,180 @@
+"""Single-read scanning core shared by ImportTracker and LegacyImportChecker.
+
+Each file is read once as bytes, or memory-mapped if it is large (see
+``read_source``). The allow marker and the byte prefilter are checked on the
+raw bytes; only files that may contain a legacy import are decoded (once)
+and handed to an extraction engine, which reports every import
+with its line number in a single linear pass. Both the tracker and the
+checker therefore see the same, parser-accurate sites, including multi-line
+and nested imports.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .extract import DEFAULT_ENGINE, ENGINES, extract_imports, line_texts
+from .patterns import PatternTrie
+from .prefilter import PatternPrefilter
+from .profiling import count, phase
+
+# Inline marker allowing legacy imports in a whole file
+ALLOW_MARKER = "LEGACY-ALLOW"
+
+# Files of at least this many bytes are memory-mapped instead of read, in
+# one-shot commands (see mmap_threshold())
+MMAP_THRESHOLD = 1 << 20
+
+# Raw file content: bytes, or a read-only memory map of a large file
+Source = Union[bytes, mmap.mmap]
+
+# Cleared by long-running processes (lim serve): a file truncated while it
+# is mapped raises SIGBUS, which kills the whole process
+_mmap_enabled = True
+
+
+def set_mmap(enabled: bool) -> None:
+    """Allow or forbid memory-mapping for the commands run by this process."""
+    global _mmap_enabled
+    _mmap_enabled = enabled
+
+
+def mmap_threshold() -> Optional[int]:
+    """Return the mapping threshold for a command: MMAP_THRESHOLD, or None if forbidden."""
+    return MMAP_THRESHOLD if _mmap_enabled else None
+
+
+@contextmanager
+def read_source(path: Path, mmap_threshold: Optional[int] = None) -> Iterator[Source]:
+    """Open a file's raw content for scanning.
+
+    By default the file is read into a bytes object. With a threshold,
+    larger files are mapped read-only instead, so searching them pages the
+    file in from the page cache without copying it onto the heap; only a
+    file that must be parsed is then decoded, straight from the mapping.
+    The mapping is closed on exit, so nothing derived from it may be kept.
+    Filesystems that cannot map files fall back to reading.
+
+    Only one-shot commands should map: if the file is truncated while it is
+    mapped, touching the lost pages kills the process with SIGBUS. A read
+    file stays intact whatever happens to it afterwards.
+
+    Args:
+        path: File to open
+        mmap_threshold: Size in bytes from which to map, or None to always read
+
+    Raises:
+        OSError: If the file cannot be opened or read
+    """
+    mapping = None
+    with phase("read"), open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if mmap_threshold is not None and size >= max(mmap_threshold, 1):
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapping = None
+        if mapping is None:
+            data = f.read()
+    if mapping is None:
+        count("bytes_read", len(data))
+        yield data
+        return
+    count("bytes_mapped", len(mapping))
+    try:
+        yield mapping
+    finally:
+        mapping.close()
+
+
+class FileScan(NamedTuple):
+    """Result of scanning one file's content."""
+    marker: bool  # the allow marker occurs in the file
+    sites: List[Tuple[int, str]]  # (lineno, module) of each legacy import
+    lines: List[str]  # text of each site's line, if requested
+    prefiltered: bool = False  # skipped by the prefilter without decoding
+
+
+class SourceScanner:
+    """Finds legacy imports and the allow marker in file contents."""
+
+    def __init__(
+        self,
+        legacy_patterns: Iterable[str],
+        engine: str = DEFAULT_ENGINE,
+        allow_marker: str = ALLOW_MARKER,
+        src_prefix: bool = False,
+    ):
+        """Compile the patterns.
+
+        Args:
+            legacy_patterns: Legacy module patterns, e.g. ['old_pkg', 'company.legacy']
+            engine: Import extraction engine, 'ast' or 'tokenize'
+            allow_marker: Inline marker allowing legacy imports in a file
+            src_prefix: Also match module names with a leading 'src.'
+
+        Raises:
+            ValueError: If the engine is unknown
+        """
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown extraction engine: {engine!r} (expected one of {', '.join(ENGINES)})"
+            )
+        self.engine = engine
+        self.allow_marker = allow_marker
+        self.src_prefix = src_prefix
+        self.matcher = PatternTrie(legacy_patterns)
+        self.prefilter = PatternPrefilter(self.matcher)
+        self._marker_bytes = allow_marker.encode("utf-8")
+
+    def is_legacy(self, module_name: str) -> bool:
+        """Check a module name against the legacy patterns."""
+        if self.matcher.match(module_name) is not None:
+            return True
+        return (
+            self.src_prefix
+            and module_name.startswith("src.")
+            and self.matcher.match(module_name[4:]) is not None
+        )
+
+    def find_sites(self, content: str) -> List[Tuple[int, str]]:
+        """Return (lineno, module) for each legacy import in decoded source."""
+        with phase("parse"):
+            records = extract_imports(content, self.engine)
+        with phase("match"):
+            return [
+                (record.lineno, record.module)
+                for record in records
+                if record.module and self.is_legacy(record.module)
+            ]
+
+    def scan(
+        self, data: Source, with_lines: bool = False, stop_at_marker: bool = False
+    ) -> FileScan:
+        """Scan the raw content of a file.
+
+        Args:
+            data: File content as bytes or a memory map (see read_source())
+            with_lines: Also return the text of each site's line
+            stop_at_marker: Skip extraction in files carrying the allow marker
+
+        Returns:
+            FileScan with the marker flag and legacy import sites
+        """
+        with phase("prefilter"):
+            marker = data.find(self._marker_bytes) != -1
+            if marker and stop_at_marker:
+                return FileScan(marker, [], [])
+            if not self.prefilter.may_match(data):
+                return FileScan(marker, [], [], prefiltered=True)
+
+        with phase("decode"):
+            content = str(data, "utf-8", "replace")
+        count("bytes_decoded", len(data))
+        sites = self.find_sites(content)
+        lines = line_texts(content, [lineno for lineno, _ in sites]) if with_lines else []
+        return FileScan(marker, sites, lines)
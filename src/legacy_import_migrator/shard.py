@@ -0,0 +1,65 @@
+"""Deterministic partitioning of a file set across CI jobs.
+
+``--shard i/n`` splits the files a scan or check would see into n disjoint
+parts. Files are ordered by a hash of their relative path, which is stable
+across machines and independent of discovery order, and the ordered list is
+cut into n contiguous ranges of roughly equal total size. Every shard computes
+the same cut from the same file set, so no coordination is needed, and the
+work per shard is balanced by bytes rather than by file count.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Iterable, Set, Tuple
+
+Shard = Tuple[int, int]  # (1-based index, count)
+
+
+def parse_shard(spec: str) -> Shard:
+    """Parse a shard specification of the form 'i/n', with 1 <= i <= n.
+
+    Raises:
+        ValueError: If the specification is malformed or out of range
+    """
+    index, sep, count = spec.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not sep or not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"Invalid shard {spec!r}: expected i/n with 1 <= i <= n")
+    return shard
+
+
+def _path_key(rel_path: str) -> bytes:
+    return hashlib.blake2b(rel_path.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+
+
+def shard_members(
+    rel_paths: Iterable[str], shard: Shard, size_of: Callable[[str], int]
+) -> Set[str]:
+    """Select the files belonging to one shard.
+
+    Args:
+        rel_paths: The full file set, as relative POSIX paths
+        shard: (index, count) of the shard to select
+        size_of: Returns a file's size in bytes; empty and unreadable files
+            weigh as one byte
+
+    Returns:
+        The paths assigned to the shard
+    """
+    index, count = shard
+    ordered = sorted(rel_paths, key=_path_key)
+    weights = [max(size_of(rel_path), 1) for rel_path in ordered]
+    total = sum(weights)
+    members = set()
+    position = 0
+    for rel_path, weight in zip(ordered, weights):
+        # Each file goes to the shard holding the midpoint of its byte range
+        owner = min((2 * position + weight) * count // (2 * total), count - 1)
+        if owner == index - 1:
+            members.add(rel_path)
+        position += weight
+    return members
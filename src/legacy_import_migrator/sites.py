@@ -0,0 +1,110 @@
+"""Compact in-memory storage of legacy import sites.
+
+A repository with a million legacy import sites cannot afford an object per
+site: an ``ImportSite`` with its own ``Path`` costs a few hundred bytes.
+``SiteTable`` keeps sites column-wise in typed arrays instead. Paths and
+module names are stored once each, in tables referenced by integer IDs, and
+whether a file is allowed is recorded once per file. A site then costs about
+twelve bytes (see ``tools/bench_sites.py`` for the measured bound).
+
+Progress itself never needs every site: ``ImportTracker.scan()`` tallies
+per-file counts as results arrive and does not fill a table. One is built
+only when a caller asks for it, such as ``lim scan --metrics-out`` for its
+per-root and per-pattern breakdown.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# (relative POSIX path, lineno, module, allowed)
+SiteRow = Tuple[str, int, str, bool]
+
+
+class SiteTable:
+    """Append-only columnar table of legacy import sites."""
+
+    def __init__(self) -> None:
+        self.paths: List[str] = []
+        self.modules: List[str] = []
+        self._path_ids: Dict[str, int] = {}
+        self._module_ids: Dict[str, int] = {}
+        # Per path: allowed flag and number of sites
+        self._allowed = bytearray()
+        self._file_counts = array("I")
+        # Per site
+        self._site_paths = array("I")
+        self._linenos = array("I")
+        self._site_modules = array("I")
+
+    def __len__(self) -> int:
+        return len(self._linenos)
+
+    def _path_id(self, rel_path: str, allowed: bool) -> int:
+        path_id = self._path_ids.get(rel_path)
+        if path_id is None:
+            path_id = self._path_ids[rel_path] = len(self.paths)
+            self.paths.append(rel_path)
+            self._allowed.append(allowed)
+            self._file_counts.append(0)
+        return path_id
+
+    def add_file(self, rel_path: str, sites: Iterable[Tuple[int, str]], allowed: bool) -> None:
+        """Record the legacy import sites of a file.
+
+        Args:
+            rel_path: Relative POSIX path of the file
+            sites: (lineno, module) pairs
+            allowed: Whether the file may have legacy imports
+        """
+        path_id = None
+        module_ids = self._module_ids
+        for lineno, module in sites:
+            if path_id is None:
+                path_id = self._path_id(rel_path, allowed)
+            module_id = module_ids.get(module)
+            if module_id is None:
+                module_id = module_ids[module] = len(self.modules)
+                self.modules.append(module)
+            self._site_paths.append(path_id)
+            self._linenos.append(lineno)
+            self._site_modules.append(module_id)
+            self._file_counts[path_id] += 1
+
+    def __iter__(self) -> Iterator[SiteRow]:
+        """Yield sites as (path, lineno, module, allowed) in insertion order."""
+        paths, modules, allowed = self.paths, self.modules, self._allowed
+        for path_id, lineno, module_id in zip(self._site_paths, self._linenos, self._site_modules):
+            yield paths[path_id], lineno, modules[module_id], bool(allowed[path_id])
+
+    def counts(self) -> Tuple[int, int]:
+        """Return the numbers of (blocking, allowed) sites."""
+        allowed = sum(
+            count for count, flag in zip(self._file_counts, self._allowed) if flag
+        )
+        return len(self) - allowed, allowed
+
+    def blocking_by_file(self) -> List[Tuple[str, int]]:
+        """Return (path, blocking sites) per file, by count descending, then path."""
+        by_file = [
+            (path, count)
+            for path, count, flag in zip(self.paths, self._file_counts, self._allowed)
+            if count and not flag
+        ]
+        return sorted(by_file, key=lambda item: (-item[1], item[0]))
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table, including its strings."""
+        size = sum(
+            sys.getsizeof(column)
+            for column in (
+                self._allowed, self._file_counts,
+                self._site_paths, self._linenos, self._site_modules,
+                self.paths, self.modules, self._path_ids, self._module_ids,
+            )
+        )
+        return size + sum(sys.getsizeof(s) for s in self.paths) + sum(
+            sys.getsizeof(s) for s in self.modules
+        )
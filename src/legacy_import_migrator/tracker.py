@@ -6,22 +6,39 @@ for Python codebases undergoing namespace migrations.
 
 from __future__ import annotations
 
-import ast
 import json
 import os
 import subprocess
 import sys
 from collections import Counter
 from dataclasses import asdict, dataclass
-from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
-# Default ignore patterns for common directories
-DEFAULT_IGNORE_DIRS = {
-    ".git", ".venv", ".mypy_cache", ".pytest_cache", "__pycache__",
-    ".tox", ".coverage", "node_modules", "dist", "build"
-}
+from .cache import (
+    ScanCache,
+    ScanTask,
+    ScanTaskResult,
+    cached_scan,
+    content_digest,
+    make_fingerprint,
+)
+from .discovery import (
+    DEFAULT_IGNORE_DIRS,
+    FILES_FROM_GIT,
+    _normalize_root,
+    discover_py_files,
+    select_py_paths,
+)
+from .extract import DEFAULT_ENGINE, extract_import_names
+from .gitblobs import BlobReader, first_parent_commits, list_py_blobs, resolve_rev
+from .globs import GlobSet
+from .graph import ImportGraph, module_name, resolve_relative
+from .parallel import parallel_map, resolve_jobs
+from .profiling import phase, timed
+from .scanner import ALLOW_MARKER, Source, SourceScanner, read_source
+from .shard import Shard, shard_members
+from .sites import SiteTable
 
 # Default allow patterns for migration tracking
 DEFAULT_ALLOW_PATTERNS = [
@@ -31,13 +48,60 @@ DEFAULT_ALLOW_PATTERNS = [
     "experiments/**",
 ]
 
+# Format version of the per-file index stored in the baseline
+BASELINE_INDEX_VERSION = 1
 
-@dataclass
+# Number of files whose blobs are read from git before they are scanned
+BLOB_BATCH_SIZE = 512
+
+# Default number of files in flight in ascan()
+DEFAULT_IO_CONCURRENCY = 32
+
+# Per-instance __dict__ is dropped where dataclasses support it (Python 3.10+)
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class ImportSite:
     """Represents a single legacy import site in the codebase."""
     path: Path
     lineno: int
     module: str  # full module name found (e.g., "src.legacy_module.submodule")
+    allowed: bool = False  # allowed by a LEGACY-ALLOW marker or allow glob
+    
+    def to_dict(self, root: Optional[Path] = None) -> Dict[str, Any]:
+        """Convert to dictionary for JSON output.
+        
+        Args:
+            root: If given, the path is reported relative to it
+        """
+        path = self.path
+        if root is not None:
+            try:
+                path = path.relative_to(root)
+            except ValueError:
+                pass
+        return {
+            "path": path.as_posix(),
+            "lineno": self.lineno,
+            "module": self.module,
+            "allowed": self.allowed,
+        }
+
+
+@dataclass
+class ScanStats:
+    """Counters describing how a scan spent its work."""
+    files_parsed: int = 0
+    files_prefiltered: int = 0  # read but skipped without decoding or parsing
+    cache_hits: int = 0
+    cache_misses: int = 0
+    files_reused: int = 0  # taken from the baseline index without reading
+    blobs_shared: int = 0  # files at a revision whose identical blob was already scanned
+    
+    def to_dict(self) -> Dict[str, int]:
+        """Convert to dictionary for JSON output."""
+        return asdict(self)
 
 
 @dataclass
@@ -54,6 +118,10 @@ class MigrationProgress:
     blocking_by_file: List[Tuple[str, int]]
     baseline_file: Optional[Path] = None
     baseline_commit: Optional[str] = None
+    stats: Optional[ScanStats] = None
+    index: Optional[Dict[str, Any]] = None  # per-file baseline index, not in JSON output
+    rev: Optional[str] = None  # commit scanned instead of the working tree
+    shard: Optional[Shard] = None  # (index, count) of a partial scan, see merge.py
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON output."""
@@ -72,15 +140,35 @@ class MigrationProgress:
             "blocking_by_file": self.blocking_by_file,
         }
         
+        if self.rev:
+            result["rev"] = self.rev
+            
+        if self.shard:
+            result["shard"] = {"index": self.shard[0], "count": self.shard[1]}
+            
         if self.baseline_file:
             result["baseline"] = {
                 "file": str(self.baseline_file),
                 "commit": self.baseline_commit or "",
             }
             
+        if self.stats:
+            result["stats"] = self.stats.to_dict()
+            
         return result
 
 
+@dataclass
+class HistoryPoint:
+    """Migration progress at one commit of a history walk."""
+    committed_at: str  # ISO 8601 committer date
+    progress: MigrationProgress
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for NDJSON output."""
+        return dict(self.progress.to_dict(), committed_at=self.committed_at)
+
+
 class ImportTracker:
     """Tracks legacy imports in Python codebases."""
     
@@ -89,6 +177,12 @@ class ImportTracker:
         legacy_patterns: Optional[List[str]] = None,
         allow_patterns: Optional[List[str]] = None,
         baseline_file: str = ".cache/migration_baseline.json",
+        cache_dir: Optional[str] = None,
+        engine: str = DEFAULT_ENGINE,
+        exclude_patterns: Optional[List[str]] = None,
+        gitignore: bool = True,
+        mmap_threshold: Optional[int] = None,
+        with_digests: bool = False,
     ):
         """Initialize the tracker.
         
@@ -96,11 +190,33 @@ class ImportTracker:
             legacy_patterns: List of legacy import patterns to track
             allow_patterns: List of glob patterns for allowed legacy imports
             baseline_file: Path to baseline file for tracking progress
+            cache_dir: Directory for the persistent per-file result cache
+                (disabled if None)
+            engine: Import extraction engine, 'ast' or 'tokenize'
+            exclude_patterns: Glob patterns for files and directories to skip
+            gitignore: Skip files and directories ignored by .gitignore files
+            mmap_threshold: Memory-map files of at least this many bytes
+                instead of reading them (never if None); only safe in
+                one-shot scans, see scanner.read_source()
+            with_digests: Always compute content hashes, so that scan_one()
+                can recognize unchanged content without a cache
         """
+        self._scanner = SourceScanner(legacy_patterns or [], engine)
         self.legacy_patterns = legacy_patterns or []
         self.allow_patterns = (allow_patterns or []) + DEFAULT_ALLOW_PATTERNS
+        self._allow = GlobSet(self.allow_patterns)
+        self.exclude_patterns = exclude_patterns or []
+        self._exclude = GlobSet(self.exclude_patterns)
+        self.gitignore = gitignore
         self.baseline_file = Path(baseline_file)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.engine = engine
+        self.mmap_threshold = mmap_threshold
+        self.with_digests = with_digests
+        # Compute content hashes for the current scan only (for the baseline index)
+        self._with_digests = False
         
+    @timed("git")
     def _repo_root(self) -> Path:
         """Get the repository root directory."""
         try:
@@ -114,6 +230,15 @@ class ImportTracker:
         except Exception:
             return Path.cwd().resolve()
             
+    def repo_root(self) -> Path:
+        """Return the repository root that scanned paths are relative to."""
+        return self._repo_root()
+        
+    @property
+    def exclude_globs(self) -> GlobSet:
+        """The compiled exclude patterns, as applied by file discovery."""
+        return self._exclude
+        
     def _to_posix_rel(self, root: Path, path: Path) -> str:
         """Convert path to POSIX relative path."""
         try:
@@ -123,61 +248,461 @@ class ImportTracker:
             
     def _is_legacy_import(self, module_name: str) -> bool:
         """Check if a module name matches legacy patterns."""
-        return any(
-            module_name == pattern or module_name.startswith(pattern + ".")
-            for pattern in self.legacy_patterns
-        )
+        return self._scanner.is_legacy(module_name)
         
-    def _extract_ast_imports(self, file_path: Path) -> List[ImportSite]:
-        """Extract legacy imports from a Python file using AST."""
-        sites = []
-        try:
-            content = file_path.read_text(encoding="utf-8", errors="replace")
-            tree = ast.parse(content)
-        except (SyntaxError, UnicodeDecodeError, OSError):
-            return sites
-            
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    if self._is_legacy_import(alias.name):
-                        sites.append(ImportSite(
-                            path=file_path,
-                            lineno=node.lineno,
-                            module=alias.name
-                        ))
-            elif isinstance(node, ast.ImportFrom) and node.module:
-                if self._is_legacy_import(node.module):
-                    sites.append(ImportSite(
-                        path=file_path,
-                        lineno=node.lineno,
-                        module=node.module
-                    ))
-                    
-        return sites
+    def _extract_ast_imports(
+        self, file_path: Path, content: Optional[str] = None
+    ) -> List[ImportSite]:
+        """Extract legacy imports from a Python file.
+        
+        Uses the tracker's extraction engine ('ast' by default, see extract.py).
+        
+        Args:
+            file_path: Path of the file, recorded on each site
+            content: Source text, read from file_path if None
+        """
+        if content is not None:
+            sites = self._scanner.find_sites(content)
+        else:
+            # Read through the prefilter, so files without a hit are never decoded
+            try:
+                with read_source(file_path, self.mmap_threshold) as data:
+                    sites = self._scanner.scan(data).sites
+            except OSError:
+                return []
+                
+        return [
+            ImportSite(path=file_path, lineno=lineno, module=module)
+            for lineno, module in sites
+        ]
         
     def _is_allowed(self, rel_path: str, content: str) -> bool:
         """Check if file is allowed to have legacy imports."""
         # Check for inline allow marker
-        if "LEGACY-ALLOW" in content:
+        if ALLOW_MARKER in content:
             return True
             
-        # Check glob patterns
-        return any(fnmatch(rel_path, pattern) for pattern in self.allow_patterns)
+        return self._is_allowed_path(rel_path)
+        
+    def _is_allowed_path(self, rel_path: str) -> bool:
+        """Check if a path matches one of the allow glob patterns."""
+        return self._allow.match(rel_path) is not None
+        
+    def allow_reason(self, rel_path: str, marker: bool) -> Optional[str]:
+        """Explain why a file is allowed to have legacy imports.
+        
+        Returns:
+            'LEGACY-ALLOW marker', 'glob <pattern>' for the first matching
+            allow pattern, or None if the file is not allowed
+        """
+        if marker:
+            return f"{ALLOW_MARKER} marker"
+        pattern = self._allow.match(rel_path)
+        return f"glob {pattern}" if pattern is not None else None
+        
+    def _scan_file(self, task: ScanTask) -> ScanTaskResult:
+        """Read and scan a single file, reading and decoding it at most once.
+        
+        This is the unit of work shipped to worker processes, so it must only
+        depend on picklable tracker state.
+        
+        Args:
+            task: Tuple of (file path, cached content hash or None). If the file
+                still hashes to the cached value, extraction is skipped.
+            
+        Returns:
+            Tuple of (payload, content hash) where payload holds the legacy
+            import sites as [lineno, module] pairs and the allow marker flag,
+            or is None when the content is unchanged. Files rejected by the
+            byte prefilter are never decoded and carry a 'prefiltered' flag.
+            The content hash is only computed when the cache is enabled.
+        """
+        py_file, known_digest = task
+        try:
+            with read_source(py_file, self.mmap_threshold) as data:
+                return self._scan_data(data, known_digest)
+        except OSError:
+            return {"sites": [], "marker": False}, ""
+        
+    def scan_one(self, path: Path, known_digest: Optional[str] = None) -> ScanTaskResult:
+        """Scan a single file outside of a full scan.
+        
+        Args:
+            path: Path of the file
+            known_digest: Content hash from an earlier scan of the file, if any
+            
+        Returns:
+            Tuple of (payload, content hash) as for _scan_file(); the payload is
+            None if the file still hashes to known_digest, which needs the
+            cache or with_digests to be enabled
+        """
+        return self._scan_file((path, known_digest))
+        
+    def _scan_read(self, task: Tuple[Optional[bytes], Optional[str]]) -> ScanTaskResult:
+        """Scan content read by the asynchronous pipeline; see _scan_file().
+        
+        Args:
+            task: Tuple of (file content, or None if it could not be read,
+                cached content hash or None)
+        """
+        data, known_digest = task
+        if data is None:
+            return {"sites": [], "marker": False}, ""
+        return self._scan_data(data, known_digest)
+        
+    def _scan_data(self, data: Source, known_digest: Optional[str] = None) -> ScanTaskResult:
+        """Scan file content; see _scan_file() for the result."""
+        with phase("hash"):
+            with_digests = self.cache_dir or self.with_digests or self._with_digests
+            digest = content_digest(data) if with_digests else ""
+        if known_digest and digest == known_digest:
+            return None, digest
+            
+        scan = self._scanner.scan(data)
+        if scan.prefiltered:
+            return {"sites": [], "marker": False, "prefiltered": True}, digest
+        return {
+            "sites": [[lineno, module] for lineno, module in scan.sites],
+            "marker": scan.marker,
+        }, digest
+        
+    def _graph_file(self, task: ScanTask) -> ScanTaskResult:
+        """Read a file and extract every import, legacy or not, for the import graph.
+        
+        Args:
+            task: Tuple of (file path, cached content hash or None), as for
+                _scan_file()
+            
+        Returns:
+            Tuple of (payload, content hash) where payload holds the imports as
+            [module, level, names] triples, or is None when the content is
+            unchanged
+        """
+        py_file, known_digest = task
+        try:
+            with read_source(py_file, self.mmap_threshold) as data:
+                with phase("hash"):
+                    digest = content_digest(data) if self.cache_dir else ""
+                if known_digest and digest == known_digest:
+                    return None, digest
+                with phase("decode"):
+                    source = str(data, "utf-8", "replace")
+        except OSError:
+            return {"imports": []}, ""
+        with phase("parse"):
+            records = extract_import_names(source)
+        return {"imports": [list(record) for record in records]}, digest
+        
+    def _open_cache(self, kind: str = "tracker") -> Optional[ScanCache]:
+        """Open the persistent result cache for the current settings.
+        
+        Args:
+            kind: 'tracker' for legacy import sites, 'graph' for all imports
+        """
+        if self.cache_dir is None:
+            return None
+        if kind == "graph":
+            fingerprint = make_fingerprint("graph", [])
+        else:
+            fingerprint = make_fingerprint(
+                "tracker", self.legacy_patterns, [ALLOW_MARKER, self.engine]
+            )
+        return ScanCache.open(str(self.cache_dir), fingerprint)
+        
+    def _iter_file_results(
+        self,
+        files: List[Tuple[str, Path]],
+        jobs: int,
+        stats: ScanStats,
+        index: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Tuple[str, List[ImportSite], Optional[str]]]:
+        """Scan files through the cache and yield results in input order.
+        
+        Args:
+            files: (relative POSIX path, path) pairs
+            jobs: Number of worker processes
+            stats: Counters updated as results come in
+            index: If given, filled with a baseline index entry per file
+            
+        Yields:
+            Tuples of (relative path, legacy import sites, allow reason).
+            The allow reason is None for files whose sites are blocking.
+        """
+        cache = self._open_cache()
+        
+        try:
+            results = cached_scan(cache, files, self._scan_file, jobs=jobs)
+            yield from self._payload_results(results, stats, index)
+        finally:
+            if cache is not None:
+                stats.cache_hits = cache.hits
+                stats.cache_misses = cache.misses
+        
+    def iter_file_results(
+        self,
+        files: List[Tuple[str, Path]],
+        jobs: int = 1,
+        stats: Optional[ScanStats] = None,
+        index: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Tuple[str, List[ImportSite], Optional[str]]]:
+        """Scan files, e.g. from select_files(), and yield results in input order.
+        
+        Args:
+            files: (relative POSIX path, path) pairs
+            jobs: Number of worker processes
+            stats: Counters updated as results come in
+            index: If given, filled with a baseline index entry per file
+            
+        Yields:
+            Tuples of (relative path, legacy import sites, allow reason).
+            The allow reason is None for files whose sites are blocking.
+        """
+        return self._iter_file_results(files, jobs, stats or ScanStats(), index)
+        
+    def _payload_results(
+        self,
+        results: Iterable[Tuple[str, Path, Any, bool, str]],
+        stats: ScanStats,
+        index: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Tuple[str, List[ImportSite], Optional[str]]]:
+        """Turn cached_scan() results into per-file sites; see _iter_file_results()."""
+        for rel_path, py_file, payload, parsed, digest in results:
+            if parsed:
+                if payload.get("prefiltered"):
+                    stats.files_prefiltered += 1
+                else:
+                    stats.files_parsed += 1
+            if index is not None:
+                index[rel_path] = self._index_entry(payload, digest)
+            yield rel_path, *self._file_sites(rel_path, py_file, payload)
+            
+    def _file_sites(
+        self, rel_path: str, py_file: Path, payload: Dict[str, Any]
+    ) -> Tuple[List[ImportSite], Optional[str]]:
+        """Build the sites of a file from its payload and decide if they are allowed."""
+        sites = [
+            ImportSite(path=py_file, lineno=lineno, module=module)
+            for lineno, module in payload["sites"]
+        ]
+        with phase("allow"):
+            reason = self.allow_reason(rel_path, payload["marker"]) if sites else None
+        if reason is not None:
+            for site in sites:
+                site.allowed = True
+        return sites, reason
+        
+    @staticmethod
+    def _index_entry(payload: Dict[str, Any], digest: str) -> Dict[str, Any]:
+        """Build the baseline index entry of a file from its scan payload.
+        
+        Whether a file is allowed is not stored, only its marker flag: allow
+        globs are applied when the index is read, so they can change freely.
+        """
+        return {"digest": digest, "marker": payload["marker"], "sites": payload["sites"]}
         
-    def _iter_py_files(self, root: Path, search_roots: List[str]) -> Iterable[Path]:
-        """Iterate over Python files in search roots."""
-        for root_str in search_roots:
-            search_path = root / root_str
-            if not search_path.exists():
+    def _index_fingerprint(self, search_roots: List[str], files_from: Optional[str]) -> str:
+        """Identify the settings a baseline index is valid for."""
+        source = "walk" if files_from is None else files_from
+        return make_fingerprint(
+            "baseline-index",
+            self.legacy_patterns,
+            [ALLOW_MARKER, self.engine, f"gitignore={self.gitignore}", f"source={source}"],
+            [os.path.normpath(root) for root in search_roots],
+            self.exclude_patterns,
+        )
+        
+    @timed("git")
+    def _changed_since(self, root: Path, commit: str, untracked: bool = True) -> Optional[Set[str]]:
+        """List paths that differ between a commit and the worktree.
+        
+        Covers committed, staged and unstaged changes, both sides of renames,
+        deletions and (optionally) untracked files not ignored by git.
+        
+        Returns:
+            Set of POSIX paths relative to root, or None if git failed
+        """
+        commands = [["git", "diff", "--name-only", "-z", "--no-renames", commit, "--"]]
+        if untracked:
+            commands.append(["git", "ls-files", "-z", "--others", "--exclude-standard"])
+        changed: Set[str] = set()
+        for command in commands:
+            try:
+                output = subprocess.run(command, cwd=root, capture_output=True, check=True).stdout
+            except (OSError, subprocess.CalledProcessError):
+                return None
+            changed.update(output.decode("utf-8", errors="surrogateescape").split("\0"))
+        changed.discard("")
+        return changed
+        
+    def _iter_incremental_results(
+        self,
+        root: Path,
+        baseline: Dict[str, Any],
+        search_roots: List[str],
+        files_from: Optional[str],
+        jobs: int,
+        stats: ScanStats,
+        verbose: bool = False,
+    ) -> Optional[Tuple[int, Iterator[Tuple[str, List[ImportSite], Optional[str]]]]]:
+        """Rescan only the files changed since the baseline, using its index.
+        
+        Files changed between the baseline commit and the worktree (plus files
+        that were already dirty when the baseline was written) are rescanned;
+        every other file's sites are taken from the baseline index.
+        
+        Returns:
+            Tuple of (number of files, per-file results as yielded by
+            _iter_file_results), or None if the baseline has no usable index
+        """
+        index = baseline.get("index")
+        commit = baseline.get("baseline_commit")
+        reason = None
+        if not isinstance(index, dict) or not commit or commit == "unknown":
+            reason = "baseline has no file index"
+        elif index.get("version") != BASELINE_INDEX_VERSION:
+            reason = "baseline index has an old format"
+        elif index.get("fingerprint") != self._index_fingerprint(search_roots, files_from):
+            reason = "baseline index was built with different settings"
+        elif files_from not in (None, FILES_FROM_GIT):
+            reason = "file lists cannot be diffed"
+        changed = None
+        if reason is None:
+            changed = self._changed_since(root, commit, untracked=files_from is None)
+            if changed is None:
+                reason = f"cannot diff against {commit[:8]}"
+        if reason is not None or changed is None:
+            if verbose:
+                print(
+                    f"Incremental scan unavailable ({reason}), scanning all files",
+                    file=sys.stderr,
+                )
+            return None
+            
+        entries: Dict[str, Any] = dict(index["files"])
+        changed.update(index.get("dirty", []))
+        candidates = select_py_paths(changed, search_roots, DEFAULT_IGNORE_DIRS, self._exclude)
+        rescan = []
+        for rel_path in candidates:
+            if (root / rel_path).is_file():
+                rescan.append(rel_path)
+            else:
+                entries.pop(rel_path, None)
+                
+        tasks = [(root / rel, (entries.get(rel) or {}).get("digest") or None) for rel in rescan]
+        for rel_path, (payload, digest) in zip(rescan, parallel_map(self._scan_file, tasks, jobs)):
+            if payload is None:
+                # Touched but identical to the indexed content
                 continue
+            if payload.get("prefiltered"):
+                stats.files_prefiltered += 1
+            else:
+                stats.files_parsed += 1
+            entries[rel_path] = self._index_entry(payload, digest)
+        stats.files_reused = len(entries) - stats.files_parsed - stats.files_prefiltered
+        
+        if verbose:
+            print(
+                f"Incremental: {len(rescan)} changed files since {commit[:8]}, "
+                f"{stats.files_reused} reused from the baseline index",
+                file=sys.stderr,
+            )
+            
+        def results() -> Iterator[Tuple[str, List[ImportSite], Optional[str]]]:
+            for rel_path in sorted(entries):
+                yield rel_path, *self._file_sites(rel_path, root / rel_path, entries[rel_path])
                 
-            for py_file in search_path.rglob("*.py"):
-                # Skip ignored directories
-                if any(part in DEFAULT_IGNORE_DIRS for part in py_file.parts):
-                    continue
-                yield py_file
+        return len(entries), results()
+        
+    def _iter_blob_results(
+        self,
+        root: Path,
+        blobs: List[Tuple[str, str]],
+        jobs: int,
+        stats: ScanStats,
+        index: Optional[Dict[str, Any]] = None,
+        memo: Optional[Dict[str, ScanTaskResult]] = None,
+        reader: Optional[BlobReader] = None,
+    ) -> Iterator[Tuple[str, List[ImportSite], Optional[str]]]:
+        """Scan files of a revision from git's object store, in input order.
+        
+        Each distinct blob is read and scanned once; files sharing a blob
+        reuse its result.
+        
+        Args:
+            root: Repository root
+            blobs: (relative POSIX path, blob ID) pairs from list_py_blobs()
+            jobs: Number of worker processes
+            stats: Counters updated as results come in
+            index: If given, filled with a baseline index entry per file
+            memo: Results by blob ID, reused and extended across calls
+            reader: Open reader to use; by default one is started and closed
+            
+        Yields:
+            Tuples of (relative path, legacy import sites, allow reason)
+        """
+        if memo is None:
+            memo = {}
+        own_reader = reader is None
+        try:
+            for start in range(0, len(blobs), BLOB_BATCH_SIZE):
+                batch = blobs[start:start + BLOB_BATCH_SIZE]
+                missing = list(dict.fromkeys(oid for _, oid in batch if oid not in memo))
+                if missing:
+                    if reader is None:
+                        reader = BlobReader(str(root))
+                    contents = [data for _, data in reader.read_many(missing)]
+                    for oid, result in zip(missing, parallel_map(self._scan_data, contents, jobs)):
+                        memo[oid] = result
+                        if result[0].get("prefiltered"):
+                            stats.files_prefiltered += 1
+                        else:
+                            stats.files_parsed += 1
+                stats.blobs_shared += len(batch) - len(missing)
+                
+                for rel_path, oid in batch:
+                    payload, digest = memo[oid]
+                    if index is not None:
+                        index[rel_path] = self._index_entry(payload, digest)
+                    yield rel_path, *self._file_sites(rel_path, root / rel_path, payload)
+        finally:
+            if own_reader and reader is not None:
+                reader.close()
+                
+    def _iter_py_files(
+        self,
+        root: Path,
+        search_roots: List[str],
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+    ) -> Iterable[Tuple[str, Path]]:
+        """Iterate over Python files in search roots.
+        
+        Ignored and excluded directories are pruned without being listed.
+        
+        Args:
+            root: Repository root
+            search_roots: Directories to search, relative to root
+            walk_threads: Number of threads listing directories
+            files_from: 'git' to list tracked files from git's index, or a
+                file list path ('-' for stdin); None walks the filesystem
+        
+        Yields:
+            (relative POSIX path, path) pairs in sorted order
+        """
+        with phase("enumerate"):
+            rel_paths = discover_py_files(
+                str(root),
+                search_roots,
+                files_from=files_from,
+                ignore_dirs=DEFAULT_IGNORE_DIRS,
+                exclude=self._exclude,
+                gitignore=self.gitignore,
+                threads=walk_threads,
+            )
+        for rel_path in rel_paths:
+            yield rel_path, root / rel_path
                 
+    @timed("git")
     def _auto_base(self, root: Path, verbose: bool = False) -> Optional[str]:
         """Automatically determine base commit for changed files."""
         # Try merge-base with common branch names
@@ -217,8 +742,11 @@ class ImportTracker:
             
         return None
         
-    def _get_changed_files(self, root: Path, base: str, search_roots: List[str]) -> List[Path]:
-        """Get list of changed Python files."""
+    @timed("git")
+    def _get_changed_files(
+        self, root: Path, base: str, search_roots: List[str]
+    ) -> List[Tuple[str, Path]]:
+        """Get list of changed Python files as (relative path, path) pairs."""
         try:
             result = subprocess.check_output(
                 ["git", "diff", "--name-only", f"{base}...HEAD"],
@@ -232,7 +760,7 @@ class ImportTracker:
             # Filter to Python files in search roots
             py_files = []
             for file_str in changed_files:
-                if not file_str.endswith(".py"):
+                if not file_str.endswith(".py") or self._exclude.match(file_str) is not None:
                     continue
                 file_path = root / file_str
                 if not file_path.exists():
@@ -241,13 +769,14 @@ class ImportTracker:
                 # Check if file is in search roots
                 for search_root in search_roots:
                     if file_path.is_relative_to(root / search_root):
-                        py_files.append(file_path)
+                        py_files.append((file_str, file_path))
                         break
                         
             return py_files
         except subprocess.CalledProcessError:
             return []
             
+    @timed("baseline_io")
     def _load_baseline(self) -> Dict[str, Any]:
         """Load baseline data from file."""
         if not self.baseline_file.exists():
@@ -259,18 +788,175 @@ class ImportTracker:
         except (json.JSONDecodeError, OSError):
             return {}
             
+    @timed("baseline_io")
     def _save_baseline(self, data: Dict[str, Any]) -> None:
-        """Save baseline data to file."""
+        """Save baseline data to file.
+        
+        Baselines carrying a per-file index are written compactly.
+        """
         self.baseline_file.parent.mkdir(parents=True, exist_ok=True)
         with open(self.baseline_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+            if "index" in data:
+                json.dump(data, f, separators=(",", ":"))
+            else:
+                json.dump(data, f, indent=2)
+            
+    def _select_files(
+        self,
+        root: Path,
+        scope: str,
+        base: Optional[str],
+        search_roots: Optional[List[str]],
+        verbose: bool,
+        walk_threads: int,
+        files_from: Optional[str],
+    ) -> List[Tuple[str, Path]]:
+        """Determine the files to scan as (relative path, path) pairs."""
+        if not search_roots:
+            search_roots = ["src", "tests"]
+            
+        if scope == "changed":
+            if not base or base == "auto":
+                base = self._auto_base(root, verbose)
+            if base:
+                return self._get_changed_files(root, base, search_roots)
+        return list(self._iter_py_files(root, search_roots, walk_threads, files_from))
+        
+    def select_files(
+        self,
+        scope: str = "all",
+        base: Optional[str] = None,
+        search_roots: Optional[List[str]] = None,
+        verbose: bool = False,
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+    ) -> List[Tuple[str, Path]]:
+        """Determine the files a scan reads; see scan() for the arguments.
+        
+        Returns:
+            (relative POSIX path, path) pairs, relative to repo_root()
+        """
+        return self._select_files(
+            self.repo_root(), scope, base, search_roots, verbose, walk_threads, files_from
+        )
+        
+    def iter_sites(
+        self,
+        scope: str = "all",
+        base: Optional[str] = None,
+        search_roots: Optional[List[str]] = None,
+        verbose: bool = False,
+        jobs: Union[int, str] = 1,
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+        stats: Optional[ScanStats] = None,
+    ) -> Iterator[ImportSite]:
+        """Scan for legacy imports and yield each site as its file is processed.
+        
+        Sites are yielded in file order, then line order, with their allowed
+        flag set; nothing is accumulated, so memory use does not grow with
+        the number of sites.
+        
+        Args:
+            scope: 'all' to scan all files, 'changed' to scan changed files only
+            base: Base commit for changed file detection (auto-detected if None)
+            search_roots: Directories to search in (default: ['src', 'tests'])
+            verbose: Enable verbose output
+            jobs: Number of worker processes, or 'auto' for one per CPU
+            walk_threads: Number of threads listing directories
+            files_from: File source, as for scan()
+            stats: Counters to update while scanning
+            
+        Yields:
+            ImportSite objects, blocking and allowed
+        """
+        jobs = resolve_jobs(jobs)
+        root = self._repo_root()
+        py_files = self._select_files(
+            root, scope, base, search_roots, verbose, walk_threads, files_from
+        )
+        if stats is None:
+            stats = ScanStats()
+        for _, sites, _ in self._iter_file_results(py_files, jobs, stats):
+            yield from sites
             
+    @staticmethod
+    def _tally(
+        results: Iterable[Tuple[str, List[ImportSite], Optional[str]]],
+        explain_allow: bool = False,
+        on_site: Optional[Callable[[ImportSite], None]] = None,
+        site_table: Optional[SiteTable] = None,
+    ) -> Tuple[int, int, Counter[str]]:
+        """Count blocking and allowed sites, and blocking sites per file."""
+        blocking_count = 0
+        allowed_count = 0
+        per_file_counts: Counter[str] = Counter()
+        
+        for rel_path, sites, reason in results:
+            if not sites:
+                continue
+                
+            if reason is not None:
+                allowed_count += len(sites)
+                if explain_allow:
+                    print(f"Allowed: {rel_path} ({reason})", file=sys.stderr)
+            else:
+                blocking_count += len(sites)
+                per_file_counts[rel_path] += len(sites)
+                
+            if on_site is not None:
+                for site in sites:
+                    on_site(site)
+                    
+            if site_table is not None:
+                site_table.add_file(
+                    rel_path, [(site.lineno, site.module) for site in sites], reason is not None
+                )
+                
+        return blocking_count, allowed_count, per_file_counts
+        
+    @staticmethod
+    def _by_count(per_file_counts: Counter[str]) -> List[Tuple[str, int]]:
+        """Order per-file counts by count, descending, then by path."""
+        return sorted(per_file_counts.items(), key=lambda item: (-item[1], item[0]))
+        
+    @staticmethod
+    def _select_shard(
+        py_files: List[Tuple[str, Path]], shard: Shard
+    ) -> List[Tuple[str, Path]]:
+        """Keep the files of one shard, weighted by size, in their original order."""
+        sizes = {}
+        for rel_path, file_path in py_files:
+            try:
+                sizes[rel_path] = file_path.stat().st_size
+            except OSError:
+                sizes[rel_path] = 0
+        members = shard_members(sizes, shard, sizes.__getitem__)
+        return [(rel_path, file_path) for rel_path, file_path in py_files if rel_path in members]
+        
+    @staticmethod
+    def progress_percent(blocking_count: int, baseline_blocking: int) -> float:
+        """Share of the baseline's blocking imports that are gone, in percent."""
+        if baseline_blocking <= 0:
+            return 0.0
+        return max(0.0, (1.0 - blocking_count / baseline_blocking) * 100.0)
+        
     def scan(
         self, 
         scope: str = "all",
         base: Optional[str] = None,
         search_roots: Optional[List[str]] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        jobs: Union[int, str] = 1,
+        explain_allow: bool = False,
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+        on_site: Optional[Callable[[ImportSite], None]] = None,
+        incremental: bool = False,
+        build_index: bool = False,
+        rev: Optional[str] = None,
+        shard: Optional[Shard] = None,
+        site_table: Optional[SiteTable] = None,
     ) -> MigrationProgress:
         """Scan for legacy imports and return progress information.
         
@@ -279,73 +965,302 @@ class ImportTracker:
             base: Base commit for changed file detection (auto-detected if None)
             search_roots: Directories to search in (default: ['src', 'tests'])
             verbose: Enable verbose output
+            jobs: Number of worker processes, or 'auto' for one per CPU.
+                Results are identical to a serial scan.
+            explain_allow: Print each allowed file with the marker or glob
+                that allowed it
+            walk_threads: Number of threads listing directories
+            files_from: Take the files to scan from git's index ('git') or
+                from a NUL- or newline-delimited list ('-' for stdin)
+                instead of walking the search roots
+            on_site: Called with each legacy import site, blocking or
+                allowed, as soon as its file has been scanned
+            incremental: With scope 'all', rescan only the files changed since
+                the baseline commit and take the rest from the baseline's
+                per-file index. Falls back to a full scan if the baseline has
+                no index built with the same settings.
+            build_index: With scope 'all', record a per-file index on the
+                result for write_baseline()
+            rev: Scan the tracked files of this revision, read from git's
+                object store, instead of the working tree. Only valid with
+                scope 'all' and without incremental.
+            shard: (index, count) to scan only that part of the file set;
+                partial results are combined by merge.merge_parts()
+            site_table: If given, every legacy import site is also recorded
+                in this compact table; its counts match the returned progress
             
         Returns:
             MigrationProgress object with scan results
+            
+        Raises:
+            ValueError: If rev is combined with scope 'changed' or incremental,
+                or shard with rev, incremental or build_index
+            RuntimeError: If rev does not name a commit or git fails
         """
+        jobs = resolve_jobs(jobs)
+        if rev is not None and (scope != "all" or incremental):
+            raise ValueError("A revision can only be scanned fully (scope 'all', not incremental)")
+        if shard is not None and (rev is not None or incremental or build_index):
+            raise ValueError("A shard cannot be combined with a revision, incremental or index")
         if not search_roots:
             search_roots = ["src", "tests"]
-            
         root = self._repo_root()
+        stats = ScanStats()
+        baseline = self._load_baseline()
         
-        # Determine files to scan
-        if scope == "changed":
-            if not base or base == "auto":
-                base = self._auto_base(root, verbose)
-            if base:
-                py_files = self._get_changed_files(root, base, search_roots)
-            else:
-                py_files = list(self._iter_py_files(root, search_roots))
+        incremental_results = None
+        if incremental and scope == "all" and not build_index:
+            incremental_results = self._iter_incremental_results(
+                root, baseline, search_roots, files_from, jobs, stats, verbose
+            )
+            
+        index: Optional[Dict[str, Any]] = None
+        if rev is not None:
+            rev = resolve_rev(str(root), rev)
+            blobs = list_py_blobs(str(root), rev, search_roots, DEFAULT_IGNORE_DIRS, self._exclude)
+            files_scanned = len(blobs)
+            if build_index:
+                index = {}
+                self._with_digests = True
+                # The file set is git's, as with --files-from git
+                files_from = FILES_FROM_GIT
+            results = self._iter_blob_results(root, blobs, jobs, stats, index)
+        elif incremental_results is not None:
+            files_scanned, results = incremental_results
         else:
-            py_files = list(self._iter_py_files(root, search_roots))
+            py_files = self._select_files(
+                root, scope, base, search_roots, verbose, walk_threads, files_from
+            )
+            if shard is not None:
+                py_files = self._select_shard(py_files, shard)
+            files_scanned = len(py_files)
+            if verbose and jobs > 1:
+                print(f"Scanning {len(py_files)} files with {jobs} workers", file=sys.stderr)
+            if build_index and scope == "all":
+                index = {}
+                self._with_digests = True
+            results = self._iter_file_results(py_files, jobs, stats, index)
             
-        # Scan files for legacy imports
-        blocking_sites: List[ImportSite] = []
-        allowed_sites: List[ImportSite] = []
-        per_file_counts: Counter[str] = Counter()
+        return self._build_progress(
+            root,
+            scope,
+            files_scanned,
+            results,
+            stats,
+            baseline,
+            verbose=verbose,
+            explain_allow=explain_allow,
+            on_site=on_site,
+            site_table=site_table,
+            search_roots=search_roots,
+            files_from=files_from,
+            rev=rev,
+            shard=shard,
+            index=index,
+        )
         
-        for py_file in py_files:
-            rel_path = self._to_posix_rel(root, py_file)
-            try:
-                content = py_file.read_text(encoding="utf-8", errors="replace")
-            except OSError:
-                content = ""
-                
-            sites = self._extract_ast_imports(py_file)
-            if not sites:
-                continue
-                
-            if self._is_allowed(rel_path, content):
-                allowed_sites.extend(sites)
-            else:
-                blocking_sites.extend(sites)
-                per_file_counts[rel_path] += len(sites)
+    async def ascan(
+        self,
+        scope: str = "all",
+        base: Optional[str] = None,
+        search_roots: Optional[List[str]] = None,
+        verbose: bool = False,
+        jobs: Union[int, str] = 1,
+        explain_allow: bool = False,
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+        on_site: Optional[Callable[[ImportSite], None]] = None,
+        shard: Optional[Shard] = None,
+        site_table: Optional[SiteTable] = None,
+        io_concurrency: int = DEFAULT_IO_CONCURRENCY,
+        read_timeout: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> MigrationProgress:
+        """Scan for legacy imports without blocking the event loop.
+        
+        Gives the same result as scan(), but keeps up to io_concurrency files
+        being read at once, which pays off where each read waits on the
+        network (NFS, SMB, FUSE). File discovery, baseline loading, reads and
+        scanning all run off the event loop; see aio.acached_scan(). Cancelling
+        the awaiting task stops the scan, leaving the cache as it was.
+        
+        Args:
+            scope, base, search_roots, verbose, jobs, explain_allow,
+            walk_threads, files_from, on_site, shard, site_table: As for scan()
+            io_concurrency: Number of files in flight at a time
+            read_timeout: Seconds a single file's stat or read may take
+            timeout: Seconds the whole scan may take
+            
+        Returns:
+            MigrationProgress object with scan results
+            
+        Raises:
+            ValueError: If io_concurrency is less than 1
+            asyncio.TimeoutError: If the scan or a single read times out
+        """
+        import asyncio
+        
+        coroutine = self._ascan(
+            scope, base, search_roots, verbose, resolve_jobs(jobs), explain_allow,
+            walk_threads, files_from, on_site, shard, site_table, io_concurrency, read_timeout,
+        )
+        if timeout is None:
+            return await coroutine
+        try:
+            return await asyncio.wait_for(coroutine, timeout)
+        except asyncio.TimeoutError as e:
+            if str(e):
+                raise
+            raise asyncio.TimeoutError(f"Scan took longer than {timeout:g}s") from None
+        
+    async def _ascan(
+        self,
+        scope: str,
+        base: Optional[str],
+        search_roots: Optional[List[str]],
+        verbose: bool,
+        jobs: int,
+        explain_allow: bool,
+        walk_threads: int,
+        files_from: Optional[str],
+        on_site: Optional[Callable[[ImportSite], None]],
+        shard: Optional[Shard],
+        site_table: Optional[SiteTable],
+        io_concurrency: int,
+        read_timeout: Optional[float],
+    ) -> MigrationProgress:
+        """Body of ascan(), without the overall timeout."""
+        import asyncio
+        
+        from .aio import acached_scan
+        
+        if not search_roots:
+            search_roots = ["src", "tests"]
+        root = await asyncio.to_thread(self._repo_root)
+        stats = ScanStats()
+        baseline = await asyncio.to_thread(self._load_baseline)
+        py_files = await asyncio.to_thread(
+            self._select_files, root, scope, base, search_roots, verbose, walk_threads, files_from
+        )
+        if shard is not None:
+            py_files = await asyncio.to_thread(self._select_shard, py_files, shard)
+        if verbose:
+            print(
+                f"Scanning {len(py_files)} files, {io_concurrency} in flight, "
+                f"with {jobs} workers",
+                file=sys.stderr,
+            )
+            
+        # Tally each file as its result arrives, so that on_site streams
+        blocking_count = allowed_count = 0
+        per_file_counts: Counter[str] = Counter()
+        cache = await asyncio.to_thread(self._open_cache)
+        try:
+            async for result in acached_scan(
+                cache, py_files, self._scan_read, jobs, io_concurrency, read_timeout
+            ):
+                blocking, allowed, counts = self._tally(
+                    self._payload_results([result], stats), explain_allow, on_site, site_table
+                )
+                blocking_count += blocking
+                allowed_count += allowed
+                per_file_counts.update(counts)
+        finally:
+            if cache is not None:
+                stats.cache_hits = cache.hits
+                stats.cache_misses = cache.misses
                 
-        # Load baseline for progress calculation
-        baseline = self._load_baseline()
-        baseline_blocking = baseline.get("imports", {}).get("blocking", len(blocking_sites))
+        return self._build_progress(
+            root,
+            scope,
+            len(py_files),
+            None,
+            stats,
+            baseline,
+            verbose=verbose,
+            search_roots=search_roots,
+            files_from=files_from,
+            shard=shard,
+            tally=(blocking_count, allowed_count, per_file_counts),
+        )
+        
+    def _build_progress(
+        self,
+        root: Path,
+        scope: str,
+        files_scanned: int,
+        results: Optional[Iterable[Tuple[str, List[ImportSite], Optional[str]]]],
+        stats: ScanStats,
+        baseline: Dict[str, Any],
+        verbose: bool = False,
+        explain_allow: bool = False,
+        on_site: Optional[Callable[[ImportSite], None]] = None,
+        site_table: Optional[SiteTable] = None,
+        search_roots: Optional[List[str]] = None,
+        files_from: Optional[str] = None,
+        rev: Optional[str] = None,
+        shard: Optional[Shard] = None,
+        index: Optional[Dict[str, Any]] = None,
+        tally: Optional[Tuple[int, int, Counter[str]]] = None,
+    ) -> MigrationProgress:
+        """Tally per-file results against the baseline; see scan() for the arguments.
+        
+        Args:
+            results: Per-file results, or None if tally is given
+            tally: (blocking, allowed, blocking per file) counts of results
+                that were already tallied as they arrived
+        """
+        # Scan files for legacy imports; only counts are kept in memory
+        try:
+            if tally is None:
+                assert results is not None
+                tally = self._tally(results, explain_allow, on_site, site_table)
+        finally:
+            self._with_digests = False
+        blocking_count, allowed_count, per_file_counts = tally
+            
+        if verbose and self.cache_dir is not None:
+            print(
+                f"Cache: {stats.cache_hits} hits, {stats.cache_misses} misses",
+                file=sys.stderr,
+            )
+        if verbose:
+            print(
+                f"Prefilter: {stats.files_prefiltered} files skipped without parsing, "
+                f"{stats.files_parsed} parsed",
+                file=sys.stderr,
+            )
+            
+        # Use the baseline for progress calculation
+        baseline_blocking = baseline.get("imports", {}).get("blocking", blocking_count)
         baseline_commit = baseline.get("baseline_commit")
         
         # Calculate progress
-        progress_percent = 0.0
-        if baseline_blocking > 0:
-            progress_percent = max(0.0, (1.0 - len(blocking_sites) / baseline_blocking) * 100.0)
+        progress_percent = self.progress_percent(blocking_count, baseline_blocking)
             
         # Create blocking_by_file list
-        blocking_by_file = [(path, count) for path, count in per_file_counts.most_common()]
+        blocking_by_file = self._by_count(per_file_counts)
         
         return MigrationProgress(
             repo_root=root,
             scope=scope,
-            files_scanned=len(py_files),
-            blocking_imports=len(blocking_sites),
-            allowed_imports=len(allowed_sites),
-            total_imports=len(blocking_sites) + len(allowed_sites),
+            files_scanned=files_scanned,
+            blocking_imports=blocking_count,
+            allowed_imports=allowed_count,
+            total_imports=blocking_count + allowed_count,
             baseline_blocking=baseline_blocking,
             progress_percent=progress_percent,
             blocking_by_file=blocking_by_file,
             baseline_file=self.baseline_file if self.baseline_file.exists() else None,
             baseline_commit=baseline_commit,
+            stats=stats,
+            rev=rev,
+            shard=shard,
+            index=None if index is None else {
+                "version": BASELINE_INDEX_VERSION,
+                "fingerprint": self._index_fingerprint(search_roots, files_from),
+                "files": index,
+            },
         )
         
     def write_baseline(self, progress: Optional[MigrationProgress] = None) -> None:
@@ -355,19 +1270,22 @@ class ImportTracker:
             progress: MigrationProgress to use as baseline. If None, scans current state.
         """
         if progress is None:
-            progress = self.scan(scope="all")
+            progress = self.scan(scope="all", build_index=True)
             
         # Get current commit hash
-        try:
-            commit = subprocess.check_output(
-                ["git", "rev-parse", "HEAD"],
-                cwd=progress.repo_root,
-                text=True,
-                encoding="utf-8",
-                errors="replace"
-            ).strip()
-        except subprocess.CalledProcessError:
-            commit = "unknown"
+        if progress.rev:
+            commit = progress.rev
+        else:
+            try:
+                commit = subprocess.check_output(
+                    ["git", "rev-parse", "HEAD"],
+                    cwd=progress.repo_root,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace"
+                ).strip()
+            except subprocess.CalledProcessError:
+                commit = "unknown"
             
         baseline_data = {
             "imports": {
@@ -378,4 +1296,174 @@ class ImportTracker:
             "created_at": progress.repo_root.name,  # Placeholder timestamp
         }
         
-        self._save_baseline(baseline_data)
\ No newline at end of file
+        if progress.index is not None and commit != "unknown":
+            # Files already differing from the commit are rescanned by --incremental;
+            # an index read from the commit itself has none
+            dirty = [] if progress.rev else self._changed_since(progress.repo_root, commit)
+            if dirty is not None:
+                dirty_py = sorted(path for path in dirty if path.endswith(".py"))
+                baseline_data["index"] = dict(progress.index, dirty=dirty_py)
+                
+        self._save_baseline(baseline_data)
+        
+    def build_graph(
+        self,
+        search_roots: Optional[List[str]] = None,
+        jobs: Union[int, str] = 1,
+        walk_threads: int = 1,
+        files_from: Optional[str] = None,
+        stats: Optional[ScanStats] = None,
+    ) -> ImportGraph:
+        """Build the import graph of the repository.
+        
+        Every import of every file becomes an edge. Files are named as
+        modules relative to their search root, or to its parent if the root
+        is itself a package (has an __init__.py). Relative imports are
+        resolved, 'from pkg import mod' points at the submodule pkg.mod when
+        it exists, and any other name is mapped to the longest repository
+        module it starts with; names outside the repository become external
+        nodes. Files are always parsed with the AST (the imported names are
+        needed), through the persistent result cache.
+        
+        Args:
+            search_roots: Directories to search in (default: ['src', 'tests'])
+            jobs: Number of worker processes, or 'auto' for one per CPU
+            walk_threads: Number of threads listing directories
+            files_from: File source, as for scan()
+            stats: Counters to update while extracting
+            
+        Returns:
+            ImportGraph over repository and external modules
+        """
+        jobs = resolve_jobs(jobs)
+        if not search_roots:
+            search_roots = ["src", "tests"]
+        if stats is None:
+            stats = ScanStats()
+        root = self._repo_root()
+        py_files = list(self._iter_py_files(root, search_roots, walk_threads, files_from))
+        
+        # Import base of each search root, longest roots first
+        bases = []
+        for search_root in search_roots:
+            rel_root = _normalize_root(search_root)
+            is_package = (root / rel_root / "__init__.py").is_file()
+            bases.append((rel_root, rel_root.rpartition("/")[0] if is_package else rel_root))
+        bases.sort(key=lambda item: len(item[0]), reverse=True)
+        
+        modules: Dict[str, str] = {}
+        file_modules = []
+        for rel_path, _ in py_files:
+            base = next(
+                (base for rel_root, base in bases
+                 if not rel_root or rel_path.startswith(rel_root + "/")),
+                "",
+            )
+            name = module_name(rel_path, base)
+            modules.setdefault(name, rel_path)
+            file_modules.append((name, rel_path.endswith("/__init__.py")))
+            
+        def resolve(name: str) -> str:
+            candidate = name
+            while candidate:
+                if candidate in modules:
+                    return candidate
+                candidate = candidate.rpartition(".")[0]
+            return name
+            
+        edges = []
+        cache = self._open_cache("graph")
+        try:
+            results = cached_scan(cache, py_files, self._graph_file, jobs=jobs)
+            for (importer, is_package), (_, _, payload, parsed, _) in zip(file_modules, results):
+                if parsed:
+                    stats.files_parsed += 1
+                for imported, level, names in payload["imports"]:
+                    absolute = resolve_relative(importer, is_package, imported, level)
+                    if absolute is None:
+                        continue
+                    prefix = absolute + "." if absolute else ""
+                    submodules = [prefix + name for name in names if prefix + name in modules]
+                    edges.extend((importer, submodule) for submodule in submodules)
+                    if not names or (absolute and len(submodules) < len(names)):
+                        edges.append((importer, resolve(absolute)))
+        finally:
+            if cache is not None:
+                stats.cache_hits = cache.hits
+                stats.cache_misses = cache.misses
+                
+        return ImportGraph.from_edges(modules, edges)
+        
+    def history(
+        self,
+        since: str,
+        until: str = "HEAD",
+        step: int = 1,
+        search_roots: Optional[List[str]] = None,
+        jobs: Union[int, str] = 1,
+    ) -> Iterator[HistoryPoint]:
+        """Compute migration progress at past commits, oldest first.
+        
+        Commits are followed along first parents from since to until; every
+        step-th one is scanned from git's object store, and until is always
+        included. Extraction results are keyed by blob ID, so each distinct
+        blob is parsed once over the whole walk. Progress is measured against
+        the first commit of the series.
+        
+        Args:
+            since: First commit of the series
+            until: Last commit of the series
+            step: Scan every step-th commit
+            search_roots: Directories to search in (default: ['src', 'tests'])
+            jobs: Number of worker processes, or 'auto' for one per CPU
+            
+        Yields:
+            HistoryPoint per sampled commit, as soon as it is computed. Each
+            point's stats count only the blobs parsed for that commit.
+            
+        Raises:
+            ValueError: If step is not positive
+            RuntimeError: If a revision is unknown or git fails
+        """
+        if step < 1:
+            raise ValueError(f"step must be at least 1, got {step}")
+        jobs = resolve_jobs(jobs)
+        if not search_roots:
+            search_roots = ["src", "tests"]
+        root = self._repo_root()
+        
+        commits = first_parent_commits(str(root), since, until)
+        sampled = commits[::step]
+        if sampled[-1] != commits[-1]:
+            sampled.append(commits[-1])
+            
+        memo: Dict[str, ScanTaskResult] = {}
+        baseline: Optional[Tuple[str, int]] = None
+        with BlobReader(str(root)) as reader:
+            for commit, committed_at in sampled:
+                stats = ScanStats()
+                blobs = list_py_blobs(
+                    str(root), commit, search_roots, DEFAULT_IGNORE_DIRS, self._exclude
+                )
+                results = self._iter_blob_results(
+                    root, blobs, jobs, stats, memo=memo, reader=reader
+                )
+                blocking_count, allowed_count, per_file_counts = self._tally(results)
+                if baseline is None:
+                    baseline = (commit, blocking_count)
+                    
+                progress = MigrationProgress(
+                    repo_root=root,
+                    scope="all",
+                    files_scanned=len(blobs),
+                    blocking_imports=blocking_count,
+                    allowed_imports=allowed_count,
+                    total_imports=blocking_count + allowed_count,
+                    baseline_blocking=baseline[1],
+                    progress_percent=self.progress_percent(blocking_count, baseline[1]),
+                    blocking_by_file=self._by_count(per_file_counts),
+                    baseline_commit=baseline[0],
+                    stats=stats,
+                    rev=commit,
+                )
+                yield HistoryPoint(committed_at=committed_at, progress=progress)
@@ -0,0 +1,458 @@
+"""Live legacy import index kept up to date by watching the filesystem.
+
+``LiveIndex`` scans a tree once and then keeps every file's legacy import
+sites in memory. When files change, only those files are re-extracted and
+the totals are adjusted, which yields per-file deltas: blocking imports that
+were introduced and ones that were removed.
+
+Changes are detected by a watcher:
+
+- ``InotifyWatcher`` uses Linux inotify through ctypes, with one watch per
+  directory (ignored and excluded directories are not watched). Bursts of
+  events, such as an editor writing a temporary file and renaming it, are
+  collected for a few milliseconds and handled as one batch.
+- ``PollingWatcher`` compares stat data at a fixed interval. It works
+  everywhere and is used when inotify is unavailable or out of watches.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import stat
+import struct
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .discovery import DEFAULT_IGNORE_DIRS, select_py_paths, walk_py_files
+from .tracker import ImportTracker, ScanStats
+
+# A legacy import site as (lineno, module)
+Site = Tuple[int, str]
+
+# Changed path meaning "anything may have changed" (e.g. lost inotify events)
+RESCAN_ALL = ""
+
+# Time to wait for related events after the first one of a batch
+DEBOUNCE_SECONDS = 0.02
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+@dataclass
+class FileEntry:
+    """What the live index knows about one file."""
+    size: int
+    mtime_ns: int
+    digest: str
+    blocking: List[Site]
+    allowed: int  # number of allowed legacy import sites
+
+
+@dataclass
+class FileDelta:
+    """Change of one file's blocking legacy imports."""
+    path: str
+    introduced: List[Site] = field(default_factory=list)
+    removed: List[Site] = field(default_factory=list)
+
+
+def _diff_sites(old: List[Site], new: List[Site]) -> Tuple[List[Site], List[Site]]:
+    """Compare site lists by module, so that shifted line numbers are no change."""
+    old_modules = Counter(module for _, module in old)
+    new_modules = Counter(module for _, module in new)
+    introduced = []
+    for site in new:
+        if old_modules[site[1]] > 0:
+            old_modules[site[1]] -= 1
+        else:
+            introduced.append(site)
+    removed = []
+    for site in old:
+        if new_modules[site[1]] > 0:
+            new_modules[site[1]] -= 1
+        else:
+            removed.append(site)
+    return introduced, removed
+
+
+class LiveIndex:
+    """In-memory index of legacy import sites, updated one file at a time."""
+
+    def __init__(self, tracker: ImportTracker, root: Path, search_roots: List[str]):
+        """Create an empty index.
+
+        Args:
+            tracker: Tracker providing patterns, allowlist, excludes and engine;
+                with with_digests set, unchanged rewrites are recognized
+                without parsing
+            root: Repository root
+            search_roots: Directories to index, relative to root
+        """
+        self.tracker = tracker
+        self.root = root
+        self.search_roots = search_roots
+        self.entries: Dict[str, FileEntry] = {}
+        self.directories: List[str] = []  # directories listed by the last build
+        self.blocking = 0
+        self.allowed = 0
+
+    def _walk(self, search_roots: Iterable[str], dirs_out: Optional[List[str]] = None) -> List[str]:
+        return walk_py_files(
+            str(self.root),
+            search_roots,
+            ignore_dirs=DEFAULT_IGNORE_DIRS,
+            exclude=self.tracker.exclude_globs,
+            gitignore=self.tracker.gitignore,
+            dirs_out=dirs_out,
+        )
+
+    def _entry(self, rel_path: str, st: os.stat_result, payload: dict, digest: str) -> FileEntry:
+        # Module names repeat across files; interned, each is held once
+        sites = [(lineno, sys.intern(module)) for lineno, module in payload["sites"]]
+        if sites and self.tracker.allow_reason(rel_path, payload["marker"]) is not None:
+            return FileEntry(st.st_size, st.st_mtime_ns, digest, [], len(sites))
+        return FileEntry(st.st_size, st.st_mtime_ns, digest, sites, 0)
+
+    def _set(self, rel_path: str, entry: Optional[FileEntry]) -> Optional[FileDelta]:
+        """Replace a file's entry, adjust the totals and return the delta."""
+        old = self.entries.pop(rel_path, None)
+        if old is not None:
+            self.blocking -= len(old.blocking)
+            self.allowed -= old.allowed
+        if entry is not None:
+            self.entries[rel_path] = entry
+            self.blocking += len(entry.blocking)
+            self.allowed += entry.allowed
+        introduced, removed = _diff_sites(
+            old.blocking if old is not None else [],
+            entry.blocking if entry is not None else [],
+        )
+        if not introduced and not removed:
+            return None
+        return FileDelta(rel_path, introduced, removed)
+
+    def build(self, jobs: int = 1) -> ScanStats:
+        """Scan the whole tree (through the tracker's cache, if enabled).
+
+        Args:
+            jobs: Number of worker processes
+
+        Returns:
+            Counters of the initial scan
+        """
+        directories: List[str] = []
+        rel_paths = self._walk(self.search_roots, directories)
+        index: Dict[str, dict] = {}
+        stats = ScanStats()
+        files = [(rel_path, self.root / rel_path) for rel_path in rel_paths]
+        for _ in self.tracker.iter_file_results(files, jobs=jobs, stats=stats, index=index):
+            pass
+
+        self.entries.clear()
+        self.blocking = self.allowed = 0
+        self.directories = directories
+        for rel_path, item in index.items():
+            try:
+                st = os.stat(self.root / rel_path)
+            except OSError:
+                continue
+            self._set(rel_path, self._entry(rel_path, st, item, item["digest"]))
+        return stats
+
+    def update_file(self, rel_path: str, check_stat: bool = False) -> Optional[FileDelta]:
+        """Re-extract one file, or drop it if it no longer exists.
+
+        Args:
+            rel_path: POSIX path relative to the root
+            check_stat: Skip reading the file if its size and mtime are unchanged
+
+        Returns:
+            The change of the file's blocking imports, or None if there is none
+        """
+        try:
+            st = os.stat(self.root / rel_path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            return self._set(rel_path, None)
+
+        old = self.entries.get(rel_path)
+        if check_stat and old is not None:
+            if old.size == st.st_size and old.mtime_ns == st.st_mtime_ns:
+                return None
+
+        payload, digest = self.tracker.scan_one(
+            self.root / rel_path, old.digest if old is not None else None
+        )
+        if payload is None:
+            # Rewritten with identical content
+            assert old is not None
+            old.size, old.mtime_ns = st.st_size, st.st_mtime_ns
+            return None
+        return self._set(rel_path, self._entry(rel_path, st, payload, digest))
+
+    def refresh(self, paths: Iterable[str], check_stat: bool = False) -> List[FileDelta]:
+        """Update the index for changed files and directories.
+
+        Args:
+            paths: Changed paths relative to the root. A directory stands for
+                everything below it; RESCAN_ALL stands for the whole tree.
+            check_stat: Skip files whose size and mtime are unchanged
+
+        Returns:
+            Deltas of the files whose blocking imports changed, in path order
+        """
+        targets: Set[str] = set()
+        for path in paths:
+            if path == RESCAN_ALL:
+                targets.update(self.entries)
+                targets.update(self._walk(self.search_roots))
+                continue
+            if path in self.entries:
+                targets.add(path)
+                continue
+            full_path = self.root / path
+            if path.endswith(".py") and not full_path.is_dir():
+                # New file: apply the same root, ignore-dir, exclude and .gitignore rules
+                targets.update(
+                    select_py_paths(
+                        [path],
+                        self.search_roots,
+                        DEFAULT_IGNORE_DIRS,
+                        self.tracker.exclude_globs,
+                        gitignore_root=str(self.root) if self.tracker.gitignore else None,
+                    )
+                )
+                continue
+            prefix = path + "/"
+            targets.update(rel_path for rel_path in self.entries if rel_path.startswith(prefix))
+            if full_path.is_dir():
+                targets.update(self._walk([path]))
+
+        deltas = []
+        for rel_path in sorted(targets):
+            delta = self.update_file(rel_path, check_stat=check_stat)
+            if delta is not None:
+                deltas.append(delta)
+        return deltas
+
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+_EVENT = struct.Struct("iIII")
+
+
+def _load_libc() -> ctypes.CDLL:
+    """Load libc with the inotify functions, or raise OSError."""
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError(errno.ENOSYS, "libc has no inotify support")
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class InotifyWatcher:
+    """Reports changed paths using Linux inotify."""
+
+    name = "inotify"
+
+    def __init__(self, index: LiveIndex):
+        """Watch every directory of the index.
+
+        Raises:
+            OSError: If inotify is unavailable or the watch limit is reached
+        """
+        self._libc = _load_libc()
+        self._root = str(index.root)
+        self._exclude = index.tracker.exclude_globs
+        self._gitignore = index.tracker.gitignore
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, f"inotify_init1 failed: {os.strerror(code)}")
+        self._fd = fd
+        self._watches: Dict[int, str] = {}
+        try:
+            for rel_dir in index.directories:
+                self._add_watch(rel_dir)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, rel_dir: str) -> None:
+        path = os.path.join(self._root, rel_dir)
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            if code == errno.ENOSPC:
+                raise OSError(code, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            return  # directory vanished in the meantime
+        self._watches[wd] = rel_dir
+
+    def _watch_tree(self, rel_dir: str) -> None:
+        """Add watches for a directory created or moved into the tree."""
+        directories: List[str] = []
+        walk_py_files(
+            self._root,
+            [rel_dir],
+            exclude=self._exclude,
+            gitignore=self._gitignore,
+            dirs_out=directories,
+        )
+        for directory in directories:
+            self._add_watch(directory)
+
+    def _read_events(self, changed: Set[str]) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT.size:offset + _EVENT.size + length]
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                changed.add(RESCAN_ALL)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            rel_dir = self._watches.get(wd)
+            name = os.fsdecode(raw_name.split(b"\0", 1)[0])
+            if rel_dir is None or not name:
+                continue
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if mask & IN_ISDIR:
+                if name in DEFAULT_IGNORE_DIRS:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(rel_path)
+                changed.add(rel_path)
+            elif name.endswith(".py"):
+                changed.add(rel_path)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until paths change and return them (empty on timeout)."""
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        changed: Set[str] = set()
+        deadline = time.monotonic() + DEBOUNCE_SECONDS
+        while True:
+            self._read_events(changed)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._fd], [], [], remaining)[0]:
+                return changed
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Reports changed paths by comparing stat data at a fixed interval."""
+
+    name = "polling"
+
+    def __init__(self, index: LiveIndex, interval: float = DEFAULT_POLL_INTERVAL):
+        """Record the current state of the index's files and directories."""
+        self._index = index
+        self._interval = interval
+        self._directories = {rel_dir: self._mtime(rel_dir) for rel_dir in index.directories}
+
+    def _mtime(self, rel_path: str) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(str(self._index.root), rel_path)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _poll(self) -> Set[str]:
+        index = self._index
+        changed: Set[str] = set()
+        for rel_path, entry in index.entries.items():
+            try:
+                st = os.stat(index.root / rel_path)
+            except OSError:
+                changed.add(rel_path)
+                continue
+            if st.st_size != entry.size or st.st_mtime_ns != entry.mtime_ns:
+                changed.add(rel_path)
+
+        # New files and directories show up as a changed directory mtime
+        for rel_dir, mtime in list(self._directories.items()):
+            current = self._mtime(rel_dir)
+            if current == mtime:
+                continue
+            self._directories[rel_dir] = current
+            if current is None:
+                continue
+            try:
+                with os.scandir(os.path.join(str(index.root), rel_dir)) as entries:
+                    for entry in entries:
+                        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if rel_path not in self._directories:
+                                if entry.name not in DEFAULT_IGNORE_DIRS:
+                                    changed.add(rel_path)
+                        elif entry.name.endswith(".py") and rel_path not in index.entries:
+                            changed.add(rel_path)
+            except OSError:
+                continue
+        for rel_path in changed:
+            if rel_path not in index.entries and os.path.isdir(index.root / rel_path):
+                directories: List[str] = []
+                index._walk([rel_path], directories)
+                for rel_dir in directories:
+                    self._directories.setdefault(rel_dir, self._mtime(rel_dir))
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Sleep one interval (or the timeout, if shorter) and return changed paths."""
+        time.sleep(self._interval if timeout is None else min(timeout, self._interval))
+        return self._poll()
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def make_watcher(
+    index: LiveIndex, polling: bool = False, interval: float = DEFAULT_POLL_INTERVAL
+) -> Watcher:
+    """Create an inotify watcher, falling back to polling when it is unavailable.
+
+    Args:
+        index: Built live index whose files and directories are watched
+        polling: Always use the polling watcher
+        interval: Polling interval in seconds
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(index)
+        except OSError:
+            pass
+    return PollingWatcher(index, interval)
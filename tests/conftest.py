@@ -30,7 +30,13 @@ def _load_quarantine():
 
 
 def pytest_collection_modifyitems(session, config, items):
-    """Automatically mark quarantined flaky tests as xfail."""
+    """Skip benchmarks unless opted in; mark quarantined flaky tests as xfail."""
+    if os.environ.get("LIM_BENCH") != "1":
+        skip_benchmark = pytest.mark.skip(reason="wall-clock benchmark, set LIM_BENCH=1 to run")
+        for item in items:
+            if "benchmark" in item.keywords:
+                item.add_marker(skip_benchmark)
+
     quarantine = _load_quarantine()
     if not quarantine:
         return
@@ -0,0 +1,55 @@
+"""Tests for the synthetic-repository benchmark suite and its comparison tool."""
+
+import copy
+
+from tools.bench_compare import compare
+from tools.bench_suite import RepoSpec, generate_repo, run_suite
+
+
+def _tree(root):
+    return {
+        path.relative_to(root).as_posix(): path.read_text()
+        for path in sorted((root / "src").rglob("*.py"))
+    }
+
+
+def test_generated_repository_is_deterministic(tmp_path):
+    """Test that the same parameters always produce the same files."""
+    spec = RepoSpec(files=40, depth=2, legacy_density=0.3, patterns=2, seed=7)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = generate_repo(tmp_path / "a", spec)
+    second = generate_repo(tmp_path / "b", spec)
+    
+    assert first["files"] == second["files"] == 40
+    assert first["changed"] == 1
+    assert _tree(tmp_path / "a") == _tree(tmp_path / "b")
+    assert any("import legacy_" in text for text in _tree(tmp_path / "a").values())
+
+
+def test_suite_results_compare_against_a_stored_run():
+    """Test a tiny suite run, and that the comparison flags slowdowns only."""
+    result = run_suite(RepoSpec(files=30, legacy_density=0.5, patterns=2), repeat=1)
+    
+    assert set(result["benchmarks"]) == {
+        f"{name}_{state}"
+        for name in ("scan_all", "check_changed", "baseline_write")
+        for state in ("cold", "warm")
+    }
+    scan = result["benchmarks"]["scan_all_cold"]
+    assert scan["outcome"] == result["benchmarks"]["scan_all_warm"]["outcome"]
+    assert scan["outcome"]["files"] == 30
+    assert compare(result, result)["ok"]
+    
+    # A fixed baseline time, so that the ratios below do not depend on the machine
+    scan["median_s"] = 1.0
+    slower = copy.deepcopy(result)
+    slower["benchmarks"]["scan_all_cold"]["median_s"] = scan["median_s"] * 2 + 1
+    comparison = compare(result, slower)
+    assert not comparison["ok"]
+    assert [row["status"] for row in comparison["benchmarks"]].count("regressed") == 1
+    assert compare(result, slower, limits={"scan_all_cold": 10.0})["ok"]
+    
+    other = copy.deepcopy(result)
+    other["params"]["files"] = 31
+    assert not compare(result, other)["ok"]
@@ -0,0 +1,114 @@
+"""Tests for the persistent scan result cache."""
+
+import os
+
+from legacy_import_migrator import cache as cache_module
+from legacy_import_migrator.cache import ScanCache, content_digest, make_fingerprint
+from legacy_import_migrator.tracker import ImportTracker
+
+OLD_NS = 1_000_000_000  # A modification time well outside the racy window
+
+
+def test_fingerprint_depends_on_settings():
+    """Test that fingerprints change with patterns but not pattern order."""
+    base = make_fingerprint("tracker", ["a", "b"])
+
+    assert make_fingerprint("tracker", ["b", "a"]) == base
+    assert make_fingerprint("tracker", ["a", "c"]) != base
+    assert make_fingerprint("checker", ["a", "b"]) != base
+
+
+def test_get_put_and_reload(tmp_path):
+    """Test stat-validated hits, including after a save/load round trip."""
+    cache = ScanCache(str(tmp_path), "fp")
+    cache.put("src/a.py", 10, OLD_NS, "d1", {"sites": [[1, "old"]]})
+
+    assert cache.get("src/a.py", 10, OLD_NS) == {"sites": [[1, "old"]]}
+    assert cache.get("src/a.py", 11, OLD_NS) is None
+    cache.save()
+
+    reloaded = ScanCache(str(tmp_path), "fp")
+    assert reloaded.get("src/a.py", 10, OLD_NS) == {"sites": [[1, "old"]]}
+    assert ScanCache(str(tmp_path), "other").get("src/a.py", 10, OLD_NS) is None
+
+
+def test_revalidate_by_content_hash(tmp_path):
+    """Test that a touched but unchanged file is reused by its hash."""
+    cache = ScanCache(str(tmp_path), "fp")
+    cache.put("a.py", 10, OLD_NS, "d1", "payload")
+
+    assert cache.known_digest("a.py") == "d1"
+    assert cache.revalidate("a.py", 10, OLD_NS + 5, "d2") is None
+    assert cache.revalidate("a.py", 10, OLD_NS + 5, "d1") == "payload"
+    assert cache.get("a.py", 10, OLD_NS + 5) == "payload"
+
+
+def test_racy_entries_require_hash_check(tmp_path):
+    """Test that entries for just-modified files are never trusted on stat alone."""
+    cache = ScanCache(str(tmp_path), "fp")
+    now = cache_module.time.time_ns()
+    cache.put("a.py", 10, now, "d1", "payload")
+
+    assert cache.get("a.py", 10, now) is None
+    assert cache.known_digest("a.py") == "d1"
+
+
+def test_lru_eviction(tmp_path):
+    """Test that least recently used entries are evicted past the cap."""
+    cache = ScanCache(str(tmp_path), "fp", max_entries=2)
+    cache.put("a.py", 1, OLD_NS, "da", "a")
+    cache.put("b.py", 1, OLD_NS, "db", "b")
+    cache.save()
+
+    cache = ScanCache(str(tmp_path), "fp", max_entries=2)
+    assert cache.get("a.py", 1, OLD_NS) == "a"
+    cache.put("c.py", 1, OLD_NS, "dc", "c")
+    cache.save()
+
+    cache = ScanCache(str(tmp_path), "fp", max_entries=2)
+    assert len(cache) == 2
+    assert cache.known_digest("b.py") is None
+    assert cache.known_digest("a.py") == "da"
+
+
+def test_corrupt_cache_file_is_ignored(tmp_path):
+    """Test that an unreadable cache file starts an empty cache."""
+    (tmp_path / "fp.json").write_text("{not json", encoding="utf-8")
+
+    assert len(ScanCache(str(tmp_path), "fp")) == 0
+
+
+def test_tracker_warm_scan_uses_cache(tmp_path, monkeypatch):
+    """Test that a warm scan hits the cache and matches the cold result."""
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(5):
+        path = src / f"m{i}.py"
+        path.write_text("import old_module\nimport os\n", encoding="utf-8")
+        os.utime(path, ns=(OLD_NS, OLD_NS))
+
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"],
+        baseline_file=str(tmp_path / "baseline.json"),
+        cache_dir=str(tmp_path / "cache"),
+    )
+    cold = tracker.scan(search_roots=["src"])
+    warm = tracker.scan(search_roots=["src"])
+
+    assert cold.stats.cache_misses == 5
+    assert warm.stats.cache_hits == 5
+    assert warm.stats.files_parsed == 0
+    assert warm.blocking_imports == cold.blocking_imports == 5
+
+    # A content change is picked up and re-parsed
+    changed = src / "m0.py"
+    changed.write_text("import os\nimport os\n       \n", encoding="utf-8")
+    os.utime(changed, ns=(OLD_NS + 1, OLD_NS + 1))
+    assert tracker.scan(search_roots=["src"]).blocking_imports == 4
+
+
+def test_content_digest_is_stable():
+    """Test content hashing."""
+    assert content_digest(b"abc") == content_digest(b"abc")
+    assert content_digest(b"abc") != content_digest(b"abd")
@@ -0,0 +1,146 @@
+"""Tests for the lim serve daemon and its client."""
+
+import os
+import socket
+import threading
+
+import pytest
+
+from legacy_import_migrator import daemon
+from legacy_import_migrator.cache import keep_resident
+from legacy_import_migrator.cli.check import check_command
+from legacy_import_migrator.cli.serve import _run_request
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+def test_socket_path(tmp_path, monkeypatch):
+    """Test the per-repository default, the long-path fallback and the override."""
+    monkeypatch.delenv(daemon.SOCKET_ENV, raising=False)
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+
+    expected = str(tmp_path / ".cache" / "lim-serve.sock")
+    if len(expected) <= daemon.MAX_SOCKET_PATH:
+        assert daemon.socket_path(str(tmp_path / "src" / "pkg")) == expected
+
+    deep = tmp_path / ("d" * 120)
+    deep.mkdir()
+    (deep / ".git").mkdir()
+    assert len(daemon.socket_path(str(deep))) <= daemon.MAX_SOCKET_PATH
+
+    custom = str(tmp_path / "custom.sock")
+    monkeypatch.setenv(daemon.SOCKET_ENV, custom)
+    assert daemon.socket_path() == custom
+
+
+def test_forward_falls_back_without_daemon(tmp_path, monkeypatch):
+    """Test that clients run in-process when nothing listens on the socket."""
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(tmp_path / "missing.sock"))
+    assert daemon.forward("check", {}) is None
+
+    # A stale socket file left by a crashed daemon
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(tmp_path / "stale.sock"))
+    stale.close()
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(tmp_path / "stale.sock"))
+    assert daemon.forward("check", {}) is None
+
+
+def test_forward_falls_back_when_daemon_hangs(tmp_path, monkeypatch):
+    """Test that a daemon that never answers makes clients run in-process."""
+    path = str(tmp_path / "hung.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)  # accepted by the kernel, never answered
+    monkeypatch.setenv(daemon.SOCKET_ENV, path)
+    monkeypatch.setattr(daemon, "FORWARD_TIMEOUT", 0.2)
+    try:
+        assert daemon.forward("check", {}) is None
+    finally:
+        listener.close()
+
+
+def test_stream_outputs_run_in_process(tmp_path, monkeypatch):
+    """Test that output to stdout or a device never goes to the daemon's streams."""
+    fifo = tmp_path / "fifo"
+    os.mkfifo(fifo)
+    for path in ("-", "/dev/stdout", "/dev/null", str(fifo)):
+        assert daemon.is_stream_path(path), path
+    (tmp_path / "out.json").write_text("{}")
+    for path in (None, str(tmp_path / "out.json"), str(tmp_path / "new" / "out.json")):
+        assert not daemon.is_stream_path(path), path
+
+    # Declined before the socket is even looked up
+    monkeypatch.setattr(daemon, "socket_path", lambda: pytest.fail("socket looked up"))
+    assert daemon.forward("scan", {}, (None, "/dev/stdout")) is None
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    path = str(tmp_path / "d.sock")
+    ready = threading.Event()
+    keep_resident(True)
+    thread = threading.Thread(
+        target=daemon.serve, args=(path, _run_request), kwargs={"on_ready": ready.set}
+    )
+    thread.start()
+    assert ready.wait(5)
+    yield path
+    daemon.request(path, {"op": "stop"}, timeout=5)
+    thread.join(5)
+    keep_resident(False)
+
+
+def test_daemon_runs_check_and_revalidates_files(tmp_path, running_daemon):
+    """Test forwarded checks, including edits between requests."""
+    (tmp_path / "src").mkdir()
+    bad = tmp_path / "src" / "bad.py"
+    bad.write_text("import old_module\n")
+    ctx = check_command.make_context(
+        "check", ["--mode", "all", "--roots", "src", "--legacy-patterns", "old_module"]
+    )
+    message = {"op": "run", "command": "check", "params": ctx.params, "cwd": str(tmp_path)}
+
+    assert daemon.request(running_daemon, {"op": "ping"})["pid"] > 0
+
+    response = daemon.request(running_daemon, message)
+    assert response["exit_code"] == 2
+    assert "Line 1: import old_module" in response["stdout"]
+
+    bad.write_text("import new_module\n")
+    response = daemon.request(running_daemon, message)
+    assert response["exit_code"] == 0
+
+    bad.write_text("import new_module\nfrom old_module import x\n")
+    response = daemon.request(running_daemon, message)
+    assert response["exit_code"] == 2
+    assert "Line 2: from old_module import x" in response["stdout"]
+
+    # A second daemon refuses to take over the socket
+    with pytest.raises(RuntimeError):
+        daemon.serve(running_daemon, _run_request)
+
+
+def test_daemon_renders_for_the_client_terminal(tmp_path, running_daemon):
+    """Test that served output keeps the client's terminal and color settings."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "bad.py").write_text("import old_module\n")
+    ctx = check_command.make_context(
+        "check", ["--mode", "all", "--roots", "src", "--legacy-patterns", "old_module"]
+    )
+    message = {"op": "run", "command": "check", "params": ctx.params, "cwd": str(tmp_path)}
+
+    terminal = {"tty": True, "width": 80, "env": {"TERM": "xterm-256color"}}
+    response = daemon.request(running_daemon, dict(message, terminal=terminal))
+    assert response["exit_code"] == 2
+    assert "\x1b[31m" in response["stdout"]  # red
+
+    terminal = {"tty": True, "width": 80, "env": {"TERM": "xterm-256color", "NO_COLOR": "1"}}
+    response = daemon.request(running_daemon, dict(message, terminal=terminal))
+    assert "\x1b[31m" not in response["stdout"]
+
+    terminal = {"tty": False, "width": 80, "env": {}}
+    response = daemon.request(running_daemon, dict(message, terminal=terminal))
+    assert "\x1b[" not in response["stdout"]
+    assert "Line 1: import old_module" in response["stdout"]
@@ -0,0 +1,240 @@
+"""Tests for Python file discovery."""
+
+import io
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from legacy_import_migrator import discovery
+from legacy_import_migrator.checker import LegacyImportChecker
+from legacy_import_migrator.discovery import (
+    GitIgnore,
+    discover_py_files,
+    git_py_files,
+    read_file_list,
+    walk_py_files,
+)
+from legacy_import_migrator.globs import GlobSet
+
+
+def _touch(root, *paths, content=""):
+    for rel_path in paths:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_ignored_directories_are_pruned(tmp_path, monkeypatch):
+    """Test that ignored directories are never listed."""
+    _touch(
+        tmp_path,
+        "src/a.py",
+        "src/pkg/b.py",
+        "src/pkg/data.txt",
+        "src/.venv/lib/site.py",
+        "src/node_modules/x/y.py",
+        "src/pkg/__pycache__/b.py",
+    )
+    listed = []
+    real_list_dir = discovery._list_dir
+
+    def recording_list_dir(path):
+        listed.append(Path(path).relative_to(tmp_path).as_posix())
+        return real_list_dir(path)
+
+    monkeypatch.setattr(discovery, "_list_dir", recording_list_dir)
+
+    assert walk_py_files(str(tmp_path), ["src", "missing"]) == ["src/a.py", "src/pkg/b.py"]
+    assert sorted(listed) == ["missing", "src", "src/pkg"]
+
+
+def test_gitignore_rules():
+    """Test anchoring, directory-only rules, wildcards and negation."""
+    ignore = GitIgnore(
+        "", ["# comment", "*.gen.py", "/top.py", "out/", "!keep.gen.py", "a/**/z.py"]
+    )
+
+    assert ignore.match("pkg/model.gen.py", False)
+    assert ignore.match("keep.gen.py", False) is False
+    assert ignore.match("top.py", False)
+    assert ignore.match("pkg/top.py", False) is None
+    assert ignore.match("pkg/out", True)
+    assert ignore.match("pkg/out", False) is None
+    assert ignore.match("a/b/c/z.py", False)
+    assert ignore.match("a/z.py", False)
+
+    nested = GitIgnore("src", ["local.py"])
+    assert nested.match("src/x/local.py", False)
+    assert nested.match("local.py", False) is None
+
+
+def test_walk_honors_gitignore_and_exclude(tmp_path):
+    """Test .gitignore files at and above the search roots and exclude globs."""
+    _touch(
+        tmp_path,
+        "src/a.py",
+        "src/generated/g.py",
+        "src/pkg/skip.py",
+        "src/pkg/keep.py",
+        "src/vendor/v.py",
+    )
+    (tmp_path / ".gitignore").write_text("generated/\n", encoding="utf-8")
+    (tmp_path / "src" / "pkg" / ".gitignore").write_text("skip.py\n", encoding="utf-8")
+
+    assert walk_py_files(str(tmp_path), ["src"], exclude=GlobSet(["src/vendor/**"])) == [
+        "src/a.py",
+        "src/pkg/keep.py",
+    ]
+    assert len(walk_py_files(str(tmp_path), ["src"], gitignore=False)) == 5
+
+
+def test_threaded_walk_matches_serial(tmp_path):
+    """Test that threaded listing returns the same files."""
+    paths = [f"src/d{i}/e{j}/m{k}.py" for i in range(4) for j in range(3) for k in range(2)]
+    _touch(tmp_path, *paths)
+
+    serial = walk_py_files(str(tmp_path), ["src", "src/d1"])
+    assert len(serial) == 24
+    assert walk_py_files(str(tmp_path), ["src"], threads=4) == serial
+
+
+def test_checker_prunes_ignored_directories(tmp_path, monkeypatch):
+    """Test that the checker no longer scans vendored or excluded trees."""
+    monkeypatch.chdir(tmp_path)
+    _touch(tmp_path, "src/.venv/site.py", "src/build/b.py", "src/skip/s.py", content="import old\n")
+    _touch(tmp_path, "src/bad.py", content="import old\n")
+
+    checker = LegacyImportChecker(legacy_patterns=["old"], exclude_patterns=["src/skip/*"])
+    success, violations = checker.check(mode="all", search_roots=["src"])
+
+    assert not success
+    assert [path.as_posix() for path, _ in violations] == ["src/bad.py"]
+
+
+def test_kept_walks_are_revalidated_by_directory_mtimes(tmp_path, monkeypatch):
+    """Test that a kept walk is reused until a directory or ignore file changes."""
+    _touch(tmp_path, "src/a.py", "src/pkg/b.py")
+    _touch(tmp_path, ".gitignore", content="gen/\n")
+
+    def age(*rel_paths):
+        # Out of the racy window, so that the walk is kept
+        for rel_path in rel_paths:
+            os.utime(tmp_path / rel_path, ns=(10**18, 10**18))
+
+    age(".", "src", "src/pkg", ".gitignore")
+    listed = []
+    real_list_dir = discovery._list_dir
+    monkeypatch.setattr(
+        discovery, "_list_dir", lambda path: listed.append(path) or real_list_dir(path)
+    )
+    discovery.keep_walks(True)
+    try:
+        assert walk_py_files(str(tmp_path), ["src"]) == ["src/a.py", "src/pkg/b.py"]
+        assert len(listed) == 2
+
+        # Unchanged tree, and an edit that adds no entry: nothing is listed
+        (tmp_path / "src" / "a.py").write_text("import os\n")
+        dirs = []
+        assert walk_py_files(str(tmp_path), ["src"], dirs_out=dirs) == [
+            "src/a.py",
+            "src/pkg/b.py",
+        ]
+        assert len(listed) == 2
+        assert sorted(dirs) == ["src", "src/pkg"]
+
+        _touch(tmp_path, "src/pkg/gen/c.py", "src/pkg/d.py")
+        assert walk_py_files(str(tmp_path), ["src"]) == [
+            "src/a.py",
+            "src/pkg/b.py",
+            "src/pkg/d.py",
+        ]
+
+        # A changed .gitignore above the search root
+        age("src", "src/pkg", "src/pkg/gen")
+        walk_py_files(str(tmp_path), ["src"])
+        listings = len(listed)
+        walk_py_files(str(tmp_path), ["src"])
+        assert len(listed) == listings
+        (tmp_path / ".gitignore").write_text("")
+        assert "src/pkg/gen/c.py" in walk_py_files(str(tmp_path), ["src"])
+    finally:
+        discovery.keep_walks(False)
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_checker_in_subdirectory_honors_repository_ignores(tmp_path, monkeypatch):
+    """Test that a check run below the root applies the root .gitignore and info/exclude."""
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+    _git(tmp_path, "init", "-q")
+    (tmp_path / ".gitignore").write_text("generated/\n", encoding="utf-8")
+    (tmp_path / ".git" / "info" / "exclude").write_text("scratch.py\n", encoding="utf-8")
+    _touch(
+        tmp_path,
+        "pkg/src/generated/g.py",
+        "pkg/src/scratch.py",
+        "pkg/src/skip/s.py",
+        "pkg/src/bad.py",
+        content="import old\n",
+    )
+    monkeypatch.chdir(tmp_path / "pkg")
+
+    checker = LegacyImportChecker(legacy_patterns=["old"], exclude_patterns=["src/skip/*"])
+    success, violations = checker.check(mode="all", search_roots=["src"])
+
+    assert not success
+    assert [path.as_posix() for path, _ in violations] == ["src/bad.py"]
+
+
+def test_git_index_source(tmp_path):
+    """Test listing tracked files from git's index, filtered to the roots."""
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+    _touch(tmp_path, "src/a.py", "src/build/gen.py", "src/pkg/b.py", "tests/t.py", "setup.py")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", "src/a.py", "src/build/gen.py", "tests/t.py", "setup.py")
+    _touch(tmp_path, "src/untracked.py")
+
+    assert git_py_files(str(tmp_path), ["src"]) == ["src/a.py"]
+    assert discover_py_files(str(tmp_path), ["src", "tests"], files_from="git") == [
+        "src/a.py",
+        "tests/t.py",
+    ]
+    assert git_py_files(str(tmp_path / "src"), ["."]) == ["a.py"]
+
+
+def test_git_index_source_skips_deleted_files(tmp_path):
+    """Test files removed from the work tree only, and from the index only."""
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+    _touch(tmp_path, "src/a.py", "src/gone.py", "src/unstaged.py")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", "src")
+
+    # Removed from the work tree, still in the index
+    (tmp_path / "src" / "gone.py").unlink()
+    # Removed from the index, still on disk (now untracked)
+    _git(tmp_path, "rm", "-q", "--cached", "src/unstaged.py")
+
+    assert git_py_files(str(tmp_path), ["src"]) == ["src/a.py"]
+
+
+def test_file_list_source(tmp_path, monkeypatch):
+    """Test NUL- and newline-delimited file lists, including stdin."""
+    _touch(tmp_path, "src/a.py", "src/b.py", "src/c.txt", "docs/d.py")
+    listing = tmp_path / "files.txt"
+
+    listing.write_bytes(b"src/a.py\r\nsrc/c.txt\nsrc/missing.py\ndocs/d.py\n")
+    assert read_file_list(str(listing), str(tmp_path), ["src"]) == ["src/a.py"]
+
+    listing.write_bytes(f"src/b.py\0{tmp_path / 'src' / 'a.py'}\0".encode())
+    assert read_file_list(str(listing), str(tmp_path), ["src"]) == ["src/a.py", "src/b.py"]
+
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(b"./src/b.py\n")))
+    assert discover_py_files(str(tmp_path), ["src"], files_from="-") == ["src/b.py"]
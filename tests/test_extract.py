@@ -0,0 +1,161 @@
+"""Tests for the import extraction engines."""
+
+import ast
+import random
+import sysconfig
+from pathlib import Path
+
+import pytest
+
+from legacy_import_migrator.extract import (
+    ImportRecord,
+    extract_imports,
+    extract_imports_ast,
+    extract_imports_tokenize,
+)
+from legacy_import_migrator.tracker import ImportTracker
+
+# Statement templates combined by the corpus generator; {m} is a module name
+STATEMENTS = [
+    "import {m}",
+    "import {m} as alias",
+    "import {m}, os.path as p, {m}_two",
+    "from {m} import thing",
+    "from {m} import (\n    a,  # comment\n    b,\n)",
+    "from {m} import a as b, c",
+    "from .{m} import x",
+    "from ... import y",
+    "from ..{m}.deep import *",
+    "import {m}; import sys",
+    "from {m} \\\n    import continued",
+    "x = 'import {m}'",
+    "# import {m}",
+    '"""\nimport {m}\n"""',
+    "value = {{'from': 1}}",
+    "raise ValueError('x') from None",
+]
+
+WRAPPERS = [
+    "{s}",
+    "if True:\n{i}",
+    "try:\n{i}\nexcept ImportError:\n    pass",
+    "def func():\n{i}\n    return None",
+    "class Klass:\n{i}",
+    "if flag: {s}",
+    "with ctx:\n    if other:\n    {i}",
+]
+
+
+def _indent(text, prefix="    "):
+    return "\n".join(prefix + line for line in text.splitlines())
+
+
+def _generate_corpus(count, seed=1234):
+    """Generate a deterministic corpus of valid modules."""
+    rng = random.Random(seed)
+    modules = ["old_module", "legacy.pkg", "new_module", "pkg.sub.mod"]
+    corpus = []
+    while len(corpus) < count:
+        blocks = []
+        for _ in range(rng.randint(1, 8)):
+            statement = rng.choice(STATEMENTS).format(m=rng.choice(modules))
+            wrapper = rng.choice(WRAPPERS)
+            blocks.append(wrapper.format(s=statement, i=_indent(statement)))
+        source = "\n".join(blocks) + "\n"
+        try:
+            ast.parse(source)
+        except SyntaxError:
+            continue
+        corpus.append(source)
+    return corpus
+
+
+def _sorted(records):
+    return sorted(records)
+
+
+def test_simple_forms():
+    """Test records for common import forms."""
+    source = "import a.b as c, d\nfrom .e import f\nfrom . import g\n"
+
+    assert extract_imports_tokenize(source) == [
+        ImportRecord(1, "a.b", 0),
+        ImportRecord(1, "d", 0),
+        ImportRecord(2, "e", 1),
+        ImportRecord(3, "", 1),
+    ]
+
+
+def test_multiline_and_nested_imports():
+    """Test parenthesized, continued and nested imports keep statement lines."""
+    source = (
+        "def f():\n"
+        "    from old_module import (\n"
+        "        a,\n"
+        "        b,\n"
+        "    )\n"
+        "try:\n"
+        "    import old_module.sub\n"
+        "except ImportError: import fallback\n"
+    )
+
+    expected = [
+        ImportRecord(2, "old_module", 0),
+        ImportRecord(7, "old_module.sub", 0),
+        ImportRecord(8, "fallback", 0),
+    ]
+    assert extract_imports_tokenize(source) == expected
+    assert extract_imports_ast(source) == expected
+
+
+def test_engines_agree_on_generated_corpus():
+    """Test that both engines agree on a generated corpus."""
+    for source in _generate_corpus(400):
+        assert _sorted(extract_imports(source, "tokenize")) == _sorted(
+            extract_imports(source, "ast")
+        ), source
+
+
+def test_engines_agree_on_stdlib_sample():
+    """Test that both engines agree on real-world code from the stdlib."""
+    stdlib = Path(sysconfig.get_paths()["stdlib"])
+    files = sorted(stdlib.glob("*.py"))[:60]
+    if not files:
+        pytest.skip("stdlib sources not available")
+
+    for path in files:
+        source = path.read_text(encoding="utf-8", errors="replace")
+        assert _sorted(extract_imports(source, "tokenize")) == _sorted(
+            extract_imports(source, "ast")
+        ), path
+
+
+def test_tokenize_falls_back_on_lexer_errors():
+    """Test that unclassifiable source falls back to the AST engine."""
+    assert extract_imports("import a\nx = 'unterminated\n", "tokenize") == []
+    assert extract_imports("import a\0", "tokenize") == []
+
+
+def test_tokenize_skips_non_import_from():
+    """Test that yield from / raise from are not mistaken for imports."""
+    source = (
+        "def gen():\n"
+        "    yield from items\n"
+        "    raise Error('import x') from None\n"
+        "importlib = 1  # import y\n"
+    )
+    assert extract_imports_tokenize(source) == []
+
+
+def test_tracker_engine_selection(tmp_path):
+    """Test that the tracker honours the selected engine."""
+    path = tmp_path / "m.py"
+    path.write_text("import os\nif x:\n    from old_module.a import (b,\n c)\n", encoding="utf-8")
+
+    for engine in ("ast", "tokenize"):
+        tracker = ImportTracker(legacy_patterns=["old_module"], engine=engine)
+        sites = tracker._extract_ast_imports(path)
+        assert [(s.lineno, s.module) for s in sites] == [(3, "old_module.a")]
+
+    with pytest.raises(ValueError):
+        ImportTracker(legacy_patterns=["old_module"], engine="regex")
@@ -0,0 +1,75 @@
+"""Tests for reading files of a git revision."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from legacy_import_migrator.gitblobs import BlobReader, list_py_blobs, resolve_rev
+from legacy_import_migrator.globs import GlobSet
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not available")
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for rel_path, content in [
+        ("src/a.py", "import old\n"),
+        ("src/pkg/b.py", "x = 1\n"),
+        ("src/build/gen.py", "import old\n"),
+        ("src/skip/s.py", "import old\n"),
+        ("src/notes.txt", "text\n"),
+        ("tests/t.py", "import old\n"),
+    ]:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    os.symlink("a.py", tmp_path / "src" / "link.py")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_list_py_blobs_applies_selection_rules(repo):
+    """Test root, ignore-dir and exclude filtering; symlinks are skipped."""
+    commit = resolve_rev(str(repo), "HEAD")
+    blobs = list_py_blobs(str(repo), commit, ["src"], exclude=GlobSet(["src/skip/**"]))
+
+    assert [path for path, _ in blobs] == ["src/a.py", "src/pkg/b.py"]
+    assert blobs[0][1] == _git(repo, "rev-parse", "HEAD:src/a.py").decode().strip()
+    assert len(list_py_blobs(str(repo), commit, ["."])) == 4
+
+    with pytest.raises(RuntimeError):
+        resolve_rev(str(repo), "no-such-branch")
+
+
+def test_blob_reader_streams_contents_in_order(repo):
+    """Test batched reads, duplicates and abandoning a read midway."""
+    blobs = list_py_blobs(str(repo), "HEAD", ["src", "tests"])
+    oids = [oid for _, oid in blobs] * 200
+
+    with BlobReader(str(repo)) as reader:
+        contents = [data for _, data in reader.read_many(oids)]
+    assert contents[:3] == [b"import old\n", b"x = 1\n", b"import old\n"]
+    assert len(contents) == len(oids)
+
+    reader = BlobReader(str(repo))
+    stream = reader.read_many(oids)
+    assert next(stream)[1] == b"import old\n"
+    stream.close()  # must not hang on the feeder thread
+    reader.close()
+
+    with BlobReader(str(repo)) as reader:
+        with pytest.raises(RuntimeError):
+            list(reader.read_many(["0" * 40]))
@@ -0,0 +1,98 @@
+"""Tests for the compiled allowlist glob set."""
+
+import random
+from fnmatch import fnmatch
+from unittest.mock import patch
+
+from legacy_import_migrator.checker import LegacyImportChecker
+from legacy_import_migrator.globs import GlobSet
+from legacy_import_migrator.tracker import ImportTracker
+
+
+def _first_fnmatch(path, patterns):
+    return next((p for p in patterns if fnmatch(path, p)), None)
+
+
+def test_directory_and_regex_patterns():
+    """Test directory-prefix globs and general globs."""
+    globs = GlobSet(["tests/legacy/**", "experiments/*", "tests/**/test_*deprecation*.py"])
+
+    assert globs.match("tests/legacy/a.py") == "tests/legacy/**"
+    assert globs.match("tests/legacy/deep/b.py") == "tests/legacy/**"
+    assert globs.match("experiments/x/y.py") == "experiments/*"
+    assert globs.match("tests/unit/test_old_deprecation.py") == "tests/**/test_*deprecation*.py"
+    assert globs.match("tests/legacy.py") is None
+    assert globs.match("src/tests/legacy/a.py") is None
+    assert not GlobSet([])
+    assert GlobSet([]).match("a.py") is None
+
+
+def test_first_declared_pattern_is_reported():
+    """Test that the earliest matching pattern wins across both strategies."""
+    globs = GlobSet(["src/*.py", "src/**", "src/pkg/**"])
+
+    assert globs.match("src/a.py") == "src/*.py"
+    assert globs.match("src/pkg/b.txt") == "src/**"
+    assert GlobSet(["src/pkg/**", "src/**"]).match("src/pkg/b.py") == "src/pkg/**"
+
+
+def test_matches_fnmatch_on_random_paths():
+    """Test agreement with a linear fnmatch loop, including the reported pattern."""
+    rng = random.Random(7)
+    words = ["src", "tests", "legacy", "pkg", "a", "b_c"]
+
+    def path(depth):
+        return "/".join(rng.choice(words) for _ in range(depth))
+
+    patterns = []
+    for _ in range(300):
+        kind = rng.randrange(4)
+        if kind == 0:
+            patterns.append(path(rng.randint(1, 3)) + "/**")
+        elif kind == 1:
+            patterns.append(path(rng.randint(1, 2)) + "/*")
+        elif kind == 2:
+            patterns.append(path(rng.randint(0, 2)) + "/*" + rng.choice(words) + "*.py")
+        else:
+            patterns.append("**/test_" + rng.choice(words) + "?.py")
+    globs = GlobSet(patterns)
+
+    for _ in range(3000):
+        candidate = path(rng.randint(1, 5)) + rng.choice([".py", "/test_a1.py", "_a.py"])
+        assert globs.match(candidate) == _first_fnmatch(candidate, patterns), candidate
+
+
+def test_tracker_explain_allow(tmp_path, capsys):
+    """Test that --explain-allow reports the marker or the matching glob."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "marked.py").write_text("# LEGACY-ALLOW\nimport old_module\n")
+    (tmp_path / "src" / "legacy").mkdir()
+    (tmp_path / "src" / "legacy" / "shim.py").write_text("import old_module\n")
+    (tmp_path / "src" / "blocking.py").write_text("import old_module\n")
+
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"],
+        allow_patterns=["src/legacy/**"],
+        baseline_file=str(tmp_path / "baseline.json"),
+    )
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        result = tracker.scan(search_roots=["src"], explain_allow=True)
+
+    err = capsys.readouterr().err
+    assert result.blocking_imports == 1
+    assert result.allowed_imports == 2
+    assert "Allowed: src/marked.py (LEGACY-ALLOW marker)" in err
+    assert "Allowed: src/legacy/shim.py (glob src/legacy/**)" in err
+
+
+def test_checker_explain_allow(tmp_path, monkeypatch, capsys):
+    """Test that the checker explains skipped files."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src" / "legacy").mkdir(parents=True)
+    (tmp_path / "src" / "legacy" / "shim.py").write_text("import old_module\n")
+
+    checker = LegacyImportChecker(legacy_patterns=["old_module"], allow_patterns=["src/legacy/*"])
+    success, _ = checker.check(mode="all", search_roots=["src"], explain_allow=True)
+
+    assert success
+    assert "src/legacy/shim.py (glob src/legacy/*)" in capsys.readouterr().err
@@ -0,0 +1,57 @@
+"""Tests for the import graph and its queries."""
+
+from unittest.mock import patch
+
+from legacy_import_migrator.graph import ImportGraph, module_name, resolve_relative
+from legacy_import_migrator.tracker import ImportTracker
+
+
+def test_module_names_and_relative_imports():
+    """Test naming files as modules and resolving relative imports."""
+    assert module_name("src/pkg/mod.py", "src") == "pkg.mod"
+    assert module_name("src/pkg/__init__.py", "src") == "pkg"
+    assert module_name("tests/test_a.py", "") == "tests.test_a"
+    
+    assert resolve_relative("pkg.sub.mod", False, "other", 1) == "pkg.sub.other"
+    assert resolve_relative("pkg.sub.mod", False, "", 2) == "pkg"
+    assert resolve_relative("pkg.sub", True, "mod", 1) == "pkg.sub.mod"
+    assert resolve_relative("pkg.mod", False, "x", 3) is None
+    assert resolve_relative("pkg.mod", False, "os", 0) == "os"
+
+
+def test_graph_queries_survive_save_and_load(tmp_path):
+    """Test reach and blast-radius on a built graph, before and after saving."""
+    files = {
+        "src/app/__init__.py": "",
+        "src/app/main.py": "from app import service, VERSION\nimport os\n",
+        "src/app/service.py": "from .util import helper\n",
+        "src/app/util.py": "import old_pkg.helpers as helper\n",
+        "src/app/clean.py": "import json\n",
+        "tests/__init__.py": "",
+        "tests/test_main.py": "from app.main import run\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        
+    tracker = ImportTracker()
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        graph = tracker.build_graph(search_roots=["src", "tests"])
+    graph.save(str(tmp_path / "graph.bin"))
+    loaded = ImportGraph.load(str(tmp_path / "graph.bin"))
+    
+    for g in (graph, loaded):
+        assert g.paths[g.node_id("tests.test_main")] == "tests/test_main.py"
+        assert g.matching(["old_pkg"]) == {g.node_id("old_pkg.helpers")}
+        assert g.matching(["app.main", "json"]) == {g.node_id("app.main"), g.node_id("json")}
+        assert g.reach(g.lookup("tests/test_main.py"), g.matching(["old_pkg"])) == [
+            ["tests.test_main", "app.main", "app.service", "app.util", "old_pkg.helpers"]
+        ]
+        assert g.blast_radius(g.matching(["old_pkg"])) == [
+            ("app.util", 1), ("app.service", 2), ("app.main", 3), ("tests.test_main", 4)
+        ]
+        assert g.reach(g.lookup("app.clean"), g.matching(["old_pkg"])) == []
+    assert loaded.nodes == graph.nodes and loaded.edge_count == graph.edge_count
+    main = graph.node_id("app.main")
+    assert sorted(graph.nodes[n] for n in graph.imports_of(main)) == ["app", "app.service", "os"]
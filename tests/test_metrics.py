@@ -0,0 +1,69 @@
+"""Tests for the OpenMetrics export of scan results."""
+
+import re
+from unittest.mock import patch
+
+from legacy_import_migrator import profiling
+from legacy_import_migrator.metrics import scan_metrics, write_metrics
+from legacy_import_migrator.sites import SiteTable
+from legacy_import_migrator.tracker import ImportTracker
+
+SAMPLE_RE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? \S+$')
+
+
+def test_scan_metrics_break_down_sites_and_time_phases(tmp_path):
+    """Test counts per root and pattern, histograms and the exposition syntax."""
+    files = {
+        "src/a.py": "import old_pkg\nfrom legacy.core import x\n",
+        "src/shim/compat.py": "import old_pkg.util\n",
+        "tests/test_a.py": "import old_pkg\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        
+    tracker = ImportTracker(
+        legacy_patterns=["old_pkg", "legacy.core"], allow_patterns=["src/shim/**"]
+    )
+    table = SiteTable()
+    profiler = profiling.start(slowest=0)
+    try:
+        with patch.object(tracker, "_repo_root", return_value=tmp_path):
+            progress = tracker.scan(search_roots=["src", "tests"], site_table=table)
+    finally:
+        profiling.stop()
+        
+    text = scan_metrics(
+        progress, ["src", "tests"], ["old_pkg", "legacy.core"], table, profiler, timestamp=1.5
+    )
+    lines = text.splitlines()
+    assert lines[-1] == "# EOF"
+    samples = [line for line in lines if not line.startswith("#")]
+    assert all(SAMPLE_RE.match(line) for line in samples), samples
+    for expected in (
+        "lim_blocking_imports 3",
+        "lim_allowed_imports 1",
+        "lim_legacy_imports 4",
+        "lim_files_scanned 3",
+        "lim_last_scan_timestamp_seconds 1.5",
+        'lim_root_imports{root="src",status="blocking"} 2',
+        'lim_root_imports{root="src",status="allowed"} 1',
+        'lim_root_imports{root="tests",status="blocking"} 1',
+        'lim_pattern_imports{pattern="old_pkg",status="blocking"} 2',
+        'lim_pattern_imports{pattern="old_pkg",status="allowed"} 1',
+        'lim_pattern_imports{pattern="legacy.core",status="blocking"} 1',
+        'lim_phase_duration_seconds_count{phase="parse"} 3',
+        'lim_file_duration_seconds_bucket{le="+Inf"} 3',
+    ):
+        assert expected in samples, expected
+    # Buckets are cumulative
+    buckets = [
+        int(line.rsplit(" ", 1)[1]) for line in samples
+        if line.startswith('lim_phase_duration_seconds_bucket{phase="read"')
+    ]
+    assert buckets == sorted(buckets) and buckets[-1] == 3
+    
+    write_metrics(str(tmp_path / "out" / "lim.prom"), text)
+    assert (tmp_path / "out" / "lim.prom").read_text() == text
+    assert [p.name for p in (tmp_path / "out").iterdir()] == ["lim.prom"]
@@ -0,0 +1,105 @@
+"""Tests for the bulk import rewriter."""
+
+import stat
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from legacy_import_migrator.migrate import (
+    ImportMigrator,
+    parse_mapping,
+    rename_module,
+    rewrite_source,
+    write_atomic,
+)
+
+
+def test_rewrite_source_replaces_only_module_names():
+    """Test rewriting keeps formatting, comments, relative imports and line endings."""
+    mapping = parse_mapping(["old_pkg=new_pkg", "old_pkg.core=core"])
+    assert rename_module("old_pkg.core.db", mapping) == "core.db"
+    assert rename_module("src.old_pkg.util", mapping) == "src.new_pkg.util"
+    assert rename_module("old_pkg_extra", mapping) is None
+
+    source = (
+        "import os, old_pkg.util  # note\n"
+        "from old_pkg . core import (\n"
+        "    engine,  # keep\n"
+        ")\n"
+        "from .old_pkg import local\n"
+        "text = 'import old_pkg'\n"
+        "import old_pkg.core as core\n"
+    )
+    rewritten, changes, rebinds = rewrite_source(source, mapping)
+    assert rewritten == (
+        "import os, new_pkg.util  # note\n"
+        "from core import (\n"
+        "    engine,  # keep\n"
+        ")\n"
+        "from .old_pkg import local\n"
+        "text = 'import old_pkg'\n"
+        "import core as core\n"
+    )
+    assert changes == 3
+    assert rebinds == [(1, "old_pkg.util", "new_pkg.util")]
+
+    crlf = "\ufeffimport old_pkg\r\nx = 1\r\n"
+    assert rewrite_source(crlf, mapping)[0] == "\ufeffimport new_pkg\r\nx = 1\r\n"
+    assert rewrite_source("import json\n", mapping) == ("import json\n", 0, [])
+    with pytest.raises(ValueError):
+        rewrite_source("import old_pkg\r\nx = 1\n", mapping)
+    with pytest.raises(ValueError):
+        parse_mapping(["old_pkg"])
+
+
+def test_migrate_touches_only_blocking_files(tmp_path):
+    """Test that allowed and clean files are left alone, and dry runs write nothing."""
+    files = {
+        "src/app/main.py": "from old_pkg import helpers\n",
+        "src/app/shim.py": "# LEGACY-ALLOW\nimport old_pkg\n",
+        "src/app/clean.py": "import json\n",
+        "src/legacy/compat.py": "import old_pkg\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    (tmp_path / "src/app/main.py").chmod(0o750)
+
+    migrator = ImportMigrator({"old_pkg": "new_pkg"}, allow_patterns=["src/legacy/**"])
+    with patch.object(migrator.tracker, "_repo_root", return_value=tmp_path):
+        dry = list(migrator.migrate(search_roots=["src"], dry_run=True))
+        assert [result.path for result in dry] == ["src/app/main.py"]
+        assert "-from old_pkg import helpers\n+from new_pkg import helpers\n" in dry[0].diff
+        assert (tmp_path / "src/app/main.py").read_text() == files["src/app/main.py"]
+
+        results = list(migrator.migrate(search_roots=["src"]))
+
+    assert [(result.path, result.changes, result.error) for result in results] == [
+        ("src/app/main.py", 1, None)
+    ]
+    for rel_path, content in files.items():
+        expected = "from new_pkg import helpers\n" if rel_path == "src/app/main.py" else content
+        assert (tmp_path / rel_path).read_text() == expected
+    assert (tmp_path / "src/app/main.py").stat().st_mode & 0o777 == 0o750
+    assert sorted(p.name for p in (tmp_path / "src/app").iterdir()) == [
+        "clean.py", "main.py", "shim.py"
+    ]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs POSIX symlinks and modes")
+def test_write_atomic_follows_symlinks_and_keeps_mode(tmp_path):
+    """Test that a symlinked file stays a link and the target keeps its mode."""
+    target = tmp_path / "real.py"
+    target.write_text("import old_pkg\n")
+    target.chmod(0o644)
+    link = tmp_path / "link.py"
+    link.symlink_to(target)
+
+    write_atomic(link, b"import new_pkg\n")
+
+    assert link.is_symlink()
+    assert target.read_text() == "import new_pkg\n"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o644
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["link.py", "real.py"]
@@ -0,0 +1,77 @@
+"""Tests for the parallel scan engine."""
+
+import os
+
+import pytest
+
+from legacy_import_migrator import parallel
+from legacy_import_migrator.checker import LegacyImportChecker
+from legacy_import_migrator.parallel import parallel_map, resolve_jobs
+from legacy_import_migrator.tracker import ImportTracker
+
+
+def _square(value):
+    return value * value
+
+
+def test_resolve_jobs():
+    """Test --jobs value resolution."""
+    assert resolve_jobs(None) == 1
+    assert resolve_jobs(3) == 3
+    assert resolve_jobs("4") == 4
+    assert resolve_jobs("auto") == (os.cpu_count() or 1)
+
+    for bad in ("0", "-2", "many", 0):
+        with pytest.raises(ValueError):
+            resolve_jobs(bad)
+
+
+def test_parallel_map_preserves_order(monkeypatch):
+    """Test that pooled results come back in input order."""
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_ITEMS", 0)
+    items = list(range(500))
+
+    assert list(parallel_map(_square, items, jobs=2, chunksize=7)) == [i * i for i in items]
+    assert list(parallel_map(_square, items, jobs=1)) == [i * i for i in items]
+
+
+def _make_repo(root):
+    for i in range(40):
+        pkg = root / "src" / f"pkg{i % 5}"
+        pkg.mkdir(parents=True, exist_ok=True)
+        lines = ["import os"]
+        if i % 3 == 0:
+            lines.append("import old_module.sub")
+        if i % 4 == 0:
+            lines.append("from old_module import thing")
+        if i % 10 == 0:
+            lines.append("# LEGACY-ALLOW")
+        (pkg / f"mod{i}.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_parallel_scan_matches_serial(tmp_path, monkeypatch):
+    """Test that a pooled scan produces exactly the serial result."""
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_ITEMS", 0)
+    monkeypatch.chdir(tmp_path)
+    _make_repo(tmp_path)
+
+    tracker = ImportTracker(legacy_patterns=["old_module"], baseline_file=str(tmp_path / "b.json"))
+    serial = tracker.scan(search_roots=["src"], jobs=1)
+    pooled = tracker.scan(search_roots=["src"], jobs=3)
+
+    assert serial.blocking_imports > 0
+    assert pooled.to_dict() == serial.to_dict()
+
+
+def test_parallel_check_matches_serial(tmp_path, monkeypatch):
+    """Test that a pooled check reports the same violations as a serial one."""
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_ITEMS", 0)
+    monkeypatch.chdir(tmp_path)
+    _make_repo(tmp_path)
+
+    checker = LegacyImportChecker(legacy_patterns=["old_module"])
+    serial = checker.check(mode="all", search_roots=["src"], jobs=1)
+    pooled = checker.check(mode="all", search_roots=["src"], jobs=2)
+
+    assert not serial[0]
+    assert pooled == serial
@@ -0,0 +1,69 @@
+"""Tests for the legacy pattern trie."""
+
+import random
+
+from legacy_import_migrator.checker import LegacyImportChecker
+from legacy_import_migrator.patterns import PatternTrie
+
+
+def _naive_match(name, patterns):
+    return any(name == p or name.startswith(p + ".") for p in patterns)
+
+
+def test_prefix_semantics():
+    """Test exact and dotted-prefix matches only."""
+    trie = PatternTrie(["old_module", "company.legacy"])
+
+    assert trie.match("old_module") == "old_module"
+    assert trie.match("old_module.sub.deep") == "old_module"
+    assert trie.match("company.legacy.db") == "company.legacy"
+    assert trie.match("old_module_two") is None
+    assert trie.match("company") is None
+    assert trie.match("some.old_module") is None
+
+
+def test_shortest_pattern_wins():
+    """Test that a broader pattern subsumes narrower ones."""
+    trie = PatternTrie(["pkg.sub", "pkg"])
+
+    assert trie.match("pkg.sub.x") == "pkg"
+
+
+def test_matches_naive_semantics_on_random_names():
+    """Test agreement with the linear any() scan on many patterns."""
+    rng = random.Random(42)
+    words = ["a", "b", "core", "legacy", "util", "x1"]
+
+    def name(depth):
+        return ".".join(rng.choice(words) for _ in range(depth))
+
+    patterns = [name(rng.randint(1, 4)) for _ in range(3000)]
+    trie = PatternTrie(patterns)
+
+    for _ in range(2000):
+        candidate = name(rng.randint(1, 6))
+        assert (trie.match(candidate) is not None) == _naive_match(candidate, patterns)
+
+
+def test_checker_uses_trie_with_src_prefix(tmp_path, monkeypatch):
+    """Test checker matching with the optional 'src.' prefix."""
+    monkeypatch.chdir(tmp_path)
+    checker = LegacyImportChecker(legacy_patterns=["old_module"])
+    source = (
+        "import os\n"
+        "from src.old_module import a\n"
+        "\n"
+        "if True:\n"
+        "    import old_module.sub as s\n"
+        "import old_module_two\n"
+    )
+
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "mod.py").write_text(source)
+
+    success, violations = checker.check(mode="all", search_roots=["src"])
+    assert not success
+    assert violations[0][1] == [
+        (2, "from src.old_module import a"),
+        (5, "import old_module.sub as s"),
+    ]
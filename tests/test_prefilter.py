@@ -0,0 +1,48 @@
+"""Tests for the byte-level pattern prefilter."""
+
+from legacy_import_migrator.prefilter import PatternPrefilter
+from legacy_import_migrator.tracker import ImportTracker
+
+
+def test_matches_any_pattern():
+    """Test single-pass matching across several patterns."""
+    prefilter = PatternPrefilter(["old_module", "company.legacy.api", "company.legacy.db"])
+
+    assert prefilter.may_match(b"import old_module\n")
+    assert prefilter.may_match(b"from company.legacy.db import x\n")
+    assert prefilter.may_match(b"from company . legacy\\\n  .api import x\n")
+    assert not prefilter.may_match(b"from company.legacy import x\n")
+    assert not prefilter.may_match(b"import new_module\n")
+
+
+def test_shorter_pattern_covers_longer():
+    """Test that a pattern subsumes longer patterns under it."""
+    prefilter = PatternPrefilter(["legacy.sub.deep", "legacy"])
+
+    assert prefilter.regex.pattern == b"legacy"
+    assert prefilter.may_match(b"import legacy.other")
+
+
+def test_no_patterns_matches_nothing():
+    """Test that an empty pattern set rejects every file."""
+    assert not PatternPrefilter([]).may_match(b"import anything")
+
+
+def test_tracker_reports_prefiltered_files(tmp_path, monkeypatch):
+    """Test that untouched files are skipped and counted in the stats."""
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "legacy_user.py").write_text("import old_module.sub\n", encoding="utf-8")
+    (src / "mention.py").write_text("x = 'old_module'\n", encoding="utf-8")
+    for i in range(3):
+        (src / f"clean{i}.py").write_text("import os\n", encoding="utf-8")
+
+    tracker = ImportTracker(legacy_patterns=["old_module"], baseline_file=str(tmp_path / "b.json"))
+    result = tracker.scan(search_roots=["src"])
+
+    assert result.files_scanned == 5
+    assert result.blocking_imports == 1
+    assert result.stats.files_prefiltered == 3
+    assert result.stats.files_parsed == 2
+    assert result.to_dict()["stats"]["files_prefiltered"] == 3
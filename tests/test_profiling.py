@@ -0,0 +1,100 @@
+"""Tests for phase profiling and trace output."""
+
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+
+from legacy_import_migrator import profiling
+from legacy_import_migrator.parallel import parallel_map
+from legacy_import_migrator.tracker import ImportTracker
+
+
+def _work(item):
+    with profiling.phase("outer"):
+        with profiling.phase("inner"):
+            time.sleep(0.002)
+    return item * 2
+
+
+def test_phases_count_self_time_and_items_are_timed():
+    """Test nested phase accounting, per-item timing and the trace events."""
+    profiler = profiling.start(slowest=2, trace=True)
+    try:
+        with profiling.phase("setup"):
+            results = list(parallel_map(_work, [1, 2, 3]))
+    finally:
+        assert profiling.stop() is profiler
+        
+    assert results == [2, 4, 6]
+    assert profiling.phase("ignored") is profiling.phase("ignored")  # no-op when inactive
+    profile = profiler.to_dict()
+    assert profile["version"] == profiling.PROFILE_FORMAT_VERSION
+    assert profile["phases"]["inner"]["calls"] == 3
+    assert profile["phases"]["inner"]["wall_s"] >= 0.006
+    # Nested time is not counted twice
+    assert profile["phases"]["outer"]["wall_s"] < profile["phases"]["inner"]["wall_s"]
+    assert profile["files"]["count"] == 3
+    assert len(profile["slowest_files"]) == 2
+    
+    events = profiler.trace_events()
+    assert events[0] == {"name": "process_name", "ph": "M", "pid": os.getpid(),
+                         "args": {"name": "lim"}}
+    spans = [event for event in events if event["ph"] == "X"]
+    assert sorted(event["name"] for event in spans if event["cat"] == "file") == ["1", "2", "3"]
+    assert {event["name"] for event in spans if event["cat"] == "phase"} == {
+        "setup", "outer", "inner"
+    }
+    assert all(event["dur"] >= 0 and event["ts"] >= 0 for event in spans)
+
+
+def test_item_profilers_are_local_to_their_thread():
+    """Test that timing an item in one thread leaves other threads' profiler alone."""
+    profiler = profiling.start()
+    inside = threading.Event()
+    release = threading.Event()
+    
+    def held(item):
+        inside.set()
+        assert release.wait(5)
+        return item
+        
+    worker = threading.Thread(target=profiling.Profiled(held), args=(1,))
+    try:
+        worker.start()
+        assert inside.wait(5)
+        assert profiling.active() is profiler
+        release.set()
+        worker.join()
+        assert profiling.active() is profiler
+    finally:
+        release.set()
+        profiling.stop()
+
+
+def test_scan_profile_names_files_and_phases(tmp_path, monkeypatch):
+    """Test that a profiled scan reports scanning phases and writes a trace."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("import old_module\n")
+    (tmp_path / "src" / "b.py").write_text("import json\n")
+    monkeypatch.chdir(tmp_path)
+    
+    tracker = ImportTracker(legacy_patterns=["old_module"])
+    profiler = profiling.start(trace=True)
+    try:
+        with patch.object(tracker, "_repo_root", return_value=tmp_path):
+            tracker.scan(search_roots=["src"])
+    finally:
+        profiling.stop()
+    profiler.write_trace(str(tmp_path / "trace.json"))
+    
+    profile = profiler.to_dict()
+    assert {"enumerate", "read", "prefilter", "decode", "parse", "match"} <= set(
+        profile["phases"]
+    )
+    assert sorted(entry["path"] for entry in profile["slowest_files"]) == [
+        os.path.join("src", "a.py"), os.path.join("src", "b.py")
+    ]
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert any(event.get("cat") == "file" for event in trace["traceEvents"])
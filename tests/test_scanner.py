@@ -0,0 +1,144 @@
+"""Tests for the shared scanning core."""
+
+import mmap
+from pathlib import Path
+
+import pytest
+
+from legacy_import_migrator import profiling
+from legacy_import_migrator.checker import LegacyImportChecker
+from legacy_import_migrator.scanner import (
+    SourceScanner,
+    mmap_threshold,
+    read_source,
+    set_mmap,
+)
+from legacy_import_migrator.tracker import ImportTracker
+
+SOURCE = b'''"""Docs mention: import old_module"""
+import os, old_module.a
+from old_module import (
+    b,
+    c,
+)
+
+
+def f():
+    import old_module  # LEGACY-ALLOW would be marker text in a comment
+    text = "from old_module import x"
+'''
+
+
+@pytest.mark.parametrize("engine", ["ast", "tokenize"])
+def test_scan_reports_parser_accurate_sites(engine):
+    """Test multi-line, nested and multi-name imports; strings are ignored."""
+    scan = SourceScanner(["old_module"], engine).scan(SOURCE, with_lines=True)
+
+    assert scan.marker
+    assert not scan.prefiltered
+    assert scan.sites == [(2, "old_module.a"), (3, "old_module"), (10, "old_module")]
+    assert scan.lines == [
+        "import os, old_module.a",
+        "from old_module import (",
+        "import old_module  # LEGACY-ALLOW would be marker text in a comment",
+    ]
+
+
+def test_scan_prefilter_and_marker_short_circuit():
+    """Test that files are not decoded when the prefilter or marker decides."""
+    scanner = SourceScanner(["old_module"])
+
+    assert scanner.scan(b"import os\n\xff\xfe").prefiltered
+    marked = scanner.scan(b"# LEGACY-ALLOW\nimport old_module\n", stop_at_marker=True)
+    assert marked.marker and marked.sites == []
+
+    with pytest.raises(ValueError):
+        SourceScanner(["old_module"], engine="regex")
+
+
+def test_checker_reports_statements_the_line_regex_missed(tmp_path, monkeypatch):
+    """Test AST-precise checking in lim check, with line numbers on big files."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src").mkdir()
+    padding = "x = 1\n" * 20000
+    (tmp_path / "src" / "big.py").write_bytes(padding.encode() + SOURCE.replace(b"LEGACY", b"L"))
+
+    checker = LegacyImportChecker(legacy_patterns=["old_module"])
+    success, violations = checker.check(mode="all", search_roots=["src"])
+
+    assert not success
+    lines = [line_no for line_no, _ in violations[0][1]]
+    assert lines == [20002, 20003, 20010]
+
+
+def test_checker_matches_tracker_on_unparsable_source(tmp_path, monkeypatch):
+    """Test that checks, like scans, report no sites in source that lexes but does not parse."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src").mkdir()
+    broken = tmp_path / "src" / "broken.py"
+    broken.write_text("import old_module\ndef f(:\n    pass\n")
+
+    checker = LegacyImportChecker(legacy_patterns=["old_module"])
+    tracker = ImportTracker(["old_module"])
+
+    assert checker.check(mode="all", search_roots=["src"]) == (True, [])
+    assert tracker._extract_ast_imports(broken) == []
+    # The lexer alone still finds the import
+    lexer = LegacyImportChecker(legacy_patterns=["old_module"], engine="tokenize")
+    assert lexer.check(mode="all", search_roots=["src"]) == (
+        False,
+        [(Path("src/broken.py"), [(1, "import old_module")])],
+    )
+
+
+def test_read_source_maps_large_files(tmp_path):
+    """Test that large files are scanned from a memory map and only decoded on a hit."""
+    big = tmp_path / "big.py"
+    big.write_bytes(SOURCE + b"x = 1\n" * 4096)
+    plain = tmp_path / "plain.py"
+    plain.write_bytes(b"import os\n" * 4096)
+    scanner = SourceScanner(["old_module"])
+
+    profiler = profiling.start()
+    try:
+        with read_source(big, mmap_threshold=4096) as data:
+            assert isinstance(data, mmap.mmap)
+            scan = scanner.scan(data)
+        with read_source(plain, mmap_threshold=4096) as data:
+            assert scanner.scan(data).prefiltered
+        with read_source(plain, mmap_threshold=None) as data:
+            assert isinstance(data, bytes)
+    finally:
+        profiling.stop()
+
+    assert scan == scanner.scan(big.read_bytes())
+    size = plain.stat().st_size
+    assert profiler.counters == {
+        "bytes_mapped": big.stat().st_size + size,
+        "bytes_decoded": big.stat().st_size,
+        "bytes_read": size,
+    }
+
+
+def test_file_truncated_during_scan_is_safe(tmp_path):
+    """Test that a file truncated mid-scan is scanned as read, without mapping."""
+    big = tmp_path / "big.py"
+    big.write_bytes(SOURCE + b"x = 1\n" * (1 << 18))
+    tracker = ImportTracker(["old_module"])
+    scan = tracker._scanner.scan
+
+    def truncate_then_scan(data, *args, **kwargs):
+        with open(big, "r+b") as f:
+            f.truncate(0)
+        return scan(data, *args, **kwargs)
+
+    tracker._scanner.scan = truncate_then_scan
+    payload, _ = tracker._scan_file((big, None))
+
+    assert tracker.mmap_threshold is None
+    assert payload["sites"] == [[2, "old_module.a"], [3, "old_module"], [10, "old_module"]]
+    set_mmap(False)
+    try:
+        assert mmap_threshold() is None
+    finally:
+        set_mmap(True)
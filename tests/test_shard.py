@@ -0,0 +1,65 @@
+"""Tests for sharded scanning and merging of partial results."""
+
+from unittest.mock import patch
+
+import pytest
+
+from legacy_import_migrator.checker import LegacyImportChecker
+from legacy_import_migrator.merge import merge_parts
+from legacy_import_migrator.shard import parse_shard, shard_members
+from legacy_import_migrator.tracker import ImportTracker
+
+
+def test_shard_members_partition_by_size():
+    """Test that shards are disjoint, complete, deterministic and balanced by bytes."""
+    sizes = {f"src/m{i}.py": (i % 7 + 1) * 100 for i in range(400)}
+    shards = [shard_members(list(sizes), (i, 4), sizes.__getitem__) for i in range(1, 5)]
+    
+    assert set().union(*shards) == set(sizes)
+    assert sum(len(members) for members in shards) == len(sizes)
+    assert shard_members(reversed(list(sizes)), (2, 4), sizes.__getitem__) == shards[1]
+    total = sum(sizes.values())
+    for members in shards:
+        assert abs(sum(sizes[p] for p in members) - total / 4) <= max(sizes.values())
+    
+    assert parse_shard("2/4") == (2, 4)
+    for spec in ["0/4", "5/4", "2", "a/b", "1/0"]:
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_merged_shards_match_single_scan(tmp_path, monkeypatch):
+    """Test that merged partial scans and checks equal an unsharded run."""
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(30):
+        (src / f"m{i:02d}.py").write_text("import old_module\n" * (i % 3) + "x = 1\n" * i)
+    (src / "allowed.py").write_text("# LEGACY-ALLOW\nimport old_module\n")
+    monkeypatch.chdir(tmp_path)
+    
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"], baseline_file=str(tmp_path / "baseline.json")
+    )
+    checker = LegacyImportChecker(legacy_patterns=["old_module"])
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        full = tracker.scan(search_roots=["src"])
+        parts = [tracker.scan(search_roots=["src"], shard=(i, 3)) for i in range(1, 4)]
+        with pytest.raises(ValueError):
+            tracker.scan(search_roots=["src"], shard=(1, 3), incremental=True)
+    _, violations = checker.check(mode="all", search_roots=["src"])
+    checks = []
+    for i in range(1, 4):
+        _, part_violations = checker.check(mode="all", search_roots=["src"], shard=(i, 3))
+        checks.append(checker.violations_to_dict(part_violations, (i, 3)))
+    
+    assert all(part.files_scanned < full.files_scanned for part in parts)
+    documents = [part.to_dict() for part in parts]
+    assert merge_parts(documents) == full.to_dict()
+    assert merge_parts(checks) == checker.violations_to_dict(violations)
+    
+    with pytest.raises(ValueError, match="Missing shards: 2/3"):
+        merge_parts([documents[0], documents[2]])
+    with pytest.raises(ValueError):
+        merge_parts([documents[0], checks[1], documents[2]])
+    with pytest.raises(TypeError, match="missing 'shard' block"):
+        merge_parts([full.to_dict()])
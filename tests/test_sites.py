@@ -0,0 +1,49 @@
+"""Tests for the compact site table."""
+
+from unittest.mock import patch
+
+from legacy_import_migrator.sites import SiteTable
+from legacy_import_migrator.tracker import ImportTracker
+from tools.bench_sites import DEFAULT_BOUND_BYTES, measure
+
+
+def test_site_table_interns_paths_and_modules():
+    """Test storing, iterating and counting sites."""
+    table = SiteTable()
+    table.add_file("src/b.py", [(1, "old.x"), (4, "old.y")], allowed=False)
+    table.add_file("src/clean.py", [], allowed=False)
+    table.add_file("src/a.py", [(2, "old.x")], allowed=False)
+    table.add_file("src/shim.py", [(1, "old.x"), (2, "old.x")], allowed=True)
+    
+    assert len(table) == 5
+    assert table.paths == ["src/b.py", "src/a.py", "src/shim.py"]
+    assert table.modules == ["old.x", "old.y"]
+    assert table.counts() == (3, 2)
+    assert table.blocking_by_file() == [("src/b.py", 2), ("src/a.py", 1)]
+    assert list(table)[2:4] == [("src/a.py", 2, "old.x", False), ("src/shim.py", 1, "old.x", True)]
+
+
+def test_scan_fills_site_table(tmp_path):
+    """Test that a table filled by scan agrees with the scan's counts."""
+    src = tmp_path / "src"
+    (src / "legacy").mkdir(parents=True)
+    (src / "a.py").write_text("import old_module\nfrom old_module import x\n")
+    (src / "b.py").write_text("import old_module.sub\n")
+    (src / "legacy" / "shim.py").write_text("import old_module\n")
+    
+    tracker = ImportTracker(legacy_patterns=["old_module"], allow_patterns=["src/legacy/**"])
+    table = SiteTable()
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        result = tracker.scan(search_roots=["src"], site_table=table)
+        
+    assert table.counts() == (result.blocking_imports, result.allowed_imports)
+    assert table.blocking_by_file() == result.blocking_by_file
+    assert ("src/b.py", 1, "old_module.sub", False) in list(table)
+
+
+def test_site_memory_within_bound():
+    """Test that a site costs at most the documented number of bytes."""
+    result = measure(sites=50_000, files=1_000, modules=100)
+    
+    assert result["table_bytes_per_site"] <= DEFAULT_BOUND_BYTES, result
+    assert result["table_bytes_per_site"] * 10 < result["objects_bytes_per_site"]
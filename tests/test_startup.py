@@ -0,0 +1,32 @@
+"""Startup cost of the lim CLI, measured by tools/bench_startup.py.
+
+The default run checks the lazy-import boundary and a loose ceiling that only
+a regression (not a slow or busy machine) would cross; the strict budget runs
+with the benchmarks.
+"""
+
+import sys
+
+import pytest
+
+from tools.bench_startup import DEFAULT_BUDGET_MS, measure
+
+# Headroom for shared CI runners on the always-on check
+GENEROUS_BUDGET_MS = 5 * DEFAULT_BUDGET_MS
+
+
+def test_check_startup_avoids_heavy_modules():
+    """Test that lim check skips the heavy modules and stays under a loose ceiling."""
+    result = measure(runs=1)
+
+    assert result["forbidden_imported"] == []
+    assert result["overhead_ms_best"] <= GENEROUS_BUDGET_MS, result
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(sys.platform == "win32", reason="process start-up dominates on Windows")
+def test_check_startup_within_budget():
+    """Test that lim check stays within its import budget."""
+    result = measure(runs=3)
+
+    assert result["overhead_ms_best"] <= DEFAULT_BUDGET_MS, result
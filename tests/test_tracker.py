@@ -1,11 +1,19 @@
 """Tests for the ImportTracker class."""
 
+import asyncio
+import json
+import shutil
+import subprocess
 import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+from legacy_import_migrator import aio
+from legacy_import_migrator.aio import _read as aio_read
 from legacy_import_migrator.tracker import ImportSite, ImportTracker, MigrationProgress
 
 
@@ -137,4 +145,290 @@ def test_to_posix_rel():
     file_path = Path("/test/repo/src/main.py")
     
     result = tracker._to_posix_rel(root, file_path)
-    assert result == "src/main.py"
\ No newline at end of file
+    assert result == "src/main.py"
+
+def test_iter_sites_streams_sites_with_allow_status(tmp_path):
+    """Test the streaming site API and the on_site callback."""
+    (tmp_path / "src" / "legacy").mkdir(parents=True)
+    (tmp_path / "src" / "a.py").write_text("import os\nimport old_module.x\n")
+    (tmp_path / "src" / "legacy" / "b.py").write_text("from old_module import y\n")
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"],
+        allow_patterns=["src/legacy/**"],
+        baseline_file=str(tmp_path / "baseline.json"),
+    )
+    
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        sites = tracker.iter_sites(search_roots=["src"])
+        first = next(sites)
+        assert first.to_dict(tmp_path) == {
+            "path": "src/a.py",
+            "lineno": 2,
+            "module": "old_module.x",
+            "allowed": False,
+        }
+        assert [(s.path.name, s.allowed) for s in sites] == [("b.py", True)]
+        
+        streamed = []
+        result = tracker.scan(search_roots=["src"], on_site=streamed.append)
+        
+    assert [s.allowed for s in streamed] == [False, True]
+    assert (result.blocking_imports, result.allowed_imports) == (1, 1)
+
+
+def test_file_selection_and_results_api(tmp_path):
+    """Test the per-file API used by lim watch and lim migrate."""
+    (tmp_path / "src" / "legacy").mkdir(parents=True)
+    (tmp_path / "src" / "skip").mkdir()
+    (tmp_path / "src" / "a.py").write_text("import old_module\n")
+    (tmp_path / "src" / "legacy" / "b.py").write_text("import old_module\n")
+    (tmp_path / "src" / "skip" / "c.py").write_text("import old_module\n")
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"],
+        allow_patterns=["src/legacy/**"],
+        exclude_patterns=["src/skip/*"],
+        baseline_file=str(tmp_path / "baseline.json"),
+    )
+    
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        assert tracker.repo_root() == tmp_path
+        files = tracker.select_files(search_roots=["src"])
+    assert files == [
+        ("src/a.py", tmp_path / "src" / "a.py"),
+        ("src/legacy/b.py", tmp_path / "src" / "legacy" / "b.py"),
+    ]
+    assert tracker.exclude_globs.match("src/skip/c.py") == "src/skip/*"
+    results = [(rel_path, len(sites), reason) for rel_path, sites, reason in
+               tracker.iter_file_results(files)]
+    assert results == [("src/a.py", 1, None), ("src/legacy/b.py", 1, "glob src/legacy/**")]
+    assert tracker.allow_reason("src/a.py", marker=True) == "LEGACY-ALLOW marker"
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_incremental_scan_matches_full_scan(tmp_path):
+    """Test that --incremental reuses the baseline index and matches a full scan."""
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(6):
+        (src / f"m{i}.py").write_text(f"import old_module.m{i}\n")
+    (src / "dirty.py").write_text("import os\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    # Dirty when the baseline is written, reverted afterwards
+    (src / "dirty.py").write_text("import old_module\n")
+    
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"], baseline_file=str(tmp_path / "baseline.json")
+    )
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        tracker.write_baseline(tracker.scan(search_roots=["src"], build_index=True))
+        
+        (src / "dirty.py").write_text("import os\n")
+        (src / "m0.py").write_text("import new_module\n")
+        _git(tmp_path, "commit", "-q", "-am", "migrate m0")
+        (src / "m1.py").unlink()
+        (src / "m2.py").write_text("from old_module import a, b\nimport old_module.c\n")
+        (src / "new.py").write_text("import old_module\n")
+        
+        full = tracker.scan(search_roots=["src"])
+        incremental = tracker.scan(search_roots=["src"], incremental=True)
+        
+    assert incremental.stats.files_reused == 3
+    assert incremental.stats.files_parsed + incremental.stats.files_prefiltered == 4
+    assert incremental.blocking_imports == full.blocking_imports == 6
+    assert incremental.files_scanned == full.files_scanned == 7
+    assert incremental.blocking_by_file == full.blocking_by_file
+    assert incremental.progress_percent == full.progress_percent
+
+
+def test_incremental_scan_falls_back_without_index(tmp_path):
+    """Test that a baseline without a file index triggers a full scan."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("import old_module\n")
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text('{"imports": {"blocking": 2}, "baseline_commit": "abc"}')
+    tracker = ImportTracker(legacy_patterns=["old_module"], baseline_file=str(baseline))
+    
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        result = tracker.scan(search_roots=["src"], incremental=True)
+        
+    assert result.blocking_imports == 1
+    assert result.stats.files_reused == 0
+    assert result.progress_percent == 50.0
+
+
+def test_scan_rev_reads_committed_blobs(tmp_path):
+    """Test scanning a commit from git's object store, with shared blobs scanned once."""
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+    src = tmp_path / "src"
+    (src / "legacy").mkdir(parents=True)
+    (src / "a.py").write_text("import old_module\n")
+    (src / "copy.py").write_text("import old_module\n")
+    (src / "legacy" / "shim.py").write_text("from old_module import x\n")
+    (src / "clean.py").write_text("import os\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    # Working tree changes must not affect the scan of the commit
+    (src / "a.py").unlink()
+    (src / "clean.py").write_text("import old_module.more\n")
+    
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"],
+        allow_patterns=["src/legacy/**"],
+        baseline_file=str(tmp_path / "baseline.json"),
+    )
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        result = tracker.scan(search_roots=["src"], rev="HEAD", jobs=1)
+        with pytest.raises(ValueError):
+            tracker.scan(scope="changed", rev="HEAD")
+            
+        tracker.write_baseline(tracker.scan(search_roots=["src"], rev="HEAD", build_index=True))
+        
+    assert result.files_scanned == 4
+    assert (result.blocking_imports, result.allowed_imports) == (2, 1)
+    assert result.blocking_by_file == [("src/a.py", 1), ("src/copy.py", 1)]
+    assert result.stats.blobs_shared == 1
+    assert result.stats.files_parsed + result.stats.files_prefiltered == 3
+    assert result.to_dict()["rev"] == result.rev and len(result.rev) == 40
+    
+    baseline = json.loads((tmp_path / "baseline.json").read_text())
+    assert baseline["baseline_commit"] == result.rev
+    assert baseline["index"]["dirty"] == []
+    assert sorted(baseline["index"]["files"]) == [
+        "src/a.py", "src/clean.py", "src/copy.py", "src/legacy/shim.py"
+    ]
+
+
+def test_history_series_parses_each_blob_once(tmp_path):
+    """Test the history walk: per-commit counts, sampling and blob-level dedup."""
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.py").write_text("import old_module\n")
+    (src / "b.py").write_text("import old_module\nfrom old_module import x\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "c0")
+    (src / "b.py").write_text("from old_module import x\n")
+    _git(tmp_path, "commit", "-q", "-am", "c1")
+    (src / "a.py").write_text("import new_module\n")
+    _git(tmp_path, "commit", "-q", "-am", "c2")
+    (src / "c.py").write_text("import os\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "c3")
+    
+    tracker = ImportTracker(legacy_patterns=["old_module"])
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        series = list(tracker.history("HEAD~3", search_roots=["src"]))
+        sampled = list(tracker.history("HEAD~3", step=2, search_roots=["src"]))
+        with pytest.raises(ValueError):
+            list(tracker.history("HEAD~3", step=0))
+            
+    assert [p.progress.blocking_imports for p in series] == [3, 2, 1, 1]
+    assert [round(p.progress.progress_percent) for p in series] == [0, 33, 67, 67]
+    assert all(p.progress.baseline_commit == series[0].progress.rev for p in series)
+    # Unchanged blobs are not parsed again at later commits
+    parsed = [p.progress.stats.files_parsed + p.progress.stats.files_prefiltered for p in series]
+    assert parsed == [2, 1, 1, 1]
+    assert [p.progress.rev for p in sampled] == [series[i].progress.rev for i in (0, 2, 3)]
+    
+    record = series[1].to_dict()
+    assert record["rev"] == series[1].progress.rev
+    assert record["committed_at"] == series[1].committed_at
+
+
+def test_ascan_matches_scan(tmp_path):
+    """Test that the asyncio scan gives the scan's result and fills the same cache."""
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(12):
+        (src / f"m{i}.py").write_text("import old_module\n" * (i % 3) + "import os\n")
+    (src / "allowed.py").write_text("# LEGACY-ALLOW\nimport old_module\n")
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"],
+        baseline_file=str(tmp_path / "baseline.json"),
+        cache_dir=str(tmp_path / "cache"),
+    )
+    
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        expected = tracker.scan(search_roots=["src"])
+        shutil.rmtree(tmp_path / "cache")
+        cold = asyncio.run(tracker.ascan(search_roots=["src"], io_concurrency=3))
+        warm = asyncio.run(tracker.ascan(search_roots=["src"], io_concurrency=3))
+        
+    for result in (cold, warm):
+        assert result.blocking_by_file == expected.blocking_by_file
+        assert result.allowed_imports == expected.allowed_imports == 1
+        assert result.files_scanned == 13
+    assert cold.stats.cache_misses == 13
+    assert warm.stats.cache_hits == 13
+
+
+def test_ascan_read_timeout(tmp_path):
+    """Test that a read exceeding the read timeout fails the scan."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("import old_module\n")
+    tracker = ImportTracker(legacy_patterns=["old_module"])
+    
+    def slow_read(path):
+        time.sleep(0.5)
+        return aio_read(path)
+        
+    with patch.object(tracker, "_repo_root", return_value=tmp_path):
+        with patch("legacy_import_migrator.aio._read", slow_read):
+            with pytest.raises(asyncio.TimeoutError, match="src/a.py"):
+                asyncio.run(tracker.ascan(search_roots=["src"], read_timeout=0.05))
+
+
+def test_acached_scan_chunks_and_streams(tmp_path):
+    """Test that pool work is sent in chunks and results stream in input order."""
+    files = []
+    for i in range(40):
+        path = tmp_path / f"m{i:02d}.py"
+        path.write_text("import old_module\n" if i % 2 else "import os\n")
+        files.append((path.name, path))
+    tracker = ImportTracker(legacy_patterns=["old_module"])
+    
+    chunk_sizes = []
+    first_result = threading.Event()
+    
+    def recording_submit(executor, chunk):
+        chunk_sizes.append(len(chunk))
+        return aio_submit(executor, chunk)
+        
+    def held_read(path):
+        # The last file is only read once an earlier result was consumed
+        if path.name == "m39.py":
+            assert first_result.wait(5), "no result streamed before the scan ended"
+        return aio_read(path)
+        
+    async def consume():
+        names = []
+        async for rel_path, _, payload, _, _ in aio.acached_scan(
+            None, files, tracker._scan_read, jobs=2, io_concurrency=8
+        ):
+            names.append((rel_path, len(payload["sites"])))
+            first_result.set()
+        return names
+        
+    aio_submit = aio.submit_chunk
+    with patch.object(aio, "submit_chunk", recording_submit), patch.object(aio, "_read", held_read):
+        names = asyncio.run(consume())
+        
+    assert names == [(f"m{i:02d}.py", i % 2) for i in range(40)]
+    assert sum(chunk_sizes) == 40
+    assert max(chunk_sizes) > 1
@@ -0,0 +1,115 @@
+"""Tests for the live index behind lim watch."""
+
+import os
+import time
+
+import pytest
+
+from legacy_import_migrator.tracker import ImportTracker
+from legacy_import_migrator.watch import (
+    FileDelta,
+    InotifyWatcher,
+    LiveIndex,
+    PollingWatcher,
+)
+
+
+def _write(root, rel_path, content):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+@pytest.fixture
+def index(tmp_path):
+    _write(tmp_path, "src/a.py", "import old_module\n")
+    _write(tmp_path, "src/pkg/b.py", "import os\n")
+    _write(tmp_path, "src/legacy/shim.py", "import old_module\n")
+    tracker = ImportTracker(
+        legacy_patterns=["old_module"],
+        allow_patterns=["src/legacy/**"],
+        baseline_file=str(tmp_path / "baseline.json"),
+        with_digests=True,
+    )
+    live = LiveIndex(tracker, tmp_path, ["src"])
+    live.build()
+    return live
+
+
+def test_refresh_reports_deltas(index, tmp_path):
+    """Test introduced and removed imports, new files and deleted files."""
+    assert (index.blocking, index.allowed) == (1, 1)
+    assert sorted(index.directories) == ["src", "src/legacy", "src/pkg"]
+
+    # Moving an import to another line is not a change
+    _write(tmp_path, "src/a.py", "import os\n\nimport old_module\n")
+    assert index.refresh(["src/a.py"]) == []
+
+    _write(tmp_path, "src/pkg/b.py", "import os\nfrom old_module import x\n")
+    _write(tmp_path, "src/pkg/new.py", "import old_module.sub\n")
+    os.remove(tmp_path / "src" / "a.py")
+    assert index.refresh(["src/a.py", "src/pkg/b.py", "src/pkg/new.py"]) == [
+        FileDelta("src/a.py", [], [(3, "old_module")]),
+        FileDelta("src/pkg/b.py", [(2, "old_module")], []),
+        FileDelta("src/pkg/new.py", [(1, "old_module.sub")], []),
+    ]
+    assert index.blocking == 2
+
+    # Allowed files never produce blocking deltas
+    _write(tmp_path, "src/legacy/shim.py", "import old_module\nimport old_module.y\n")
+    assert index.refresh(["src/legacy"]) == []
+    assert (index.blocking, index.allowed) == (2, 2)
+
+
+def test_refresh_skips_new_gitignored_files(index, tmp_path):
+    """Test that files created after the build honor .gitignore and info/exclude."""
+    _write(tmp_path, ".gitignore", "generated/\n*_pb2.py\n")
+    _write(tmp_path, ".git/info/exclude", "scratch.py\n")
+    _write(tmp_path, "src/generated/g.py", "import old_module\n")
+    _write(tmp_path, "src/pkg/api_pb2.py", "import old_module\n")
+    _write(tmp_path, "src/scratch.py", "import old_module\n")
+    _write(tmp_path, "src/pkg/kept.py", "import old_module\n")
+    deltas = index.refresh(
+        ["src/generated/g.py", "src/pkg/api_pb2.py", "src/scratch.py", "src/pkg/kept.py"]
+    )
+    assert [delta.path for delta in deltas] == ["src/pkg/kept.py"]
+
+    index.tracker.gitignore = False
+    assert [delta.path for delta in index.refresh(["src/scratch.py"])] == ["src/scratch.py"]
+
+
+def test_polling_watcher_detects_changes(index, tmp_path):
+    """Test modified files and files in new directories."""
+    watcher = PollingWatcher(index, interval=0)
+    assert watcher.wait() == set()
+
+    _write(tmp_path, "src/pkg/b.py", "import old_module  # longer\n")
+    _write(tmp_path, "src/extra/c.py", "import old_module\n")
+    changed = watcher.wait()
+    assert changed == {"src/pkg/b.py", "src/extra"}
+    assert [delta.path for delta in index.refresh(changed)] == ["src/extra/c.py", "src/pkg/b.py"]
+
+    _write(tmp_path, "src/extra/d.py", "import old_module\n")
+    assert "src/extra/d.py" in watcher.wait()
+
+
+def test_inotify_watcher_detects_changes(index, tmp_path):
+    """Test saved files and files created in new directories."""
+    try:
+        watcher = InotifyWatcher(index)
+    except OSError as e:
+        pytest.skip(f"inotify unavailable: {e}")
+    try:
+        _write(tmp_path, "src/pkg/b.py", "import old_module\n")
+        assert watcher.wait(timeout=2) == {"src/pkg/b.py"}
+
+        (tmp_path / "src" / "fresh").mkdir()
+        assert watcher.wait(timeout=2) == {"src/fresh"}
+        _write(tmp_path, "src/fresh/c.py", "import old_module\n")
+        changed = set()
+        deadline = time.monotonic() + 2
+        while "src/fresh/c.py" not in changed and time.monotonic() < deadline:
+            changed |= watcher.wait(timeout=0.5)
+        assert "src/fresh/c.py" in changed
+    finally:
+        watcher.close()
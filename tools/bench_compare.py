@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark Comparison - check a bench_suite.py run against a stored run
+
+Usage:
+  python tools/bench_compare.py BASELINE.json CURRENT.json
+                                [--threshold 0.15] [--min-delta-s 0.05]
+                                [--limit NAME=RATIO ...] [--metric median_s|best_s]
+                                [--json]
+
+A benchmark regresses when its time grows by more than the threshold
+(relative) and by more than --min-delta-s seconds, so that noise on very
+short benchmarks does not fail the comparison. --limit sets the threshold
+of a single benchmark, e.g. --limit scan_all_cold=0.3.
+
+The run fails (exit code 1) if any benchmark regressed, if a benchmark of
+the baseline is missing, or if the runs used different repository
+parameters and are therefore not comparable.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_MIN_DELTA_S = 0.05
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_s: float = DEFAULT_MIN_DELTA_S,
+    limits: Optional[Dict[str, float]] = None,
+    metric: str = "median_s",
+) -> dict:
+    """Compare two bench_suite.py results.
+
+    Returns:
+        {"ok": bool, "errors": [...], "benchmarks": [{name, baseline_s,
+        current_s, change, limit, status}]}, where status is 'ok',
+        'regressed', 'improved', 'new' or 'missing'
+    """
+    limits = limits or {}
+    errors = []
+    for doc, label in ((baseline, "baseline"), (current, "current")):
+        if doc.get("version") != 1:
+            errors.append(f"{label}: unsupported result version {doc.get('version')!r}")
+    if errors:
+        return {"ok": False, "errors": errors, "benchmarks": []}
+    for key in ("params", "jobs"):
+        if baseline.get(key) != current.get(key):
+            errors.append(f"runs differ in '{key}': {baseline.get(key)} != {current.get(key)}")
+
+    rows = []
+    names = list(baseline["benchmarks"])
+    names += [name for name in current["benchmarks"] if name not in baseline["benchmarks"]]
+    for name in names:
+        old = baseline["benchmarks"].get(name)
+        new = current["benchmarks"].get(name)
+        limit = limits.get(name, threshold)
+        row = {"name": name, "limit": limit, "baseline_s": None, "current_s": None,
+               "change": None}
+        if old is None:
+            row.update(current_s=new[metric], status="new")
+        elif new is None:
+            row.update(baseline_s=old[metric], status="missing")
+            errors.append(f"{name}: missing from the current run")
+        else:
+            before, after = old[metric], new[metric]
+            change = (after - before) / before if before > 0 else 0.0
+            status = "ok"
+            if change > limit and after - before > min_delta_s:
+                status = "regressed"
+                errors.append(f"{name}: {before:.3f}s -> {after:.3f}s (+{change:.0%}, limit "
+                              f"+{limit:.0%})")
+            elif change < -limit and before - after > min_delta_s:
+                status = "improved"
+            if old.get("outcome") != new.get("outcome"):
+                errors.append(f"{name}: results differ: {old.get('outcome')} != "
+                              f"{new.get('outcome')}")
+            row.update(baseline_s=before, current_s=after, change=round(change, 4),
+                       status=status)
+        rows.append(row)
+    return {"ok": not errors, "errors": errors, "benchmarks": rows}
+
+
+def _parse_limits(values) -> dict:
+    limits = {}
+    for value in values:
+        name, sep, ratio = value.partition("=")
+        if not sep:
+            raise SystemExit(f"Invalid --limit {value!r} (expected NAME=RATIO)")
+        limits[name] = float(ratio)
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-s", type=float, default=DEFAULT_MIN_DELTA_S)
+    parser.add_argument("--limit", action="append", default=[], metavar="NAME=RATIO")
+    parser.add_argument("--metric", choices=["median_s", "best_s"], default="median_s")
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+    args = parser.parse_args()
+
+    result = compare(
+        json.loads(args.baseline.read_text(encoding="utf-8")),
+        json.loads(args.current.read_text(encoding="utf-8")),
+        threshold=args.threshold,
+        min_delta_s=args.min_delta_s,
+        limits=_parse_limits(args.limit),
+        metric=args.metric,
+    )
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for row in result["benchmarks"]:
+            before = "-" if row["baseline_s"] is None else f"{row['baseline_s']:.3f}s"
+            after = "-" if row["current_s"] is None else f"{row['current_s']:.3f}s"
+            change = "" if row["change"] is None else f"{row['change']:+.1%}"
+            print(f"  {row['name']:22s} {before:>9s} -> {after:>9s} {change:>8s}  "
+                  f"{row['status']}")
+        for error in result["errors"]:
+            print(f"FAIL {error}")
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Site Memory Benchmark - bytes per legacy import site held in memory
+
+Usage:
+  python tools/bench_sites.py [--sites 1000000] [--files 20000] [--modules 500]
+                              [--bound-bytes 24] [--json]
+
+Builds a synthetic set of legacy import sites spread over many files and
+modules, and measures with tracemalloc how much memory they take as a
+SiteTable and as a list of ImportSite objects with a Path each (the
+representation a scan used to accumulate).
+
+The run fails (exit code 1) if a SiteTable site costs more than the bound.
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from legacy_import_migrator.sites import SiteTable  # noqa: E402
+from legacy_import_migrator.tracker import ImportSite  # noqa: E402
+
+# Documented bound for the memory held per site by a SiteTable, in bytes
+DEFAULT_BOUND_BYTES = 24.0
+
+
+def _synthetic_files(sites: int, files: int, modules: int):
+    """Yield (path, [(lineno, module), ...]) with fresh strings, as a scan would."""
+    per_file, extra = divmod(sites, files)
+    for file_no in range(files):
+        count = per_file + (1 if file_no < extra else 0)
+        path = f"src/pkg{file_no % 97}/sub{file_no % 13}/module_{file_no}.py"
+        yield path, [
+            (lineno + 1, f"legacy_pkg.area{(file_no + lineno) % modules}.impl")
+            for lineno in range(count)
+        ]
+
+
+def _measure(build) -> int:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def measure(sites: int = 1_000_000, files: int = 20_000, modules: int = 500) -> dict:
+    """Measure bytes per site for SiteTable and for ImportSite lists."""
+    def build_table():
+        table = SiteTable()
+        for path, file_sites in _synthetic_files(sites, files, modules):
+            table.add_file(path, file_sites, allowed=False)
+        return table
+
+    def build_objects():
+        return [
+            ImportSite(path=Path(path), lineno=lineno, module=module)
+            for path, file_sites in _synthetic_files(sites, files, modules)
+            for lineno, module in file_sites
+        ]
+
+    table_bytes = _measure(build_table)
+    object_bytes = _measure(build_objects)
+    return {
+        "sites": sites,
+        "files": files,
+        "modules": modules,
+        "table_bytes_per_site": round(table_bytes / sites, 1),
+        "objects_bytes_per_site": round(object_bytes / sites, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sites", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--modules", type=int, default=500)
+    parser.add_argument("--bound-bytes", type=float, default=DEFAULT_BOUND_BYTES)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    result = measure(args.sites, args.files, args.modules)
+    result["bound_bytes"] = args.bound_bytes
+    ok = result["table_bytes_per_site"] <= args.bound_bytes
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['sites']} sites in {result['files']} files, "
+              f"{result['modules']} distinct modules")
+        print(f"  SiteTable:         {result['table_bytes_per_site']:7.1f} bytes/site "
+              f"(bound {args.bound_bytes})")
+        print(f"  ImportSite + Path: {result['objects_bytes_per_site']:7.1f} bytes/site")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
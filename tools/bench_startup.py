@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark - import cost of `lim check` measured with -X importtime
+
+Usage:
+  python tools/bench_startup.py [--runs 5] [--budget-ms 200] [--json]
+
+Runs `lim check --plain` on an empty repository in fresh interpreters and
+compares the import time the toolkit adds on top of a bare interpreter
+(best of N runs) with a budget. Bytecode is compiled to a temporary pycache
+first, so the numbers reflect an installed package rather than compilation.
+
+The run fails (exit code 1) if the budget is exceeded or if the check path
+imports a module it must not need, such as rich or multiprocessing.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Budget for the import time added by `lim check`, in milliseconds
+DEFAULT_BUDGET_MS = 200.0
+
+# Modules the plain check path must not import (prefix match)
+FORBIDDEN_MODULES = (
+    "rich",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "socket",
+    "legacy_import_migrator.tracker",
+    "legacy_import_migrator.cli.scan",
+    "legacy_import_migrator.cli.baseline",
+    "legacy_import_migrator.cli.watch",
+    "legacy_import_migrator.cli.serve",
+)
+
+CHECK_ARGS = [
+    "check", "--plain", "--no-daemon", "--no-cache",
+    "--mode", "all", "--roots", "src", "--legacy-patterns", "old_module",
+]
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Return {module: self time in microseconds} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def _run(args, cwd, env) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def measure(runs: int = 5) -> dict:
+    """Measure `lim check` import overhead against a bare interpreter."""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp, "repo")
+        (repo / "src").mkdir(parents=True)
+        env = dict(os.environ)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPYCACHEPREFIX"] = str(Path(tmp, "pycache"))
+        env["PYTHONPATH"] = os.pathsep.join(
+            [str(ROOT / "src")] + [p for p in [env.get("PYTHONPATH")] if p]
+        )
+        env["LIM_NO_DAEMON"] = "1"
+
+        # Warm-up run writes the bytecode cache
+        _run(["-m", "legacy_import_migrator", *CHECK_ARGS], repo, env)
+
+        bare, check = [], []
+        modules = {}
+        for _ in range(runs):
+            bare.append(sum(_run(["-c", "pass"], repo, env).values()))
+            modules = _run(["-m", "legacy_import_migrator", *CHECK_ARGS], repo, env)
+            check.append(sum(modules.values()))
+
+    overhead = [(c - b) / 1000 for b, c in zip(bare, check)]
+    forbidden = sorted(
+        name for name in modules
+        if any(name == f or name.startswith(f + ".") for f in FORBIDDEN_MODULES)
+    )
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "runs": runs,
+        "overhead_ms_best": round(min(overhead), 1),
+        "overhead_ms_median": round(statistics.median(overhead), 1),
+        "modules_imported": len(modules),
+        "forbidden_imported": forbidden,
+        "slowest_modules_us": dict(slowest),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    result["budget_ms"] = args.budget_ms
+    ok = result["overhead_ms_best"] <= args.budget_ms and not result["forbidden_imported"]
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"lim check import overhead: {result['overhead_ms_best']} ms best, "
+              f"{result['overhead_ms_median']} ms median (budget {args.budget_ms} ms)")
+        print(f"Modules imported: {result['modules_imported']}")
+        for name, self_us in result["slowest_modules_us"].items():
+            print(f"  {self_us / 1000:7.2f} ms  {name}")
+        if result["forbidden_imported"]:
+            print(f"Forbidden imports: {', '.join(result['forbidden_imported'])}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Scan Benchmark Suite - scan, check and baseline timings on a synthetic monorepo
+
+Usage:
+  python tools/bench_suite.py [--files 2000] [--depth 3] [--mean-lines 120]
+                              [--size-dist lognormal|uniform|fixed]
+                              [--legacy-density 0.05] [--allow-globs 10]
+                              [--patterns 5] [--changed 0.02] [--seed 1]
+                              [--large-files 0] [--large-mb 5]
+                              [--repeat 3] [--jobs 1] [--keep DIR] [--out FILE]
+
+Generates a deterministic git repository (the same parameters always give
+the same files and commits), then times, each with a cold and a warm
+result cache:
+
+  scan_all       ImportTracker.scan(scope="all")          (lim scan --scope all)
+  check_changed  LegacyImportChecker.check(mode="changed") (lim check --mode changed)
+  baseline_write ImportTracker.write_baseline()           (lim baseline --write)
+
+"Cold" starts every run with an empty result cache; "warm" runs after the
+cache was filled. The operating system's page cache is warm in both cases.
+--large-files adds generated modules of --large-mb megabytes each, like
+protobuf output, half of them with a legacy import.
+
+Besides the times, each benchmark reports the peak resident set size of
+this process during its runs (worker processes are not included) and,
+from one extra profiled run, how many bytes of file content were read
+into memory, memory-mapped and decoded. Results are printed (or written
+with --out) as JSON, which tools/bench_compare.py checks against a stored
+run.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from legacy_import_migrator import profiling  # noqa: E402
+from legacy_import_migrator.checker import LegacyImportChecker  # noqa: E402
+from legacy_import_migrator.scanner import MMAP_THRESHOLD  # noqa: E402
+from legacy_import_migrator.tracker import ImportTracker  # noqa: E402
+
+# Version of the result document, checked by bench_compare.py
+RESULT_VERSION = 1
+
+STDLIB_MODULES = ["os", "sys", "json", "re", "typing", "pathlib", "collections", "functools"]
+
+GIT = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.invalid",
+       "-c", "commit.gpgsign=false"]
+
+
+@dataclass
+class RepoSpec:
+    """Parameters of a synthetic repository."""
+    files: int = 2000
+    depth: int = 3  # directory levels below src/
+    mean_lines: int = 120
+    size_dist: str = "lognormal"  # 'lognormal', 'uniform' or 'fixed'
+    legacy_density: float = 0.05  # share of import statements that are legacy
+    allow_globs: int = 10
+    patterns: int = 5
+    changed: float = 0.02  # share of files modified by the second commit
+    seed: int = 1
+    large_files: int = 0  # generated modules of large_mb megabytes each
+    large_mb: float = 5.0
+
+    @property
+    def legacy_patterns(self):
+        return [f"legacy_{p}" for p in range(self.patterns)]
+
+    @property
+    def allow_patterns(self):
+        """Globs allowing a few directories; the rest match nothing, but cost a test each."""
+        return [
+            f"src/d{k}/d{k}/**" if k % 2 == 0 else f"src/**/generated_{k}/*.py"
+            for k in range(self.allow_globs)
+        ]
+
+
+def _line_count(rng: random.Random, spec: RepoSpec) -> int:
+    if spec.size_dist == "fixed":
+        return spec.mean_lines
+    if spec.size_dist == "uniform":
+        return rng.randint(1, 2 * spec.mean_lines)
+    # Lognormal with the requested mean: a few very large files, many small ones
+    sigma = 1.0
+    lines = rng.lognormvariate(math.log(spec.mean_lines) - sigma * sigma / 2, sigma)
+    return max(1, min(int(lines), 100 * spec.mean_lines))
+
+
+def _import_line(rng: random.Random, spec: RepoSpec) -> str:
+    if spec.patterns and rng.random() < spec.legacy_density:
+        module = f"legacy_{rng.randrange(spec.patterns)}.mod{rng.randrange(20)}"
+        if rng.random() < 0.5:
+            return f"from {module} import helper_{rng.randrange(10)}\n"
+        return f"import {module}\n"
+    if rng.random() < 0.5:
+        return f"import {rng.choice(STDLIB_MODULES)}\n"
+    return f"from app.core{rng.randrange(50)} import name_{rng.randrange(10)}\n"
+
+
+def _source(rng: random.Random, spec: RepoSpec, file_no: int) -> str:
+    """Source of one file: a docstring, imports, then code filling the size."""
+    lines = [f'"""Generated module {file_no}."""\n']
+    for _ in range(2 + rng.randrange(10)):
+        lines.append(_import_line(rng, spec))
+    target = _line_count(rng, spec)
+    body = 0
+    while len(lines) < target:
+        body += 1
+        lines.extend([
+            "\n",
+            f"def function_{body}(value):\n",
+            f"    # mentions legacy_{body % max(spec.patterns, 1)} in a comment only\n",
+            f"    text = 'import legacy_{body % max(spec.patterns, 1)}'\n",
+            "    if value:\n",
+            "        from os import path\n",
+            f"        return path.join(text, str(value * {body}))\n",
+            "    return None\n",
+        ])
+    return "".join(lines[:max(target, 1)])
+
+
+def _large_source(rng: random.Random, spec: RepoSpec, large_no: int) -> str:
+    """Source of a large generated module: a serialized descriptor, as protoc writes."""
+    lines = ['"""Generated protocol buffer code. DO NOT EDIT."""\n',
+             "from google.protobuf import descriptor as _descriptor\n"]
+    if large_no % 2 == 1 and spec.patterns:
+        lines.append(f"from legacy_{large_no % spec.patterns}.schema import options\n")
+    lines.append("_SERIALIZED = (\n")
+    block = "".join(
+        "    b'" + "".join(f"\\x{rng.randrange(256):02x}" for _ in range(24)) + "'\n"
+        for _ in range(256)
+    )
+    target = int(spec.large_mb * 1024 * 1024)
+    body = block * max(1, target // len(block))
+    return "".join(lines) + body + ")\n"
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.check_output(
+        [*GIT, *args], cwd=repo, text=True, stderr=subprocess.DEVNULL
+    ).strip()
+
+
+def generate_repo(repo: Path, spec: RepoSpec) -> dict:
+    """Create the synthetic repository, committed twice.
+
+    The first commit holds every file; the second modifies a share of them,
+    as a pull request would, and is what check_changed looks at.
+
+    Returns:
+        Summary with the base commit and file and byte counts
+    """
+    rng = random.Random(spec.seed)
+    fanout = max(2, round((spec.files / 10) ** (1 / max(spec.depth, 1))))
+    paths = []
+    total_bytes = 0
+    for file_no in range(spec.files):
+        parts = [f"d{rng.randrange(fanout)}" for _ in range(spec.depth)]
+        rel_path = "/".join(["src", *parts, f"module_{file_no}.py"])
+        path = repo / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        source = _source(rng, spec, file_no)
+        path.write_text(source, encoding="utf-8")
+        total_bytes += len(source)
+        paths.append(path)
+    for large_no in range(spec.large_files):
+        path = repo / "src" / "generated" / f"schema_{large_no}_pb2.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        source = _large_source(rng, spec, large_no)
+        path.write_text(source, encoding="utf-8")
+        total_bytes += len(source)
+
+    _git(repo, "init", "-q")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "base")
+    base = _git(repo, "rev-parse", "HEAD")
+
+    changed = rng.sample(paths, min(len(paths), max(1, round(spec.changed * spec.files))))
+    for path in changed:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(_import_line(rng, spec))
+    _git(repo, "commit", "-q", "-am", "change")
+    return {"base": base, "files": len(paths), "bytes": total_bytes, "changed": len(changed)}
+
+
+@contextlib.contextmanager
+def _cwd(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _reset_peak_rss() -> None:
+    """Reset this process's peak resident set size, where the OS allows it (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None where unknown.
+
+    Without /proc the peak cannot be reset, so it covers the whole process.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _time(func, repeat: int, reset=None) -> dict:
+    """Run func repeat times, calling reset before each run, and summarize.
+
+    One more run under a profiler counts the bytes read, mapped and decoded;
+    it is not timed.
+    """
+    runs = []
+    outcome = None
+    _reset_peak_rss()
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        outcome = func()
+        runs.append(time.perf_counter() - start)
+    peak_rss_mb = _peak_rss_mb()
+
+    if reset is not None:
+        reset()
+    profiler = profiling.start(slowest=0)
+    try:
+        func()
+    finally:
+        profiling.stop()
+    return {
+        "median_s": round(statistics.median(runs), 4),
+        "best_s": round(min(runs), 4),
+        "runs_s": [round(run, 4) for run in runs],
+        "peak_rss_mb": peak_rss_mb,
+        "bytes": {
+            name: profiler.counters.get(name, 0)
+            for name in ("bytes_read", "bytes_mapped", "bytes_decoded")
+        },
+        "outcome": outcome,
+    }
+
+
+def run_suite(
+    spec: RepoSpec, repeat: int = 3, jobs: int = 1, keep: Optional[str] = None
+) -> dict:
+    """Generate the repository and run every benchmark in it."""
+    tmp = None
+    if keep:
+        repo = Path(keep)
+        if repo.exists():
+            shutil.rmtree(repo)
+        repo.mkdir(parents=True)
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        repo = Path(tmp.name)
+    try:
+        summary = generate_repo(repo, spec)
+        cache_dir = repo / ".cache" / "lim-index"
+
+        def clear_cache():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        def tracker():
+            return ImportTracker(
+                legacy_patterns=spec.legacy_patterns,
+                allow_patterns=spec.allow_patterns,
+                baseline_file=str(repo / ".cache" / "migration_baseline.json"),
+                cache_dir=str(cache_dir),
+                mmap_threshold=MMAP_THRESHOLD,
+            )
+
+        def scan_all():
+            result = tracker().scan(scope="all", search_roots=["src"], jobs=jobs)
+            return {"files": result.files_scanned, "blocking": result.blocking_imports}
+
+        def check_changed():
+            checker = LegacyImportChecker(
+                legacy_patterns=spec.legacy_patterns,
+                allow_patterns=spec.allow_patterns,
+                cache_dir=str(cache_dir),
+                mmap_threshold=MMAP_THRESHOLD,
+            )
+            _, violations = checker.check(
+                mode="changed", base=summary["base"], search_roots=["src"], jobs=jobs
+            )
+            return {"violations": sum(len(lines) for _, lines in violations)}
+
+        def baseline_write():
+            tracker().write_baseline()
+            return None
+
+        benchmarks = {}
+        with _cwd(repo):
+            for name, func in (
+                ("scan_all", scan_all),
+                ("check_changed", check_changed),
+                ("baseline_write", baseline_write),
+            ):
+                benchmarks[f"{name}_cold"] = _time(func, repeat, reset=clear_cache)
+                benchmarks[f"{name}_warm"] = _time(func, repeat)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    return {
+        "version": RESULT_VERSION,
+        "params": asdict(spec),
+        "repeat": repeat,
+        "jobs": jobs,
+        "repo": {key: value for key, value in summary.items() if key != "base"},
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": benchmarks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    defaults = RepoSpec()
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--mean-lines", type=int, default=defaults.mean_lines)
+    parser.add_argument("--size-dist", choices=["lognormal", "uniform", "fixed"],
+                        default=defaults.size_dist)
+    parser.add_argument("--legacy-density", type=float, default=defaults.legacy_density)
+    parser.add_argument("--allow-globs", type=int, default=defaults.allow_globs)
+    parser.add_argument("--patterns", type=int, default=defaults.patterns)
+    parser.add_argument("--changed", type=float, default=defaults.changed)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--large-files", type=int, default=defaults.large_files)
+    parser.add_argument("--large-mb", type=float, default=defaults.large_mb)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--keep", help="Generate the repository in DIR and keep it")
+    parser.add_argument("--out", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    spec = RepoSpec(
+        files=args.files,
+        depth=args.depth,
+        mean_lines=args.mean_lines,
+        size_dist=args.size_dist,
+        legacy_density=args.legacy_density,
+        allow_globs=args.allow_globs,
+        patterns=args.patterns,
+        changed=args.changed,
+        seed=args.seed,
+        large_files=args.large_files,
+        large_mb=args.large_mb,
+    )
+    result = run_suite(spec, args.repeat, args.jobs, args.keep)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print(f"{result['repo']['files']} files, {result['repo']['bytes']} bytes")
+        for name, bench in result["benchmarks"].items():
+            copied = bench["bytes"]["bytes_read"] / (1024 * 1024)
+            rss = "-" if bench["peak_rss_mb"] is None else f"{bench['peak_rss_mb']:.0f} MiB"
+            print(f"  {name:22s} {bench['median_s']:8.3f}s median, {bench['best_s']:8.3f}s best, "
+                  f"{copied:8.1f} MiB read, peak RSS {rss}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())